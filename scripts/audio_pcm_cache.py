@@ -0,0 +1,79 @@
+"""デコード済みの音声（16kHz モノラル float32）を .npy で保存するキャッシュ。
+
+m4a / mp4 などのデコードは長い音声ほど時間がかかるため、1回デコードした波形を
+音声ファイルの中身のハッシュをキーにして保存し、次回以降はメモリマップで読み込む。
+メモリマップした配列はファイルのページをそのまま参照するので、チャンク並列の
+ワーカーも波形を受け渡さずに同じファイルから必要な範囲だけを読める。
+
+音声ファイルが書き換えられるとハッシュが変わり、古い波形は削除してデコードし直す。
+キャッシュ全体のサイズには上限があり、超えた分は最終利用が古い順（LRU）に削除する。
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from transcript_cache import content_hash, evict_lru, recorded_hash
+
+
+class PcmCache:
+    """デコード済み波形のキャッシュ。1エントリ = 1 .npy ファイル。"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, sampling_rate: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.sampling_rate = sampling_rate
+
+    def _entry_path(self, audio_hash: str) -> Path:
+        return self.cache_dir / f"{audio_hash}_{self.sampling_rate}.npy"
+
+    def entry_path(self, audio_path: Path) -> Path:
+        """音声ファイルの波形を保存する .npy のパスを返す。なければデコードして作る。"""
+        previous = recorded_hash(audio_path, self.cache_dir)
+        audio_hash = content_hash(audio_path, self.cache_dir)
+        if previous is not None and previous != audio_hash:
+            # 音声ファイルが書き換えられたので、前の中身の波形は使わない
+            self._entry_path(previous).unlink(missing_ok=True)
+
+        path = self._entry_path(audio_hash)
+        if path.exists():
+            # 最終利用時刻として更新時刻を進める（LRU 判定に使う）
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+        self._decode_to(audio_path, path)
+        # 作ったばかりの波形は、1件で上限を超えていても読み込みに使うので残す
+        evict_lru(self.cache_dir, "*.npy", self.max_bytes, keep=path)
+        return path
+
+    def _decode_to(self, audio_path: Path, path: Path) -> None:
+        """音声をデコードして .npy に保存する。書きかけのファイルは残さない。"""
+        from faster_whisper.audio import decode_audio
+
+        audio = decode_audio(str(audio_path), sampling_rate=self.sampling_rate)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 書きかけのファイルを他のプロセスの LRU 削除（"*.npy"）の対象にしないよう、.npy で終わらない名前にする。
+        # np.save はパスを渡すと .npy を付け足すため、開いたファイルに書き込む
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(audio, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def load(self, audio_path: Path) -> np.ndarray:
+        """音声ファイルの波形をメモリマップで返す（必要ならデコードしてキャッシュする）。"""
+        return load_pcm_file(self.entry_path(audio_path))
+
+
+def load_pcm_file(path: Path, start: int = 0, stop: int | None = None) -> np.ndarray:
+    """.npy の波形をメモリマップで読み込み、[start, stop) サンプルの範囲を返す。
+
+    コピーオンライト（mmap_mode="c"）で開くため、読み込み側が配列を書き換えても
+    キャッシュのファイルは変わらない。書き換えない限りコピーは発生しない。
+    """
+    return np.load(path, mmap_mode="c")[start:stop]
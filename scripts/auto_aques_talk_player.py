@@ -1,29 +1,58 @@
 """AquesTalk Player にセリフを自動入力して読み上げるスクリプト。
 
-CSV ファイルからセリフを読み込み、AquesTalk Player に
-自動でテキストを入力して音声を生成します。
+CSV ファイルからセリフを読み込み、読み上げエンジン（バックエンド）で音声を生成します。
+- aquestalk: AquesTalk Player に自動でテキストを入力し、1行ずつ再生する（GUI 操作）
+- voicevox: VOICEVOX 互換の HTTP エンジンで複数行を同時に合成し、
+  「番号_セリフ.wav」を wav_output/ に直接書き出す（画面は操作しない）
+- mock: 疑似エンジンで voicevox と同じ処理を試す（エンジンなしでの確認用）。
+  無音の WAV は wav_output/ ではなく MOCK_WAV_DIR に書き出す
 
 使い方:
 1. csv_input/ にシナリオ CSV を配置（列: 実行, キャラクター, セリフ）
-2. CSV_FILE, TARGET_CHARACTER を変更
-3. INPUT_X, INPUT_Y, BUTTON_X, BUTTON_Y を get_mouse_positions.py で取得した値に変更
-4. AquesTalk Player を開いた状態で実行
+2. CSV_FILE, TARGET_CHARACTER, BACKEND を変更
+3. aquestalk の場合は INPUT_X, INPUT_Y, BUTTON_X, BUTTON_Y を get_mouse_positions.py で取得した値に変更し、
+   AquesTalk Player を開いた状態で実行
+   voicevox の場合は VOICEVOX エンジンを起動してから実行（`--backend voicevox` でも指定可）
+4. 読みを直したい単語は csv_input/reading_dictionary.csv（列: 表記, 読み）に追加
 """
 
+import argparse
 import platform
-import pyautogui
-import time
 import random
-import pandas as pd
-import pyperclip
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from reading_dictionary import ReadingDictionary, load_dictionary
+from scenario_reader import iter_scenario_lines, read_columns
+from tts_backends import (
+    VOICEVOX_SPEAKER,
+    VOICEVOX_URL,
+    MockTtsEngine,
+    TtsBackend,
+    TtsError,
+    TtsJob,
+    TtsResult,
+    VoicevoxBackend,
+)
+from wav_wait import WAV_DIR, WavWaiter, line_timeout
 
 # ===================== 設定 =====================
 # シナリオ CSV ファイル（csv_input/ ディレクトリに配置）
-CSV_FILE = "csv_input/sample.csv"
+CSV_FILE = Path("csv_input/sample.csv")
 
 # 読み上げ対象のキャラクター名
 TARGET_CHARACTER = "魔理沙"
 
+# 読み上げエンジン: "aquestalk"（GUI 操作）/ "voicevox"（HTTP）/ "mock"（疑似エンジン）
+BACKEND = "aquestalk"
+
+# voicevox の同時合成数（= エンジンへの接続数）
+CONCURRENCY = 4
+
+# mock の WAV の出力先（実行のたびに空にする。wav_output/ の本物の WAV と混ざらないよう別にする）
+MOCK_WAV_DIR = Path("cache/mock_wav")
+
 # AquesTalk Player の入力欄座標（get_mouse_positions.py で取得）
 INPUT_X, INPUT_Y = 33, 91
 
@@ -32,92 +61,172 @@ BUTTON_X, BUTTON_Y = 337, 195
 
 # 開始前のカウントダウン（秒）
 SLEEP_COUNTDOWN = 5
-# ===================== 設定ここまで =====================
 
-# 読みの修正リスト（AquesTalk が正しく読めない単語を修正）
-REPLACE_LIST = [
-    ["ChatGPT", "チャットジーピーティー"],
-    ["Python", "パイソン"],
-    ["YouTube", "ユーチューブ"],
-    ["VOICEVOX", "ボイスボックス"],
-    ["Final Cut Pro", "ファイナルカットプロ"],
-    ["GitHub", "ギットハブ"],
-    ["Whisper", "ウィスパー"],
-    ["一行", "いちぎょう"],
-    ["他人", "たにん"],
-    ["後で", "あとで"],
-    # 必要に応じて追加してください
-]
+# True: wav_output/ に WAV が書き出されるまで待つ（上限はセリフのモーラ数から決める）
+# False: 従来どおり 1〜2秒のランダムな時間だけ待つ
+WAIT_FOR_WAV = True
+
+# 読みの修正辞書（列: 表記, 読み。AquesTalk が正しく読めない単語を追加してください）
+READING_DICTIONARY = Path("csv_input/reading_dictionary.csv")
+# コンパイル済みの辞書の保存先
+READING_CACHE_DIR = Path("cache/reading_dictionary")
+# ===================== 設定ここまで =====================
 
 
 def wait_random_interval():
-    """読み上げ完了を待つランダムインターバル。"""
+    """読み上げ完了を待つランダムインターバル（WAIT_FOR_WAV = False のとき）。"""
     wait_time = random.randint(1, 2)
     print(f"⏳ {wait_time}秒待機...")
     time.sleep(wait_time)
 
 
-# CSV 読み込み
-df = pd.read_csv(CSV_FILE, encoding="utf-8", header=0)
-
-print(f"📄 CSV ファイル: {CSV_FILE}")
-print(f"🎭 キャラクター: {TARGET_CHARACTER}")
-print(f"   CSV の列名: {df.columns.tolist()}")
-
-# 実行列を数値型に変換
-df["実行"] = pd.to_numeric(df["実行"], errors="coerce")
-
-print(f"⏱ {SLEEP_COUNTDOWN}秒後に開始します。AquesTalk Player をアクティブにしておいてください！")
-time.sleep(SLEEP_COUNTDOWN)
-
-# OS によって修飾キーを切り替え（ループ外で1回だけ取得）
-modifier_key = "command" if platform.system() == "Darwin" else "ctrl"
-
-count = 0
-for _, row in df.iterrows():
-    # 実行条件のチェック
-    if pd.isna(row["実行"]) or row["実行"] != 1:
-        continue
-
-    # 対象キャラクターのチェック
-    if TARGET_CHARACTER != row["キャラクター"]:
-        continue
-
-    voice = row["セリフ"]
-
-    if pd.isna(voice):
-        continue
-
-    # 読み方を修正
-    for replace_item in REPLACE_LIST:
-        if replace_item[0] in voice:
-            voice = voice.replace(replace_item[0], replace_item[1])
-            print(f"  読み修正: {replace_item[0]} → {replace_item[1]}")
-
-    count += 1
-    print(f"🖊 [{count}] {voice}")
-
-    # 入力欄をクリックしてフォーカス
-    pyautogui.click(INPUT_X, INPUT_Y)
-    time.sleep(0.5)
-
-    # クリップボードにコピー
-    pyperclip.copy(voice)
-
-    # テキスト全選択
-    pyautogui.keyDown(modifier_key)
-    pyautogui.press("a")
-    pyautogui.keyUp(modifier_key)
-
-    # テキスト貼り付け
-    pyautogui.keyDown(modifier_key)
-    pyautogui.press("v")
-    pyautogui.keyUp(modifier_key)
-
-    # 再生ボタンをクリック
-    time.sleep(1)
-    pyautogui.click(BUTTON_X, BUTTON_Y)
-
-    wait_random_interval()
-
-print(f"✅ すべてのセリフを送信しました（{count}件）")
+def load_reading_dictionary() -> Optional[ReadingDictionary]:
+    """読み辞書を読み込む（なければ読みを直さずに続ける）。"""
+    if not READING_DICTIONARY.exists():
+        print(f"⚠ 読み辞書が見つかりません: {READING_DICTIONARY}（読みの修正なしで続けます）")
+        return None
+    dictionary = load_dictionary(READING_DICTIONARY, READING_CACHE_DIR)
+    print(f"📖 読み辞書: {READING_DICTIONARY}（{len(dictionary)}件）")
+    return dictionary
+
+
+class AquesTalkGuiBackend(TtsBackend):
+    """AquesTalk Player の入力欄に貼り付けて再生ボタンを押す、1行ずつの GUI 操作。
+
+    WAV は AquesTalk Player が「セリフ_番号.wav」で保存する（swap_title_number.py でリネームする）。
+    """
+
+    name = "aquestalk"
+
+    def __init__(self):
+        import pyautogui
+        import pyperclip
+
+        self.pyautogui = pyautogui
+        self.pyperclip = pyperclip
+        # OS によって修飾キーを切り替え（ループ外で1回だけ取得）
+        self.modifier_key = "command" if platform.system() == "Darwin" else "ctrl"
+        self.waiter = WavWaiter(WAV_DIR) if WAIT_FOR_WAV else None
+
+    def check(self) -> None:
+        print(f"⏱ {SLEEP_COUNTDOWN}秒後に開始します。AquesTalk Player をアクティブにしておいてください！")
+        time.sleep(SLEEP_COUNTDOWN)
+
+    def _hotkey(self, key: str) -> None:
+        self.pyautogui.keyDown(self.modifier_key)
+        self.pyautogui.press(key)
+        self.pyautogui.keyUp(self.modifier_key)
+
+    def synthesize(self, jobs: List[TtsJob], output_dir: Path) -> Iterator[TtsResult]:
+        pyautogui = self.pyautogui
+        for job in jobs:
+            started = time.perf_counter()
+            print(f"🖊 [{job.number}] {job.text}")
+
+            # 入力欄をクリックしてフォーカス
+            pyautogui.click(INPUT_X, INPUT_Y)
+            time.sleep(0.5)
+
+            # クリップボードにコピーし、テキスト全選択 → 貼り付け
+            self.pyperclip.copy(job.text)
+            self._hotkey("a")
+            self._hotkey("v")
+
+            # 再生ボタンをクリック
+            time.sleep(1)
+            if self.waiter is None:
+                pyautogui.click(BUTTON_X, BUTTON_Y)
+                wait_random_interval()
+                yield TtsResult(job, None, None, time.perf_counter() - started)
+                continue
+
+            # WAV の書き出しが終わるまで待つ
+            self.waiter.mark()
+            pyautogui.click(BUTTON_X, BUTTON_Y)
+            timeout = line_timeout(job.text)
+            wav_path = self.waiter.wait(timeout)
+            error = None if wav_path else f"{timeout:.1f}秒待っても {WAV_DIR}/ に WAV が書き出されませんでした"
+            yield TtsResult(job, wav_path, error, time.perf_counter() - started)
+
+    def close(self) -> None:
+        if self.waiter is not None:
+            self.waiter.report()
+
+
+def load_jobs(dictionary: Optional[ReadingDictionary]) -> List[TtsJob]:
+    """実行対象・対象キャラクター・セリフありの行を、読みを直して TtsJob にする。"""
+    jobs = []
+    for line in iter_scenario_lines(CSV_FILE, TARGET_CHARACTER):
+        voice = line.text
+        # 読み方を修正（最も長く一致する表記を1回の走査で置き換える）
+        if dictionary is not None:
+            voice, replaced = dictionary.apply(voice)
+            for surface, reading in replaced:
+                print(f"  読み修正: {surface} → {reading}")
+        jobs.append(TtsJob(len(jobs) + 1, voice))
+    return jobs
+
+
+def run(backend: TtsBackend, jobs: List[TtsJob], output_dir: Path = WAV_DIR) -> None:
+    """バックエンドで全行を合成し、結果を表示する。"""
+    started = time.perf_counter()
+    failed = 0
+    try:
+        backend.check()
+        for result in backend.synthesize(jobs, output_dir):
+            if result.error:
+                failed += 1
+                print(f"⚠ [{result.job.number}] {result.error}")
+            elif result.path is not None:
+                print(f"💾 [{result.job.number}] {result.path.name}（{result.elapsed:.2f}秒）")
+    finally:
+        backend.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ すべてのセリフを送信しました（{len(jobs)}件 / 失敗 {failed}件 / {elapsed:.1f}秒）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="シナリオ CSV のセリフを読み上げて WAV を作る")
+    parser.add_argument("--backend", choices=["aquestalk", "voicevox", "mock"], default=BACKEND, help="読み上げエンジン")
+    parser.add_argument("--url", default=VOICEVOX_URL, help="VOICEVOX エンジンの URL")
+    parser.add_argument("--speaker", type=int, default=VOICEVOX_SPEAKER, help="VOICEVOX の話者 ID")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="同時合成数")
+    args = parser.parse_args()
+
+    if not CSV_FILE.exists():
+        print(f"❌ CSV ファイルが見つかりません: {CSV_FILE}")
+        return
+
+    print(f"📄 CSV ファイル: {CSV_FILE}")
+    print(f"🎭 キャラクター: {TARGET_CHARACTER}")
+    print(f"   CSV の列名: {read_columns(CSV_FILE)}")
+    dictionary = load_reading_dictionary()
+
+    try:
+        jobs = load_jobs(dictionary)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return
+    if not jobs:
+        print("⚠ 読み上げるセリフがありません（実行・キャラクターの列を確認してください）")
+        return
+
+    try:
+        if args.backend == "aquestalk":
+            run(AquesTalkGuiBackend(), jobs)
+        elif args.backend == "voicevox":
+            run(VoicevoxBackend(args.url, args.speaker, args.concurrency), jobs)
+        else:
+            # 前回の mock の WAV を消してから書き出す
+            for old in MOCK_WAV_DIR.glob("*.wav"):
+                old.unlink()
+            print(f"🧪 疑似エンジンの無音の WAV は {MOCK_WAV_DIR}/ に書き出します（{WAV_DIR}/ は変更しません）")
+            with MockTtsEngine() as engine:
+                run(VoicevoxBackend(engine.url, args.speaker, args.concurrency), jobs, MOCK_WAV_DIR)
+    except TtsError as exc:
+        print(f"❌ {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,67 @@
 3. `pip install -r requirements.txt`（初回はモデル自動ダウンロード）
 4. `python scripts/auto_audio_to_vtt.py` を実行
 5. vtt_output/ に .vtt ファイルが出力されます
+
+バッチモード:
+- BATCH_MODE = True にすると audio_input/ 内の対象拡張子のファイルをすべて文字起こしします
+- モデルはワーカーごとに1回だけ読み込み、複数ファイルで使い回します
+- BATCH_WORKERS = None の場合、MODEL_MEMORY_GB と搭載メモリからワーカー数を自動決定します
+- ファイルごと・全体の実時間係数（RTF = 処理時間 / 音声長）を表示します
+
+ストリーミング出力（STREAMING_OUTPUT = True）:
+- 文が確定するたびに .vtt へ追記し、定期的に fsync します
+- 進捗を「出力名.vtt.progress.json」に記録し、途中で落ちても再実行で続きから再開します（文分割・デコードの設定を変えた場合は最初から）
+
+文字起こしキャッシュ（USE_TRANSCRIPT_CACHE = True）:
+- Whisper の単語タイムスタンプを cache/transcripts/ に保存します
+- 同じ音声・モデル条件なら Whisper を実行せず、文の分割と VTT 出力だけをやり直します
+
+チャンク並列モード（PARALLEL_CHUNKS = True）:
+- VAD で無音を検出し、CHUNK_MAX_SECONDS 以下のチャンクに無音の中央で分割します
+- チャンクを複数のワーカープロセスで並列に文字起こしし、時刻をずらして結合します
+- 分割点の無音は MAX_GAP_SECONDS より長いため、逐次処理と同じ位置で文が分かれます
+
+自動キャリブレーション（USE_CALIBRATION = True）:
+- `python scripts/calibrate_whisper.py` でこのマシンに合うモデルと計算精度を実測して保存しておくと、
+  起動時に MODEL_NAME / DEVICE / COMPUTE_TYPE をその値に置き換えます
+
+段階デコード（DECODE_MODE = "tiered"）:
+- まずバッチ推論・グリーディ探索で全体を高速に文字起こしします
+- 平均対数確率が低い・圧縮率が高いセグメントだけを、ビームサーチ（BEAM_SIZE）で再デコードします
+- 終了時に再デコードしたセグメント数と、全区間をビームサーチした場合の処理時間の外挿値（実測ではない目安）を表示します
+- チャンク並列モードとは併用できません（PARALLEL_CHUNKS = True の場合はチャンク並列を優先）
+
+デコード済み音声のキャッシュ（USE_PCM_CACHE = True）:
+- 音声を 16kHz モノラルの波形に1回だけデコードし、cache/pcm/ に .npy で保存します
+- 2回目以降はデコードせずメモリマップで読み込み、チャンク並列のワーカーも同じファイルを参照します
+- 音声ファイルが書き換えられた場合はデコードし直します
+
+文の分割は sentence_segmenter.py の配列ベースのエンジンで行います。
+SPLIT_ACROSS_SEGMENTS = True にすると、Whisper のセグメントをまたぐ無音でも分割します。
+
+常駐サーバー（USE_SERVER = True）:
+- `python scripts/transcription_server.py` を起動しておくと、モデルを読み込んだまま待機します
+- サーバーが動いていれば処理をサーバーに任せ、動いていなければ自分でモデルを読み込みます
 """
 
 from __future__ import annotations
 
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+import sentence_segmenter
+from audio_pcm_cache import PcmCache, load_pcm_file
+from transcript_cache import CachedSegment, CachedWord, TranscriptCache
 
-from faster_whisper import WhisperModel
+if TYPE_CHECKING:
+    # faster_whisper の読み込みは重いため、実際にモデルを使うときまで遅らせる
+    from faster_whisper import WhisperModel
 
 # ===================== 設定 =====================
 # 音声ファイルの入力ディレクトリ
@@ -37,6 +90,27 @@ DEVICE = "auto"
 # 計算精度: "auto" / "float16" / "int8_float16" など
 COMPUTE_TYPE = "auto"
 
+# True で calibrate_whisper.py が保存したこのマシン向けのモデル・計算精度を使う
+USE_CALIBRATION = True
+
+# キャリブレーション結果の保存先（ホスト名ごとに記録）
+CALIBRATION_PATH = Path("cache/whisper_calibration.json")
+
+# ビームサーチの幅
+BEAM_SIZE = 5
+
+# デコード方式: "beam"（全区間をビームサーチ）/ "tiered"（高速デコード後、怪しい箇所だけビームサーチ）
+DECODE_MODE = "beam"
+
+# 段階デコードの高速パスで一度に推論する区間数
+FAST_TIER_BATCH_SIZE = 8
+
+# 段階デコードで、平均対数確率がこれ未満のセグメントを再デコードする
+REDECODE_MIN_AVG_LOGPROB = -0.7
+
+# 段階デコードで、圧縮率がこれを超えるセグメント（繰り返しの疑い）を再デコードする
+REDECODE_MAX_COMPRESSION_RATIO = 2.4
+
 # 文を分ける無音ギャップのしきい値（秒）
 MAX_GAP_SECONDS = 0.2
 
@@ -45,8 +119,83 @@ MAX_SENTENCE_SECONDS: float | None = None
 
 # 句読点がなくても強制分割する単語数。None で無効
 MAX_SENTENCE_WORDS: int | None = None
+
+# True で Whisper のセグメントをまたぐ無音でも文を分割する（無音のないセグメントの境界では区切らない）。
+# 既定の False はセグメントの境界で必ず区切る従来どおりの分割で、これまでの VTT と字幕の区切りが変わらない
+SPLIT_ACROSS_SEGMENTS = False
+
+# True で AUDIO_DIR 内の全ファイルを一括で文字起こし（AUDIO_FILENAME は無視）
+BATCH_MODE = False
+
+# バッチモードのワーカープロセス数。None でメモリ量から自動決定
+BATCH_WORKERS: int | None = None
+
+# モデル1インスタンスあたりのメモリ使用量の目安（GB）
+MODEL_MEMORY_GB = {
+    "tiny": 0.5,
+    "base": 0.7,
+    "small": 1.2,
+    "medium": 2.5,
+    "large-v2": 4.0,
+    "large-v3": 4.0,
+}
+
+# ワーカー数の計算に使う搭載メモリの割合（OS や他アプリの分を残す）
+MEMORY_USAGE_RATIO = 0.6
+
+# True で文が確定するたびに VTT へ追記し、中断後の再実行で続きから再開する
+STREAMING_OUTPUT = True
+
+# ストリーミング出力で fsync とチェックポイント更新を行う間隔（秒）
+STREAM_SYNC_INTERVAL = 5.0
+
+# True で Whisper の単語タイムスタンプをキャッシュし、分割設定の変更時に再利用する
+USE_TRANSCRIPT_CACHE = True
+
+# 文字起こしキャッシュの保存先
+TRANSCRIPT_CACHE_DIR = Path("cache/transcripts")
+
+# 文字起こしキャッシュの上限サイズ（MB）。超えると古いものから削除
+TRANSCRIPT_CACHE_MAX_MB = 500
+
+# True でデコード済みの波形を保存し、再実行やチャンク並列で使い回す
+USE_PCM_CACHE = True
+
+# デコード済み波形の保存先
+PCM_CACHE_DIR = Path("cache/pcm")
+
+# デコード済み波形の上限サイズ（MB）。1時間の音声で約 230MB。超えると古いものから削除
+PCM_CACHE_MAX_MB = 2000
+
+# True で1ファイルを無音位置でチャンクに分け、複数プロセスで並列に文字起こしする
+PARALLEL_CHUNKS = False
+
+# チャンクの最大長（秒）
+CHUNK_MAX_SECONDS = 120.0
+
+# チャンクの分割点にする無音の最小長（秒）。MAX_GAP_SECONDS より短い値は切り上げる
+CHUNK_MIN_SILENCE_SECONDS = 0.5
+
+# チャンク並列のワーカープロセス数。None でメモリ量から自動決定
+CHUNK_WORKERS: int | None = None
+
+# True で常駐サーバー（transcription_server.py）が動いていれば処理を任せる
+USE_SERVER = True
+
+# 常駐サーバーの Unix ドメインソケットのパス
+SERVER_SOCKET_PATH = Path(tempfile.gettempdir()) / "fcp-auto-telop-whisper.sock"
 # ===================== 設定ここまで =====================
 
+# Whisper の入力サンプリングレート
+SAMPLING_RATE = 16000
+
+# プロセス内で使い回すモデル（get_model() で初回だけ読み込む）
+_shared_model = None
+_shared_model_threads = 0
+
+# バッチモードのワーカー内ではチャンク並列（プロセスの入れ子）を使わない
+_in_batch_worker = False
+
 
 def format_timestamp(seconds: float) -> str:
     """秒数を VTT タイムスタンプ形式に変換する。"""
@@ -77,22 +226,391 @@ def resolve_audio_path(filename: str, search_dir: Path, allowed_exts: List[str])
     raise FileNotFoundError(f"音声/動画ファイルが見つかりません: {stem} ({exts_str})")
 
 
-def transcribe_to_vtt(audio_path: Path) -> str:
-    """音声ファイルを文字起こしして VTT 形式のテキストを返す。"""
-    if not audio_path.exists():
-        raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+def list_audio_files(search_dir: Path, allowed_exts: List[str]) -> List[Path]:
+    """ディレクトリ内の対象拡張子の音声ファイルを名前順で返す。"""
+    exts = {ext.lower() for ext in allowed_exts}
+    return sorted(
+        p for p in search_dir.iterdir()
+        if p.is_file() and p.suffix.lower() in exts
+    )
+
+
+def calibration_host() -> str:
+    """キャリブレーション結果を記録するときのマシン名。"""
+    return socket.gethostname()
+
+
+def apply_calibration() -> Optional[dict]:
+    """保存済みのこのマシンの計測結果を MODEL_NAME / DEVICE / COMPUTE_TYPE に反映する。
+
+    反映した計測結果を返す。無効な場合や、このマシンの結果がない場合は None。
+    """
+    global MODEL_NAME, DEVICE, COMPUTE_TYPE
+    if not USE_CALIBRATION:
+        return None
+    try:
+        data = json.loads(CALIBRATION_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    entry = data.get("hosts", {}).get(calibration_host())
+    if entry is None:
+        return None
+    MODEL_NAME = entry["model_name"]
+    DEVICE = entry["device"]
+    COMPUTE_TYPE = entry["compute_type"]
+    return entry
+
+
+def report_calibration(entry: Optional[dict]) -> None:
+    """反映したキャリブレーション結果を表示する。"""
+    if entry is not None:
+        print(f"🎛 計測済みの設定を使用: {MODEL_NAME} / {DEVICE} / {COMPUTE_TYPE}（RTF {entry['rtf']:.3f}）")
 
-    model = WhisperModel(MODEL_NAME, device=DEVICE, compute_type=COMPUTE_TYPE)
-    segments, _info = model.transcribe(
-        str(audio_path),
-        beam_size=5,
+
+def load_model(cpu_threads: int = 0) -> WhisperModel:
+    """設定に従って Whisper モデルを読み込む。cpu_threads=0 でライブラリ既定値。"""
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        MODEL_NAME,
+        device=DEVICE,
+        compute_type=COMPUTE_TYPE,
+        cpu_threads=cpu_threads,
+    )
+
+
+def get_model() -> WhisperModel:
+    """プロセス内で共有するモデルを返す。初回呼び出し時にだけ読み込む。"""
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = load_model(cpu_threads=_shared_model_threads)
+    return _shared_model
+
+
+def total_memory_bytes() -> Optional[int]:
+    """搭載物理メモリ量（バイト）を返す。取得できない環境では None。"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def decide_worker_count(task_count: int, override: int | None = None) -> int:
+    """メモリ予算と CPU 数からワーカープロセス数を決める。
+
+    モデル1インスタンスあたり MODEL_MEMORY_GB を確保できる数を上限とし、
+    CPU コア数とタスク数も超えないようにする。override を指定するとその値を使う。
+    """
+    if override is not None:
+        return max(1, min(override, task_count))
+
+    cpu_count = os.cpu_count() or 1
+    limit = min(cpu_count, task_count)
+
+    memory = total_memory_bytes()
+    per_model = MODEL_MEMORY_GB.get(MODEL_NAME, max(MODEL_MEMORY_GB.values()))
+    if memory is not None:
+        budget = memory * MEMORY_USAGE_RATIO
+        limit = min(limit, int(budget // (per_model * 1024 ** 3)))
+
+    return max(1, limit)
+
+
+def run_whisper(model: WhisperModel, audio, clip_start: float = 0.0):
+    """Whisper で単語タイムスタンプ付きの文字起こしを行い、(セグメント, info) を返す。
+
+    audio にはファイルパスか、16kHz モノラルの波形配列を渡す。
+    """
+    return model.transcribe(
+        str(audio) if isinstance(audio, Path) else audio,
+        beam_size=BEAM_SIZE,
         word_timestamps=True,
         vad_filter=False,
+        clip_timestamps=[clip_start],
+    )
+
+
+def needs_redecode(seg) -> bool:
+    """高速パスの結果の信頼度が低く、ビームサーチで再デコードすべきセグメントか。"""
+    return seg.avg_logprob < REDECODE_MIN_AVG_LOGPROB or seg.compression_ratio > REDECODE_MAX_COMPRESSION_RATIO
+
+
+class TieredDecodeStats:
+    """段階デコードの集計（再デコードしたセグメント数と処理時間）。"""
+
+    def __init__(self):
+        self.segments = 0
+        self.redecoded = 0
+        self.redecoded_seconds = 0.0  # 再デコードした区間の音声長
+        self.fast_elapsed = 0.0
+        self.redecode_elapsed = 0.0
+
+    def report(self, audio_seconds: float) -> None:
+        """再デコード件数と、全区間をビームサーチした場合の処理時間の外挿値を表示する。
+
+        外挿値は再デコードした区間の処理速度から求めたもので、実測の比較ではない。
+        """
+        elapsed = self.fast_elapsed + self.redecode_elapsed
+        print(
+            f"🎚 段階デコード: {self.segments}セグメント中 {self.redecoded}件を再デコード"
+            f"（高速パス {self.fast_elapsed:.1f}秒 / 再デコード {self.redecode_elapsed:.1f}秒）"
+        )
+        if self.redecoded_seconds <= 0 or elapsed <= 0:
+            print("  ℹ️ 再デコードがなかったため、全区間ビームサーチの時間は外挿できません")
+            return
+        # 再デコードにかかった音声1秒あたりの時間から、全区間をビームサーチした場合の時間を外挿する。
+        # 短い区間ほど1秒あたりのコストが高く出るため、実測の速度比ではなく目安として扱う
+        beam_estimate = self.redecode_elapsed / self.redecoded_seconds * audio_seconds
+        print(
+            f"  📐 全区間ビームサーチの外挿値 {beam_estimate:.1f}秒（実測ではない目安）"
+            f" / 段階デコードの実測 {elapsed:.1f}秒"
+        )
+
+
+def transcribe_tiered(model: WhisperModel, audio, clip_start: float = 0.0) -> Tuple[Iterable, float]:
+    """段階デコードで文字起こしし、(セグメントの反復子, 音声長[秒]) を返す。
+
+    バッチ推論・グリーディ探索の結果を順に返し、needs_redecode() に当たる
+    セグメントだけ同じ区間をビームサーチでデコードし直した結果に置き換える。
+    """
+    from faster_whisper import BatchedInferencePipeline
+
+    if isinstance(audio, Path):
+        from faster_whisper.audio import decode_audio
+
+        audio = decode_audio(str(audio), sampling_rate=SAMPLING_RATE)
+    duration = len(audio) / SAMPLING_RATE
+    # 再開時は clip_start 以降だけをデコードし、時刻を元音声の位置にずらす
+    audio = audio[int(clip_start * SAMPLING_RATE):]
+    stats = TieredDecodeStats()
+
+    started = time.perf_counter()
+    fast_segments, _info = BatchedInferencePipeline(model=model).transcribe(
+        audio,
+        batch_size=FAST_TIER_BATCH_SIZE,
+        beam_size=1,
+        word_timestamps=True,
+    )
+    stats.fast_elapsed += time.perf_counter() - started
+
+    def iter_segments():
+        fast_iter = iter(fast_segments)
+        while True:
+            started = time.perf_counter()
+            seg = next(fast_iter, None)
+            stats.fast_elapsed += time.perf_counter() - started
+            if seg is None:
+                break
+            stats.segments += 1
+            if not needs_redecode(seg):
+                yield _offset_segment(seg, clip_start)
+                continue
+
+            started = time.perf_counter()
+            # 全体の波形に clip_timestamps を渡すとファイル全体の特徴量を計算し直すため、
+            # 該当区間だけを切り出してデコードし、時刻を区間の開始位置だけずらす
+            clip = audio[int(seg.start * SAMPLING_RATE):int(seg.end * SAMPLING_RATE)]
+            redecoded, _info = model.transcribe(
+                clip,
+                beam_size=BEAM_SIZE,
+                word_timestamps=True,
+                vad_filter=False,
+            )
+            redecoded = [_offset_segment(s, clip_start + seg.start) for s in redecoded]
+            stats.redecode_elapsed += time.perf_counter() - started
+            stats.redecoded += 1
+            stats.redecoded_seconds += seg.end - seg.start
+            yield from redecoded
+
+        stats.report(duration - clip_start)
+
+    return iter_segments(), duration
+
+
+def _offset_segment(seg, offset_sec: float) -> CachedSegment:
+    """セグメントと単語の時刻を offset_sec だけずらした CachedSegment を返す。"""
+    return CachedSegment(
+        seg.start + offset_sec,
+        seg.end + offset_sec,
+        seg.text,
+        [CachedWord(w.start + offset_sec, w.end + offset_sec, w.word) for w in (seg.words or [])],
+    )
+
+
+def plan_chunks(
+    speech_timestamps: List[dict],
+    total_samples: int,
+    max_samples: int,
+    min_silence_samples: int,
+) -> List[Tuple[int, int]]:
+    """発話区間の間の無音の中央で区切り、(開始, 終了) サンプル位置のチャンク一覧を返す。
+
+    各チャンクは max_samples 以下になるよう、収まる範囲で最も遠い無音で区切る。
+    max_samples 以内に十分な無音がない場合は、次に見つかった無音で区切る。
+    """
+    cut_candidates = [
+        (prev["end"] + curr["start"]) // 2
+        for prev, curr in zip(speech_timestamps, speech_timestamps[1:])
+        if curr["start"] - prev["end"] >= min_silence_samples
+    ]
+
+    chunks: List[Tuple[int, int]] = []
+    chunk_start = 0
+    last_fit: Optional[int] = None
+    for cut in cut_candidates:
+        if cut - chunk_start > max_samples and last_fit is not None:
+            chunks.append((chunk_start, last_fit))
+            chunk_start = last_fit
+            last_fit = None
+        if cut - chunk_start > max_samples:
+            # 上限内に無音がないときは、長くなってもこの無音で区切る
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+        else:
+            last_fit = cut
+
+    if total_samples - chunk_start > max_samples and last_fit is not None:
+        chunks.append((chunk_start, last_fit))
+        chunk_start = last_fit
+    if chunk_start < total_samples:
+        chunks.append((chunk_start, total_samples))
+    return chunks
+
+
+def _transcribe_chunk(audio, start: int, stop: int) -> List[CachedSegment]:
+    """ワーカー内で1チャンクを文字起こしし、時刻を元音声の位置にずらして返す。
+
+    audio にはデコード済み波形の .npy のパス（[start, stop) の範囲だけをメモリマップで読む）か、
+    チャンクの波形配列を渡す。
+    """
+    if isinstance(audio, Path):
+        audio = load_pcm_file(audio, start, stop)
+    offset_sec = start / SAMPLING_RATE
+    segments, _info = run_whisper(get_model(), audio)
+    return [_offset_segment(seg, offset_sec) for seg in segments]
+
+
+def use_parallel_chunks() -> bool:
+    """このプロセスでチャンク並列モードを使うかどうか。"""
+    return PARALLEL_CHUNKS and not _in_batch_worker
+
+
+def transcribe_chunked(audio_path: Path, clip_start: float = 0.0) -> Tuple[Iterable, float]:
+    """無音で区切ったチャンクを並列に文字起こしし、(セグメントの反復子, 音声長[秒]) を返す。
+
+    セグメントは元音声の時刻順に返す。clip_start より前に終わるチャンクは処理しない。
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    pcm_cache = open_pcm_cache()
+    if pcm_cache is not None:
+        # ワーカーには波形を送らず、.npy のパスとサンプル範囲だけを渡す
+        pcm_file = pcm_cache.entry_path(audio_path)
+        audio = load_pcm_file(pcm_file)
+    else:
+        from faster_whisper.audio import decode_audio
+
+        pcm_file = None
+        audio = decode_audio(str(audio_path), sampling_rate=SAMPLING_RATE)
+    min_silence = max(CHUNK_MIN_SILENCE_SECONDS, MAX_GAP_SECONDS)
+    speech = get_speech_timestamps(
+        audio,
+        vad_options=VadOptions(
+            min_silence_duration_ms=int(min_silence * 1000),
+            speech_pad_ms=0,
+        ),
+    )
+    chunks = plan_chunks(
+        speech,
+        len(audio),
+        int(CHUNK_MAX_SECONDS * SAMPLING_RATE),
+        int(min_silence * SAMPLING_RATE),
     )
+    chunks = [(s, e) for s, e in chunks if e / SAMPLING_RATE > clip_start]
+    duration = len(audio) / SAMPLING_RATE
+
+    workers = decide_worker_count(max(1, len(chunks)), override=CHUNK_WORKERS)
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"🧩 チャンク並列: {len(chunks)}チャンク（ワーカー {workers} / スレッド {cpu_threads}）")
+
+    def iter_segments():
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_chunk_worker,
+            initargs=(cpu_threads, server_settings()),
+        ) as executor:
+            futures = [
+                executor.submit(_transcribe_chunk, pcm_file or audio[s:e], s, e)
+                for s, e in chunks
+            ]
+            for future in futures:
+                yield from future.result()
+
+    return iter_segments(), duration
+
+
+def _init_chunk_worker(cpu_threads: int, settings: dict) -> None:
+    """チャンク並列のワーカープロセスの初期化。settings は親プロセスの server_settings()。"""
+    global _shared_model_threads
+    _shared_model_threads = cpu_threads
+    apply_settings(settings)
+
+
+def transcribe_segments(model: WhisperModel | None, audio_path: Path, clip_start: float = 0.0) -> Tuple[Iterable, float]:
+    """設定に応じた方式で文字起こしし、(セグメントの反復子, 音声長[秒]) を返す。"""
+    if use_parallel_chunks():
+        return transcribe_chunked(audio_path, clip_start)
+    if DECODE_MODE not in ("beam", "tiered"):
+        raise ValueError(f"DECODE_MODE は \"beam\" か \"tiered\" を指定してください: {DECODE_MODE}")
+    model = model or get_model()
+    audio = load_audio(audio_path)
+    if DECODE_MODE == "tiered":
+        return transcribe_tiered(model, audio, clip_start)
+    segments, info = run_whisper(model, audio, clip_start)
+    return segments, info.duration
+
+
+def open_pcm_cache() -> Optional[PcmCache]:
+    """設定に従ってデコード済み波形のキャッシュを返す。無効なら None。"""
+    if not USE_PCM_CACHE:
+        return None
+    return PcmCache(PCM_CACHE_DIR, PCM_CACHE_MAX_MB * 1024 * 1024, SAMPLING_RATE)
+
+
+def load_audio(audio_path: Path):
+    """Whisper に渡す音声を返す。キャッシュが有効ならメモリマップした波形、無効ならパス。"""
+    pcm_cache = open_pcm_cache()
+    if pcm_cache is None:
+        return audio_path
+    return pcm_cache.load(audio_path)
+
+
+def open_transcript_cache() -> Optional[TranscriptCache]:
+    """設定に従って文字起こしキャッシュを返す。無効なら None。"""
+    if not USE_TRANSCRIPT_CACHE:
+        return None
+    return TranscriptCache(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024)
+
+
+def decode_variant() -> str:
+    """デコード方式と、その結果に影響する設定を表す文字列。通常のビームサーチでは空文字列。"""
+    if use_parallel_chunks():
+        return f"chunked:{CHUNK_MAX_SECONDS}:{CHUNK_MIN_SILENCE_SECONDS}"
+    if DECODE_MODE == "tiered":
+        return f"tiered:{FAST_TIER_BATCH_SIZE}:{REDECODE_MIN_AVG_LOGPROB}:{REDECODE_MAX_COMPRESSION_RATIO}"
+    return ""
+
+
+def transcript_cache_key(cache: TranscriptCache, audio_path: Path) -> str:
+    """現在のモデル設定での文字起こしキャッシュのキーを返す。"""
+    return cache.make_key(audio_path, MODEL_NAME, COMPUTE_TYPE, BEAM_SIZE, decode_variant())
+
 
-    sentence_segments = split_into_sentences(segments)
+def sentences_to_vtt(sentences: Iterable[Tuple[float, float, str]]) -> str:
+    """(開始秒, 終了秒, テキスト) の並びを VTT 形式のテキストにする。"""
     lines: list[str] = ["WEBVTT", ""]
-    for start_sec, end_sec, text in sentence_segments:
+    for start_sec, end_sec, text in sentences:
         lines.append(f"{format_timestamp(start_sec)} --> {format_timestamp(end_sec)}")
         lines.append(text)
         lines.append("")
@@ -100,49 +618,49 @@ def transcribe_to_vtt(audio_path: Path) -> str:
     return "\n".join(lines).rstrip() + "\n"
 
 
-def split_into_sentences(segments: Iterable) -> List[Tuple[float, float, str]]:
-    """Whisper のセグメントを無音ギャップで文単位に分割する。"""
-    sentences: List[Tuple[float, float, str]] = []
-
-    for seg in segments:
-        words = seg.words or []
-        if not words:
-            sentences.append((seg.start, seg.end, seg.text.strip()))
-            continue
-
-        buffer: list[str] = []
-        start_time = words[0].start
-        last_end = words[0].end
-
-        for w in words:
-            word_text = w.word
-            start_w, end_w = w.start, w.end
-
-            # 無音ギャップで分割
-            if buffer and (start_w - last_end) > MAX_GAP_SECONDS:
-                sentences.append((start_time, last_end, "".join(buffer).strip()))
-                buffer = []
-                start_time = start_w
-
-            buffer.append(word_text)
-            last_end = end_w
-
-            over_time = (
-                MAX_SENTENCE_SECONDS is not None
-                and start_time is not None
-                and (last_end - start_time) >= MAX_SENTENCE_SECONDS
-            )
-            over_words = MAX_SENTENCE_WORDS is not None and len(buffer) >= MAX_SENTENCE_WORDS
+def transcribe_with_model(model: WhisperModel | None, audio_path: Path) -> Tuple[str, float]:
+    """文字起こしして (VTT テキスト, 音声長[秒]) を返す。
+
+    キャッシュにあれば Whisper は実行しない。model が None の場合は
+    必要になった時点で get_model() のモデルを使う。
+    """
+    if not audio_path.exists():
+        raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+
+    cache = open_transcript_cache()
+    if cache is not None:
+        cache_key = transcript_cache_key(cache, audio_path)
+        cached = cache.load(cache_key)
+        if cached is not None:
+            segments, duration = cached
+            return sentences_to_vtt(split_into_sentences(segments)), duration
 
-            if over_time or over_words:
-                sentences.append((start_time, last_end, "".join(buffer).strip()))
-                buffer = []
-                start_time = None
+    segments, duration = transcribe_segments(model, audio_path)
+    segments = list(segments)
+    if cache is not None:
+        cache.store(cache_key, segments, duration)
 
-        if buffer:
-            sentences.append((start_time or words[0].start, last_end, "".join(buffer).strip()))
+    return sentences_to_vtt(split_into_sentences(segments)), duration
 
-    return sentences
+
+def transcribe_to_vtt(audio_path: Path, model: WhisperModel | None = None) -> str:
+    """音声ファイルを文字起こしして VTT 形式のテキストを返す。
+
+    model を渡すと読み込み済みのモデルを使い回す。
+    """
+    vtt_text, _duration = transcribe_with_model(model, audio_path)
+    return vtt_text
+
+
+def split_into_sentences(segments: Iterable) -> List[Tuple[float, float, str]]:
+    """Whisper のセグメントを無音ギャップで文単位に分割する。"""
+    return sentence_segmenter.split_into_sentences(
+        segments,
+        MAX_GAP_SECONDS,
+        MAX_SENTENCE_SECONDS,
+        MAX_SENTENCE_WORDS,
+        cross_segment=SPLIT_ACROSS_SEGMENTS,
+    )
 
 
 def save_vtt(vtt_text: str, output_path: Path) -> None:
@@ -151,14 +669,360 @@ def save_vtt(vtt_text: str, output_path: Path) -> None:
     output_path.write_text(vtt_text, encoding="utf-8")
 
 
+def checkpoint_path_for(output_path: Path) -> Path:
+    """ストリーミング出力のチェックポイント（サイドカー JSON）のパスを返す。"""
+    return output_path.with_name(output_path.name + ".progress.json")
+
+
+class StreamingVttWriter:
+    """VTT を1キューずつ追記し、耐久化済みの位置をチェックポイントに記録する。
+
+    チェックポイントには fsync 済みのバイト数と、そこまでに書き終えた
+    音声タイムスタンプ（秒）を保存する。再開時は VTT をそのバイト数まで
+    切り詰めてから追記を続けるため、fsync 前に落ちた書きかけのキューは残らない。
+    """
+
+    def __init__(self, output_path: Path, audio_path: Path, sync_interval: float = STREAM_SYNC_INTERVAL):
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path_for(output_path)
+        self.sync_interval = sync_interval
+        self.source = self._source_info(audio_path)
+        self.resume_offset = 0.0
+        self.cue_count = 0
+        # (書き終えたバイト数, そこまでの音声タイムスタンプ, キュー数) を1つの値として更新する
+        self._committed = (0, 0.0, 0)
+        self._last_sync = 0.0
+        self._file = None
+
+    @staticmethod
+    def _source_info(audio_path: Path) -> dict:
+        """入力ファイルと、出力を左右する設定の同一性チェック用の情報を返す。
+
+        どれかが前回と異なる場合は、途中までの VTT と区切りが合わないため最初からやり直す。
+        """
+        stat = audio_path.stat()
+        return {
+            "path": str(audio_path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "model": MODEL_NAME,
+            "compute_type": COMPUTE_TYPE,
+            "beam_size": BEAM_SIZE,
+            "decode_mode": DECODE_MODE,
+            "decode_variant": decode_variant(),
+            "max_gap_seconds": MAX_GAP_SECONDS,
+            "max_sentence_seconds": MAX_SENTENCE_SECONDS,
+            "max_sentence_words": MAX_SENTENCE_WORDS,
+            "split_across_segments": SPLIT_ACROSS_SEGMENTS,
+        }
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        """再開可能なチェックポイントがあれば返す。"""
+        if not self.checkpoint_path.exists() or not self.output_path.exists():
+            return None
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("source") != self.source:
+            return None
+        if self.output_path.stat().st_size < checkpoint.get("bytes", 0):
+            return None
+        return checkpoint
+
+    def open(self) -> float:
+        """出力を開き、再開位置（秒）を返す。新規の場合は 0.0。"""
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = self._load_checkpoint()
+
+        if checkpoint is None:
+            self._file = open(self.output_path, "wb")
+            self._file.write(b"WEBVTT\n")
+        else:
+            self._file = open(self.output_path, "r+b")
+            self._file.seek(checkpoint["bytes"])
+            self._file.truncate()
+            self.resume_offset = checkpoint["last_end"]
+            self.cue_count = checkpoint["cues"]
+
+        self._committed = (self._file.tell(), self.resume_offset, self.cue_count)
+        self.sync()
+        return self.resume_offset
+
+    def write_sentences(self, sentences: Iterable[Tuple[float, float, str]], segment_end: float) -> None:
+        """確定した文を追記し、segment_end までの音声を書き終えたものとして記録する。"""
+        chunk: list[str] = []
+        for start_sec, end_sec, text in sentences:
+            # 再開直後に前回分と重なる文は書かない
+            if end_sec <= self.resume_offset:
+                continue
+            chunk.append(f"\n{format_timestamp(start_sec)} --> {format_timestamp(end_sec)}\n{text}\n")
+
+        self._file.write("".join(chunk).encode("utf-8"))
+        self.cue_count += len(chunk)
+        self._committed = (
+            self._file.tell(),
+            max(self._committed[1], segment_end),
+            self.cue_count,
+        )
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """fsync してからチェックポイントを原子的に更新する。"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        committed_bytes, last_end, cues = self._committed
+        checkpoint = {
+            "source": self.source,
+            "last_end": last_end,
+            "bytes": committed_bytes,
+            "cues": cues,
+        }
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(checkpoint, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+        self._last_sync = time.monotonic()
+
+    def finish(self) -> None:
+        """最後まで書き終えたらファイルを閉じ、チェックポイントを削除する。"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """中断時にチェックポイントを残したままファイルを閉じる。"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def transcribe_streaming(model: WhisperModel | None, audio_path: Path, output_path: Path) -> float:
+    """セグメントを受け取るたびに VTT へ追記しながら文字起こしし、音声長[秒]を返す。
+
+    前回の実行が途中で止まっていた場合は、チェックポイントの位置から再開する。
+    キャッシュにあれば Whisper は実行せず、分割結果をまとめて書き出す。
+    """
+    if not audio_path.exists():
+        raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+
+    cache = open_transcript_cache()
+    if cache is not None:
+        cache_key = transcript_cache_key(cache, audio_path)
+        cached = cache.load(cache_key)
+        if cached is not None:
+            segments, duration = cached
+            save_vtt(sentences_to_vtt(split_into_sentences(segments)), output_path)
+            checkpoint_path_for(output_path).unlink(missing_ok=True)
+            print("⚡ キャッシュから VTT を作成しました")
+            return duration
+
+    writer = StreamingVttWriter(output_path, audio_path)
+    resume_offset = writer.open()
+    if resume_offset > 0:
+        print(f"↩ 前回の続きから再開: {format_timestamp(resume_offset)}（{writer.cue_count}件出力済み）")
+
+    collected = []
+    try:
+        segments, duration = transcribe_segments(model, audio_path, clip_start=resume_offset)
+        groups = sentence_segmenter.iter_closed_groups(segments, MAX_GAP_SECONDS, SPLIT_ACROSS_SEGMENTS)
+        for group in groups:
+            collected.extend(group)
+            writer.write_sentences(split_into_sentences(group), group[-1].end)
+    except BaseException:
+        writer.close()
+        raise
+
+    writer.finish()
+    # 途中から再開した場合は前半の単語がないため、キャッシュには保存しない
+    if cache is not None and resume_offset == 0:
+        cache.store(cache_key, collected, duration)
+    return duration
+
+
+def transcribe_file(audio_path: Path, output_path: Path) -> float:
+    """設定に従って1ファイルを文字起こしして output_path に保存し、音声長[秒]を返す。"""
+    if STREAMING_OUTPUT:
+        return transcribe_streaming(None, audio_path, output_path)
+    vtt_text, duration = transcribe_with_model(None, audio_path)
+    save_vtt(vtt_text, output_path)
+    return duration
+
+
+def server_settings() -> dict:
+    """常駐サーバーやワーカープロセスに渡す、結果に影響する設定値。"""
+    return {
+        "MODEL_NAME": MODEL_NAME,
+        "DEVICE": DEVICE,
+        "COMPUTE_TYPE": COMPUTE_TYPE,
+        "BEAM_SIZE": BEAM_SIZE,
+        "DECODE_MODE": DECODE_MODE,
+        "FAST_TIER_BATCH_SIZE": FAST_TIER_BATCH_SIZE,
+        "REDECODE_MIN_AVG_LOGPROB": REDECODE_MIN_AVG_LOGPROB,
+        "REDECODE_MAX_COMPRESSION_RATIO": REDECODE_MAX_COMPRESSION_RATIO,
+        "MAX_GAP_SECONDS": MAX_GAP_SECONDS,
+        "MAX_SENTENCE_SECONDS": MAX_SENTENCE_SECONDS,
+        "MAX_SENTENCE_WORDS": MAX_SENTENCE_WORDS,
+        "SPLIT_ACROSS_SEGMENTS": SPLIT_ACROSS_SEGMENTS,
+        "STREAMING_OUTPUT": STREAMING_OUTPUT,
+        "USE_TRANSCRIPT_CACHE": USE_TRANSCRIPT_CACHE,
+        "USE_PCM_CACHE": USE_PCM_CACHE,
+        "PARALLEL_CHUNKS": PARALLEL_CHUNKS,
+        "CHUNK_MAX_SECONDS": CHUNK_MAX_SECONDS,
+        "CHUNK_MIN_SILENCE_SECONDS": CHUNK_MIN_SILENCE_SECONDS,
+        "CHUNK_WORKERS": CHUNK_WORKERS,
+    }
+
+
+def transcribe_via_server(audio_path: Path, output_path: Path) -> Optional[float]:
+    """常駐サーバーに文字起こしを依頼し、音声長[秒]を返す。
+
+    サーバーが起動していない場合は None を返す（呼び出し側で自分で処理する）。
+    サーバー側で失敗した場合は RuntimeError を送出する。
+    """
+    if not USE_SERVER or not hasattr(socket, "AF_UNIX"):
+        return None
+
+    request = {
+        "audio_path": str(audio_path.resolve()),
+        "output_path": str(output_path.resolve()),
+        "settings": server_settings(),
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(SERVER_SOCKET_PATH))
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+    if not line:
+        raise RuntimeError("常駐サーバーとの接続が切れました")
+    response = json.loads(line)
+    if response.get("status") == "mismatch":
+        print(f"⚠ 常駐サーバーのモデル設定が異なるため使いません: {response.get('error')}")
+        return None
+    if response.get("status") != "ok":
+        raise RuntimeError(f"常駐サーバーでの文字起こしに失敗しました: {response.get('error')}")
+
+    if response.get("ignored"):
+        print(f"⚠ 常駐サーバーが対応していない設定は使われませんでした: {', '.join(response['ignored'])}")
+    print(f"⚡ 常駐サーバーで処理しました（待ち {response['queued']:.1f}秒 / 処理 {response['elapsed']:.1f}秒）")
+    return response["duration"]
+
+
+def apply_settings(settings: dict) -> None:
+    """server_settings() で得た設定値をこのプロセスのモジュール設定に反映する。
+
+    spawn で起動したワーカーはモジュールを読み直して既定値に戻るため、
+    親プロセスで反映したキャリブレーションや常駐サーバーの依頼ごとの設定をこれで引き継ぐ。
+    """
+    globals().update(settings)
+
+
+def _init_batch_worker(cpu_threads: int, settings: dict) -> None:
+    """ワーカープロセスの初期化。モデルは必要になった時点でプロセスにつき1回だけ読み込む。"""
+    global _shared_model_threads, _in_batch_worker
+    _shared_model_threads = cpu_threads
+    _in_batch_worker = True
+    apply_settings(settings)
+
+
+def _transcribe_batch_file(audio_path: Path) -> Tuple[Path, float, float]:
+    """ワーカー内で1ファイルを文字起こしして保存し、(パス, 音声長, 処理時間) を返す。"""
+    output_path = VTT_DIR / audio_path.with_suffix(".vtt").name
+    started = time.perf_counter()
+    duration = transcribe_file(audio_path, output_path)
+    return audio_path, duration, time.perf_counter() - started
+
+
+def format_rtf(duration: float, elapsed: float) -> str:
+    """実時間係数（処理時間 / 音声長）を表示用の文字列にする。"""
+    if duration <= 0:
+        return "RTF -"
+    return f"RTF {elapsed / duration:.2f}"
+
+
+def _report_batch_result(audio_path: Path, outcome, failures: list[Path]) -> float:
+    """1ファイル分の結果を表示し、集計用の音声長を返す。"""
+    if isinstance(outcome, Exception):
+        print(f"  ❌ {audio_path.name}: {outcome}")
+        failures.append(audio_path)
+        return 0.0
+
+    _path, duration, elapsed = outcome
+    print(f"  ✅ {audio_path.name}: 音声 {duration:.1f}秒 / 処理 {elapsed:.1f}秒 / {format_rtf(duration, elapsed)}")
+    return duration
+
+
+def run_batch() -> None:
+    """AUDIO_DIR 内の全ファイルを文字起こしする。"""
+    audio_files = list_audio_files(AUDIO_DIR, ALLOWED_EXTS)
+    if not audio_files:
+        exts_str = ", ".join(ALLOWED_EXTS)
+        print(f"⚠ 対象ファイルがありません: {AUDIO_DIR} ({exts_str})")
+        return
+
+    workers = decide_worker_count(len(audio_files), override=BATCH_WORKERS)
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"🎙 バッチ文字起こし開始: {len(audio_files)}件（ワーカー {workers} / スレッド {cpu_threads}）")
+    print(f"📂 出力先: {VTT_DIR}")
+
+    started = time.perf_counter()
+    total_duration = 0.0
+    failures: list[Path] = []
+
+    if workers == 1:
+        # 1ワーカーならプロセスを立てずにこのプロセスでモデルを使い回す
+        _init_batch_worker(cpu_threads, server_settings())
+        for audio_path in audio_files:
+            try:
+                outcome = _transcribe_batch_file(audio_path)
+            except Exception as exc:  # noqa: BLE001
+                outcome = exc
+            total_duration += _report_batch_result(audio_path, outcome, failures)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(cpu_threads, server_settings()),
+        ) as executor:
+            futures = {executor.submit(_transcribe_batch_file, p): p for p in audio_files}
+            for future in as_completed(futures):
+                audio_path = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    outcome = exc
+                total_duration += _report_batch_result(audio_path, outcome, failures)
+
+    wall = time.perf_counter() - started
+    done = len(audio_files) - len(failures)
+    print(f"✅ 完了: {done}/{len(audio_files)}件 / 音声 {total_duration:.1f}秒 / 処理 {wall:.1f}秒 / 全体 {format_rtf(total_duration, wall)}")
+    for audio_path in failures:
+        print(f"❌ 失敗: {audio_path}")
+
+
 def main() -> None:
+    report_calibration(apply_calibration())
+
+    if BATCH_MODE:
+        run_batch()
+        return
+
     audio_path = resolve_audio_path(AUDIO_FILENAME, AUDIO_DIR, ALLOWED_EXTS)
     output_path = VTT_DIR / audio_path.with_suffix(".vtt").name
 
     print(f"🎙 文字起こし開始: {audio_path}")
     print(f"📂 出力先: {output_path}")
-    vtt_text = transcribe_to_vtt(audio_path)
-    save_vtt(vtt_text, output_path)
+    if transcribe_via_server(audio_path, output_path) is None:
+        transcribe_file(audio_path, output_path)
     print(f"✅ 完了: {output_path}")
 
 
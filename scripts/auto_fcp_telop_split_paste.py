@@ -13,12 +13,14 @@ TXT ファイルからセリフを読み込み、FCP のタイムライン上で
 5. `python scripts/auto_fcp_telop_split_paste.py` を実行
 """
 
+import argparse
 import os
-import re
 import sys
-import pyautogui
 import time
-import pyperclip
+
+from screen_wait import PyAutoGuiScreen, ScreenWaiter
+from subtitle_parser import iter_text_lines
+from telop_plan import Action, execute, optimize, print_plan
 
 # ===================== 設定 =====================
 # セリフ TXT ファイル（txt_input/ ディレクトリに配置）
@@ -33,36 +35,22 @@ SLEEP_SHORT = 0.5
 SLEEP_LONG = 3
 # 開始前のカウントダウン（秒）
 SLEEP_COUNTDOWN = 5
-# ===================== 設定ここまで =====================
 
+# True で固定ウェイトの代わりに画面の変化が止まるまで待つ（上のウェイトは待ち時間の上限になる）
+USE_SCREEN_WAIT = True
+# 変化を監視する画面領域 (left, top, width, height)。None で画面全体
+# タイムラインとインスペクタを含む範囲に絞ると速くなります（get_mouse_positions.py で取得）
+WAIT_REGION = None
+# ===================== 設定ここまで =====================
 
-def is_metadata_line(line: str) -> bool:
-    """VTT / SRT のメタデータ行かどうかを判定する。
-
-    スキップ対象:
-    - 空行
-    - # で始まるコメント行
-    - "WEBVTT" ヘッダー
-    - タイムスタンプ行（例: 00:00:00.000 --> 00:00:04.220）
-    - 連番行（数字のみ）
-    """
-    s = line.strip()
-    if not s:
-        return True
-    if s.startswith("#"):
-        return True
-    if s == "WEBVTT":
-        return True
-    if re.fullmatch(r"[\d:.,\- >]+", s):
-        return True
-    return False
+waiter = ScreenWaiter(PyAutoGuiScreen(), WAIT_REGION, enabled=USE_SCREEN_WAIT)
 
 
 def load_voices_from_txt(txt_path: str) -> list[str]:
     """TXT / VTT / SRT ファイルからセリフを読み込む。
 
     メタデータ行（空行・コメント・ヘッダー・タイムスタンプ・連番）を除いた
-    テキスト行のみを返す。
+    テキスト行のみを返す（判定は subtitle_parser.is_metadata_line()）。
 
     Args:
         txt_path: ファイルのパス
@@ -75,14 +63,7 @@ def load_voices_from_txt(txt_path: str) -> list[str]:
         print(f"   txt_input/ ディレクトリにファイルを配置してください。")
         sys.exit(1)
 
-    with open(txt_path, encoding="utf-8") as f:
-        lines = f.readlines()
-
-    voices = [
-        line.rstrip("\n")
-        for line in lines
-        if not is_metadata_line(line)
-    ]
+    voices = [cue.text for cue in iter_text_lines(txt_path)]
 
     if not voices:
         print(f"❌ セリフが見つかりません: {txt_path}")
@@ -91,7 +72,48 @@ def load_voices_from_txt(txt_path: str) -> list[str]:
     return voices
 
 
+def build_plan(voice_list: list[str]) -> list[Action]:
+    """分割と貼り付けの操作を、実行順に並べたプランにする（最適化前）。
+
+    voice_list は入力する順（後ろのクリップから）に並べたセリフ。
+    """
+    plan = []
+
+    # テキストクリップを分割
+    # N 本のセリフに対して N-1 回カット → N クリップ完成
+    for _ in range(len(voice_list) - 1):
+        # 次のクリップに移動
+        plan.append(Action("next_clip", wait=SLEEP_SHORT))
+        # ボイス.mp3 の接合箇所に移動
+        plan.append(Action("down", wait=SLEEP_SHORT))
+        # テキストクリップを分割（Command + B）
+        plan.append(Action("blade", wait=SLEEP_SHORT))
+
+    # 最後のテキストクリップに移動する
+    plan.append(Action("next_clip", wait=SLEEP_SHORT))
+
+    # ループでセリフを入力する
+    for i, voice in enumerate(voice_list):
+        if i == 0:
+            # 最初はテキストエリアをクリック
+            plan.append(Action("focus", f"{INPUT_X},{INPUT_Y}", wait=SLEEP_LONG))
+        else:
+            # 2回目以降は Tab で移動
+            plan.append(Action("tab", wait=SLEEP_SHORT))
+        # 全選択して貼り付け（Command + A → Command + V）
+        plan.append(Action("select_all", wait=SLEEP_SHORT))
+        plan.append(Action("paste", voice, wait=SLEEP_SHORT))
+        # 前のクリップへ移動（Command + Left）
+        plan.append(Action("prev_clip", wait=SLEEP_SHORT))
+
+    return plan
+
+
 def main():
+    parser = argparse.ArgumentParser(description="FCP のテキストクリップを分割し、TXT のセリフを貼り付ける")
+    parser.add_argument("--dry-run", action="store_true", help="操作せず、実行プランと見積もり時間だけを表示する")
+    args = parser.parse_args()
+
     # TXT からセリフを読み込み
     voice_list = load_voices_from_txt(TXT_FILE)
 
@@ -107,74 +129,22 @@ def main():
     # 後ろから入力するため逆順にする
     voice_list = voice_list[::-1]
 
+    original_plan = build_plan(voice_list)
+    # 固定ウェイトでは、まとめた待ち時間を合計して従来と同じだけ待つ
+    plan = optimize(original_plan, sum_waits=not waiter.enabled)
+    print_plan(plan, SLEEP_SHORT, original=original_plan, verbose=args.dry_run)
+    if args.dry_run:
+        return
+
     print("準備")
     print("テキストフィールドが見える状態にしておきます。")
     print(f"⏱ {SLEEP_COUNTDOWN}秒後に開始します。Final Cut Pro をアクティブにしておいてください！")
     time.sleep(SLEEP_COUNTDOWN)
 
-    # テキストクリップを分割
-    # N 本のセリフに対して N-1 回カット → N クリップ完成
-    cut_count = len(voice_list) - 1
-
-    for _ in range(cut_count):
-        # 次のクリップに移動
-        pyautogui.keyDown("command")
-        pyautogui.press("right")
-        pyautogui.keyUp("command")
-        time.sleep(SLEEP_SHORT)
-
-        # ボイス.mp3 の接合箇所に移動
-        pyautogui.press("down")
-        time.sleep(SLEEP_SHORT)
-
-        # テキストクリップを分割（Command + B）
-        pyautogui.keyDown("command")
-        pyautogui.press("b")
-        pyautogui.keyUp("command")
-        time.sleep(SLEEP_SHORT)
-
-    # 最後のテキストクリップに移動する
-    pyautogui.keyDown("command")
-    pyautogui.press("right")
-    pyautogui.keyUp("command")
-    time.sleep(SLEEP_SHORT)
-
-    # ループでセリフを入力する
-    for i, voice in enumerate(voice_list):
-        print(f"  [{i + 1}/{len(voice_list)}] {voice}")
-
-        # クリップボードにコピー
-        pyperclip.copy(voice)
-
-        # テキストフィールドに移動
-        if i == 0:
-            # 最初はテキストエリアをクリック
-            pyautogui.click(INPUT_X, INPUT_Y)
-            time.sleep(SLEEP_LONG)
-        else:
-            # 2回目以降は Tab で移動
-            pyautogui.press("tab")
-            time.sleep(SLEEP_SHORT)
-
-        # 全選択（Command + A）
-        pyautogui.keyDown("command")
-        pyautogui.press("a")
-        pyautogui.keyUp("command")
-        time.sleep(SLEEP_SHORT)
-
-        # 貼り付け（Command + V）
-        pyautogui.keyDown("command")
-        pyautogui.press("v")
-        pyautogui.keyUp("command")
-        time.sleep(SLEEP_SHORT)
-
-        # 前のクリップへ移動（Command + Left）
-        pyautogui.keyDown("command")
-        pyautogui.press("left")
-        pyautogui.keyUp("command")
-        time.sleep(SLEEP_SHORT)
+    execute(plan, waiter, SLEEP_SHORT)
 
     print("✅ すべてのテロップを入力しました")
+    waiter.report()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
+import argparse
 import os
-import sys
 import time
-from decimal import Decimal, ROUND_HALF_UP
-import pyautogui
-import pyperclip
+from pathlib import Path
+
+from screen_wait import PyAutoGuiScreen, ScreenWaiter
+from subtitle_parser import parse_subtitle_from_file
+from telop_journal import TelopJournal, source_info
+from telop_plan import Action, execute, optimize, print_plan
+from timeline import TICKS_PER_MS, TICKS_PER_SECOND, FrameRate, seconds_to_ticks, to_timecodes
 
 # ====== 環境依存パラメータ（あなたの環境に合わせて調整） ======
 
@@ -15,7 +19,9 @@ INPUT_FILE = "vtt_input/sample.vtt"
 INPUT_X, INPUT_Y = 955, 204
 
 # タイムラインのフレームレート
-FPS = 25  # プロジェクトに合わせて変更
+FPS = 25  # プロジェクトに合わせて変更（23.976 / 29.97 / 59.94 も可）
+# True でドロップフレームのタイムコードを使う（29.97 / 59.94 のみ）
+DROP_FRAME = False
 
 # セリフ間隔の最小ギャップ（秒）。これ以下なら開始時刻を押し出す。
 MIN_GAP_SEC = 0.1
@@ -27,238 +33,120 @@ SLEEP_CLIP_MOVE = 1
 # 開始前のカウントダウン（秒）
 SLEEP_COUNTDOWN = 5
 
-# ====== 設定ここまで ======
-
+# True で固定ウェイトの代わりに画面の変化が止まるまで待つ（上のウェイトは待ち時間の上限になる）
+USE_SCREEN_WAIT = True
+# 変化を監視する画面領域 (left, top, width, height)。None で画面全体
+# タイムラインとインスペクタを含む範囲に絞ると速くなります（get_mouse_positions.py で取得）
+WAIT_REGION = None
 
-# =====================================================
-# パーサー（VTT / SRT 共通）
-# =====================================================
+# 完了したカット・貼り付けの記録先（--resume で続きから再開するときに使う）
+JOURNAL_DIR = Path("cache/telop_journal")
 
-def normalize_time(time_str: str) -> str:
-    """時刻文字列をピリオド区切りに正規化する。
-    SRT のカンマ区切り（"00:00:01,060"）と VTT のピリオド区切り（"00:00:01.060"）
-    の両方を受け付け、内部形式（ピリオド区切り）に統一する。
-    """
-    return time_str.replace(",", ".")
+# ====== 設定ここまで ======
 
-def parse_subtitle_from_file(file_path: str):
-    """VTT または SRT ファイルをパースして、[{start, end, text}, ...] を返す。
+waiter = ScreenWaiter(PyAutoGuiScreen(), WAIT_REGION, enabled=USE_SCREEN_WAIT)
+RATE = FrameRate.parse(FPS, DROP_FRAME)
 
-    拡張子で形式を判別し、どちらの形式でも同一の辞書リストを返す。
-    時刻は内部的にピリオド区切り（VTT形式）に正規化される。
-    """
-    if not os.path.exists(file_path):
-        ext = os.path.splitext(file_path)[1].lower()
-        dir_hint = "vtt_input/" if ext == ".vtt" else "srt_input/"
-        print(f"❌ ファイルが見つかりません: {file_path}")
-        print(f"   {dir_hint} ディレクトリにファイルを配置してください。")
-        sys.exit(1)
-
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext not in (".vtt", ".srt"):
-        print(f"❌ 未対応のファイル形式です: {ext}（.vtt または .srt を指定してください）")
-        sys.exit(1)
-
-    with open(file_path, encoding="utf-8") as f:
-        text = f.read()
-
-    blocks = text.strip().split("\n\n")
-    cues = []
-    for block in blocks:
-        b = block.strip()
-        if not b:
-            continue
-        # VTT ヘッダーをスキップ
-        if b.startswith("WEBVTT"):
-            continue
-
-        lines = [l for l in b.splitlines() if l.strip() != ""]
-        if not lines:
-            continue
-
-        # タイムスタンプ行を探す（"-->" を含む行）
-        time_line_index = None
-        for idx, line in enumerate(lines):
-            if "-->" in line:
-                time_line_index = idx
-                break
-        if time_line_index is None:
-            continue
-
-        time_line = lines[time_line_index]
-        parts = time_line.split("-->")
-        if len(parts) != 2:
-            continue
-
-        # SRT のカンマ区切りも含めてピリオド区切りに正規化
-        start = normalize_time(parts[0].strip())
-        end = normalize_time(parts[1].strip())
-        text_lines = lines[time_line_index + 1:]
-        cue_text = "\n".join(text_lines).strip()
-        if cue_text:
-            cues.append({"start": start, "end": end, "text": cue_text})
-    return cues
 
 # =====================================================
-# 時刻変換系（Decimalで精度維持し、フレームは0〜fps-1に正規化）
+# カットポイント抽出（時刻は timeline のティックで扱う）
 # =====================================================
 
-def vtt_time_to_tc_string(vtt_time: str, fps: int = FPS) -> str:
-    """
-    "00:00:04.288" → "00:00:04:09" のような FCP向けタイムコード文字列に変換。
-    フレーム計算は Decimal で行い、切り上げでfpsに達したら秒を+1してフレーム0に繰り上げる。
-    """
-    h, m, s = vtt_time.split(":")
-
-    # 00:00:00.000 の場合は 00:00:00.100 に変換
-    if h == "00" and m == "00" and s == "00.000":
-        s = "00.100"
-        print("00:00:00.000 は 00:00:00.100 に変換されました")
-
-    sec_dec = Decimal(s)
-    total_sec_dec = Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + sec_dec
-
-    # 整数秒は切り捨て、残りをフレーム化
-    sec_int = int(total_sec_dec)  # floor
-    frac = total_sec_dec - Decimal(sec_int)
-
-    frame_dec = (frac * fps).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-    frame = int(frame_dec)
-
-    if frame >= fps:
-        frame = 0
-        sec_int += 1
-
-    h_out = sec_int // 3600
-    m_out = (sec_int % 3600) // 60
-    s_out = sec_int % 60
-
-    return f"{h_out:02d}:{m_out:02d}:{s_out:02d}:{frame:02d}"
-
-def vtt_time_to_seconds(vtt_time: str) -> float:
-    """"00:00:04.288" → 秒数(float)に変換。Decimalで精度維持。"""
-    h, m, s = vtt_time.split(":")
-    sec_dec = Decimal(s)
-    total_sec_dec = Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + sec_dec
-    return float(total_sec_dec)
+def collect_cut_points(cues):
+    """開始・終了時刻を集め、昇順に並べて近すぎるカットを押し出したティックのリストを返す。
 
-def add_offset_to_vtt_time(vtt_time: str, offset_sec: float = 0.1) -> str:
-    """
-    VTT形式の時刻に offset_sec 秒を加算した新しい VTT 時刻文字列を返す。
-    ミリ秒まで四捨五入し、桁あふれがあれば繰り上げる。
-    """
-    h, m, s = vtt_time.split(":")
-    sec_dec = Decimal(s)
-    base_ms = (Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + sec_dec) * Decimal(1000)
-    offset_ms = (Decimal(str(offset_sec)) * Decimal(1000)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-    total_ms = (base_ms + offset_ms).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-
-    total_ms_int = int(total_ms)
-    h_out = total_ms_int // 3_600_000
-    rem = total_ms_int % 3_600_000
-    m_out = rem // 60_000
-    rem = rem % 60_000
-    s_out = rem // 1_000
-    ms_out = rem % 1_000
-
-    return f"{h_out:02d}:{m_out:02d}:{s_out:02d}.{ms_out:03d}"
-
-def move_playhead_to_time(vtt_time: str):
+    直前のカットとの間隔が MIN_GAP_SEC 以下の時刻は、MIN_GAP_SEC 刻みで
+    間隔が MIN_GAP_SEC を超えるまで後ろへずらす（重複時刻もこれで避けられる）。
     """
-    指定時刻に再生ヘッドを移動する。
-    ctrl+p → Cmd+V → Enter
-    """
-    tc_str = vtt_time_to_tc_string(vtt_time)
-    print(f"[INFO] Move playhead to {vtt_time} (TC: {tc_str})")
-
-    pyautogui.keyDown("ctrl")
-    pyautogui.press("p")
-    pyautogui.keyUp("ctrl")
-    time.sleep(SLEEP_SHORT)
-
-    pyperclip.copy(tc_str)
-    pyautogui.hotkey("command", "v")
-    time.sleep(SLEEP_SHORT)
-
-    pyautogui.press("enter")
-    time.sleep(SLEEP_SHORT)
+    gap = seconds_to_ticks(MIN_GAP_SEC)
+    points = sorted(ms * TICKS_PER_MS for cue in cues for ms in (cue.start_ms, cue.end_ms))
+
+    cut_points = []
+    for t in points:
+        if cut_points and t - cut_points[-1] <= gap:
+            # gap 刻みで何回ずらせば間隔が gap を超えるか
+            t += ((cut_points[-1] + gap - t) // gap + 1) * gap
+        cut_points.append(t)
+    return cut_points
+
+
+def cut_timecodes(cut_points):
+    """カットポイント（ティック）を FCP に入力するタイムコードにまとめて変換する。"""
+    # 0秒ちょうどは FCP で分割できないため、0.1秒にずらす
+    zero = [i for i, t in enumerate(cut_points) if t == 0]
+    if zero:
+        cut_points = list(cut_points)
+        for i in zero:
+            cut_points[i] = TICKS_PER_SECOND // 10
+        print("00:00:00.000 は 00:00:00.100 に変換されました")
+    return to_timecodes(cut_points, RATE)
 
 # =====================================================
-# カットポイント抽出
+# 実行プラン
 # =====================================================
 
-def collect_cut_points(cues):
-    """開始・終了時刻を集め、秒でソートし重複除去したリストを返す。"""
-    points = []
-    for cue in cues:
-        points.append((vtt_time_to_seconds(cue["start"]), cue["start"]))
-        points.append((vtt_time_to_seconds(cue["end"]), cue["end"]))
-
-    points_sorted = sorted(points, key=lambda x: x[0])
-    cut_entries = []
-    seen = set()
-
-    for _, t in points_sorted:
-        adjusted = t
-        adjusted_sec = vtt_time_to_seconds(adjusted)
-
-        # 直前のカットと0.1秒以下なら押し出し、重複時刻も避ける
-        if cut_entries:
-            last_sec = cut_entries[-1][0]
-            while adjusted_sec - last_sec <= MIN_GAP_SEC or adjusted in seen:
-                adjusted = add_offset_to_vtt_time(adjusted, offset_sec=MIN_GAP_SEC)
-                adjusted_sec = vtt_time_to_seconds(adjusted)
-        else:
-            while adjusted in seen:
-                adjusted = add_offset_to_vtt_time(adjusted, offset_sec=MIN_GAP_SEC)
-                adjusted_sec = vtt_time_to_seconds(adjusted)
+def cue_middle_time(cue) -> int:
+    """キューの中央の時刻（ティック）。再開時にそのキューのクリップを選ぶのに使う。"""
+    return (cue.start_ms + cue.end_ms) * TICKS_PER_MS // 2
 
-        seen.add(adjusted)
-        cut_entries.append((adjusted_sec, adjusted))
 
-    # 微調整により秒数が増えた場合も昇順を維持する
-    cut_entries.sort(key=lambda x: x[0])
-    return [t for _, t in cut_entries]
+def build_plan(cut_points, cues, cuts_done=0, pastes_done=0, reposition=False):
+    """カットと貼り付けの操作を、実行順に並べたプランにする（最適化前）。
 
-# =====================================================
-# 編集操作系
-# =====================================================
+    cuts_done / pastes_done 件は済んでいるものとして飛ばす。reposition=True
+    （再開時）では、最初に貼り付けるキューのクリップを再生ヘッドの移動で選び直す。
+    """
+    plan = []
+
+    # 1. カットポイントで再生ヘッドを移動して分割
+    for timecode in cut_timecodes(cut_points[cuts_done:]):
+        plan.append(Action("move_playhead", timecode, wait=SLEEP_SHORT))
+        plan.append(Action("blade", wait=SLEEP_SHORT))
+
+    remaining = cues[pastes_done:]
+    if not remaining:
+        return plan
+
+    if reposition:
+        # 2'. 最初に貼り付けるキューの中央へ再生ヘッドを移動し、そのクリップを選択
+        plan.append(Action("move_playhead", cut_timecodes([cue_middle_time(remaining[0])])[0], wait=SLEEP_SHORT))
+        plan.append(Action("select_clip", wait=SLEEP_CLIP_MOVE))
+        plan.append(Action("focus", f"{INPUT_X},{INPUT_Y}", wait=SLEEP_SHORT))
+        plan.append(Action("wait", wait=SLEEP_CLIP_MOVE))
+        # 中断時に貼り付け済みだった場合も重複しないよう、全選択してから貼り付け
+        plan.append(Action("select_all", wait=SLEEP_SHORT))
+    else:
+        # 2. 2つ目のテキストクリップへ移動し、テキストフィールドをクリック（初回のみ）
+        plan.append(Action("next_clip", wait=SLEEP_CLIP_MOVE))
+        plan.append(Action("focus", f"{INPUT_X},{INPUT_Y}", wait=SLEEP_SHORT))
+        plan.append(Action("wait", wait=SLEEP_CLIP_MOVE))
+
+    # 3. 1つ目のセリフを貼り付け
+    plan.append(Action("paste", remaining[0]["text"], wait=SLEEP_SHORT))
+    plan.append(Action("wait", wait=SLEEP_CLIP_MOVE))
+
+    # 4. 2つ目以降のセリフを貼り付け
+    for cue in remaining[1:]:
+        # セリフクリップの間に無音クリップがあるため、2つ進む
+        plan.append(Action("next_clip", wait=SLEEP_CLIP_MOVE))
+        plan.append(Action("next_clip", wait=SLEEP_CLIP_MOVE))
+        plan.append(Action("tab"))
+        plan.append(Action("wait", wait=SLEEP_CLIP_MOVE))
+        plan.append(Action("paste", cue["text"], wait=SLEEP_SHORT))
+        plan.append(Action("wait", wait=SLEEP_CLIP_MOVE))
 
-def blade_at_playhead():
-    """再生ヘッド位置でクリップを分割 (command + B)"""
-    pyautogui.keyDown("command")
-    pyautogui.press("b")
-    pyautogui.keyUp("command")
-    time.sleep(SLEEP_SHORT)
-
-def go_to_next_clip():
-    """次のテキストクリップへ移動（command + right）"""
-    pyautogui.keyDown("command")
-    pyautogui.press("right")
-    pyautogui.keyUp("command")
-    time.sleep(SLEEP_CLIP_MOVE)
-    print("command+right")
-
-def focus_text_field_first_time():
-    """インスペクタ内のテキストフィールドをクリックしてフォーカスを当てる"""
-    pyautogui.click(INPUT_X, INPUT_Y)
-    time.sleep(SLEEP_SHORT)
-
-def paste_text(text: str):
-    """テキストフィールドに text をペースト（Cmd+V）"""
-    pyperclip.copy(text)
-    pyautogui.keyDown("command")
-    pyautogui.press("v")
-    pyautogui.keyUp("command")
-    time.sleep(SLEEP_SHORT)
-    print("command+v")
-    print("text", text)
+    return plan
 
 # =====================================================
 # メイン処理
 # =====================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="VTT / SRT の時刻で FCP のテキストクリップを分割し、セリフを貼り付ける")
+    parser.add_argument("--dry-run", action="store_true", help="操作せず、実行プランと見積もり時間だけを表示する")
+    parser.add_argument("--resume", action="store_true", help="前回中断した実行の続きから再開する")
+    args = parser.parse_args()
+
     ext = os.path.splitext(INPUT_FILE)[1].lower()
 
     # 1. 字幕ファイルを解析
@@ -271,6 +159,11 @@ def main():
     if not cut_points:
         print("⚠ カットポイントが抽出できませんでした。ファイルを確認してください。")
         return
+    raw_points = sorted(ms * TICKS_PER_MS for cue in cues for ms in (cue.start_ms, cue.end_ms))
+    pushed = sum(1 for raw, t in zip(raw_points, cut_points) if raw != t)
+    if pushed:
+        print(f"⚠ 間隔の近いカット {pushed}件を後ろへずらしました。"
+              f"`python scripts/vtt_timestamp_checker.py {INPUT_FILE} --fix` で事前に修正できます。")
 
     print(f"📄 字幕ファイル: {INPUT_FILE}（形式: {ext.upper().lstrip('.')}）")
     print("=== 解析結果 ===")
@@ -278,41 +171,52 @@ def main():
         print(c)
     print("================")
 
+    journal = TelopJournal(
+        JOURNAL_DIR / f"{os.path.basename(INPUT_FILE)}.journal.jsonl",
+        source_info(INPUT_FILE, fps=str(RATE), min_gap_sec=MIN_GAP_SEC),
+    )
+    cuts_done = pastes_done = 0
+    if args.resume:
+        try:
+            done = journal.load()
+        except ValueError as exc:
+            print(f"❌ {exc}")
+            print("   --resume を付けずに最初から実行してください。")
+            return
+        if done is None:
+            print("ℹ️ 再開できる記録がないため、最初から実行します。")
+            args.resume = False
+        else:
+            cuts_done, pastes_done = done
+            print(f"↩ 前回の続きから再開: カット {cuts_done}/{len(cut_points)}件・貼り付け {pastes_done}/{len(cues)}件が完了済み")
+
+    original_plan = build_plan(cut_points, cues, cuts_done, pastes_done, reposition=args.resume)
+    # 固定ウェイトでは、まとめた待ち時間を合計して従来と同じだけ待つ
+    plan = optimize(original_plan, sum_waits=not waiter.enabled)
+    print_plan(plan, SLEEP_SHORT, original=original_plan, verbose=args.dry_run)
+    if args.dry_run:
+        return
+
     print(f"⏱ {SLEEP_COUNTDOWN}秒後に開始します。Final Cut Pro をアクティブにし、")
-    print("テキストクリップのみタイムラインに置く。テキストクリップの先頭の位置を登録しておく。\nShift+Zでテキストクリップ全体が見えるようにしておく。\nタイムライン上の長いテキストクリップ（入力テキストは空にしておく）を1本選択した状態にしてください。")
+    if args.resume:
+        print("Shift+Zでテキストクリップ全体が見えるようにしておく。\nカットの途中で止まった場合は、まだ分割していないテキストクリップを選択した状態にしてください。")
+    else:
+        print("テキストクリップのみタイムラインに置く。テキストクリップの先頭の位置を登録しておく。\nShift+Zでテキストクリップ全体が見えるようにしておく。\nタイムライン上の長いテキストクリップ（入力テキストは空にしておく）を1本選択した状態にしてください。")
     time.sleep(SLEEP_COUNTDOWN)
 
-    # 2. カット
-    print("✂ テキストクリップをカットします（貼り付けなし）...")
-    for t in cut_points:
-        print(f"  - Cut at {t}")
-        move_playhead_to_time(t)
-        blade_at_playhead()
-
-    print("✅ カット完了。ここから貼り付けを行います。")
-
-    # 2つ目のテキストクリップへ移動
-    go_to_next_clip()
-
-    # テキストフィールドをマウスクリックで選択（初回のみ）
-    focus_text_field_first_time()
-    time.sleep(SLEEP_CLIP_MOVE)
-
-    # 1つ目のセリフを貼り付け
-    paste_text(cues[0]["text"])
-    time.sleep(SLEEP_CLIP_MOVE)
-
-    # 2つ目以降のセリフを貼り付け
-    for cue in cues[1:]:
-        # セリフクリップの間に無音クリップがあるため、2つ進む
-        go_to_next_clip()
-        go_to_next_clip()
-        pyautogui.press("tab")
-        time.sleep(SLEEP_CLIP_MOVE)
-        paste_text(cue["text"])
-        time.sleep(SLEEP_CLIP_MOVE)
+    print(f"✂ {len(cut_points) - cuts_done}か所でカットし、{len(cues) - pastes_done}件のセリフを貼り付けます...")
+    journal.open(resume=args.resume)
+    try:
+        execute(plan, waiter, SLEEP_SHORT, on_done=journal.record)
+    except BaseException:
+        journal.close()
+        print(f"⏸ 中断しました（カット {journal.cuts_done}/{len(cut_points)}件・貼り付け {journal.pastes_done}/{len(cues)}件が完了）。")
+        print("   --resume を付けて再実行すると、続きから再開します。")
+        raise
+    journal.finish()
 
     print("✅ 貼り付けまで完了しました。")
+    waiter.report()
     print("🎉 すべて完了しました。")
 
 
@@ -0,0 +1,833 @@
+"""文字起こしルートの処理速度を測るベンチマーク。
+
+ネットワークやモデルのダウンロードなしで実行できるよう、
+faster-whisper の Segment / Word と同じ形の合成データを返すスタブモデルを使う。
+
+使い方:
+    python scripts/benchmark.py segmenter            # 文分割エンジンの比較（10万語以上）
+    python scripts/benchmark.py segmenter --words 500000
+    python scripts/benchmark.py transcription        # 段階別（分割・タイムスタンプ整形・書き出し）
+    python scripts/benchmark.py transcription --minutes 180
+    python scripts/benchmark.py timeline             # カットポイント抽出と時刻変換（10万カットポイント。固定ウェイトの最適化の確認も）
+    python scripts/benchmark.py timeline --cut-points 500000
+    python scripts/benchmark.py subtitles            # 字幕パーサーの処理速度（20万キュー）
+    python scripts/benchmark.py subtitles --cues 1000000
+    python scripts/benchmark.py reading              # 読み辞書（1万行のセリフ × 1万件の辞書）
+    python scripts/benchmark.py reading --lines 50000 --entries 50000
+    python scripts/benchmark.py scenario             # シナリオ CSV の読み込み（20万行。pandas があれば比較）
+    python scripts/benchmark.py wavs                 # WAV の長さの取得（3000ファイル。ヘッダーだけ ⇔ 音声も読む）
+    python scripts/benchmark.py wavs --files 10000
+    python scripts/benchmark.py real --audio audio_input/sample.m4a --models small large-v2 --compute-types int8 float32
+                                                     # 実モデルの実時間係数（モデルの取得が必要）
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+import sentence_segmenter
+from subtitle_parser import Cue, format_ms
+
+# ===================== 設定 =====================
+# 合成データの単語数（既定値）
+DEFAULT_WORDS = 120_000
+
+# 1セグメントあたりの単語数の範囲
+SEGMENT_WORDS_RANGE = (8, 40)
+
+# 単語の間に文の区切りになる長めの無音を入れる割合
+LONG_PAUSE_RATE = 0.08
+
+# 合成データの乱数シード
+RANDOM_SEED = 1234
+
+# 各計測の繰り返し回数（最速値を採用）
+REPEAT = 3
+
+# 文分割の無音ギャップしきい値（秒）
+MAX_GAP_SECONDS = 0.2
+
+# スタブモデルが生成する音声の長さ（分）の既定値
+DEFAULT_MINUTES = 120
+
+# スタブモデルの発話速度（1分あたりの単語数）
+WORDS_PER_MINUTE = 300
+
+# タイムライン計測の既定のカットポイント数（キューの開始・終了の合計）
+DEFAULT_CUT_POINTS = 100_000
+
+# 字幕パーサー計測の既定のキュー数
+DEFAULT_SUBTITLE_CUES = 200_000
+
+# 読み辞書計測の既定のセリフ行数と辞書の件数
+DEFAULT_READING_LINES = 10_000
+DEFAULT_READING_ENTRIES = 10_000
+
+# シナリオ CSV 計測の既定の行数
+DEFAULT_SCENARIO_ROWS = 200_000
+
+# WAV の長さ計測の既定のファイル数
+DEFAULT_WAV_FILES = 3_000
+
+# 実モデル計測の既定のモデル名と計算精度
+DEFAULT_REAL_MODELS = ["small", "large-v2"]
+DEFAULT_REAL_COMPUTE_TYPES = ["int8", "float32"]
+# ===================== 設定ここまで =====================
+
+
+class Word(NamedTuple):
+    """faster-whisper の Word と同じ形の合成単語。"""
+
+    start: float
+    end: float
+    word: str
+    probability: float
+
+
+class Segment(NamedTuple):
+    """faster-whisper の Segment と同じ形の合成セグメント。"""
+
+    id: int
+    seek: int
+    start: float
+    end: float
+    text: str
+    tokens: List[int]
+    avg_logprob: float
+    compression_ratio: float
+    no_speech_prob: float
+    words: Optional[List[Word]]
+    temperature: float
+
+
+SYLLABLES = ["こん", "にち", "は", "今回", "は", "Python", "を", "使った", "動画", "制作", "です", "ね"]
+
+
+def make_segments(word_count: int, seed: int = RANDOM_SEED) -> List[Segment]:
+    """合成セグメントを作る。単語間には短い間と、LONG_PAUSE_RATE の割合で長めの無音を入れる。"""
+    rng = random.Random(seed)
+    segments: List[Segment] = []
+    t = 0.0
+    made = 0
+    while made < word_count:
+        n = min(rng.randint(*SEGMENT_WORDS_RANGE), word_count - made)
+        words: List[Word] = []
+        for _ in range(n):
+            if rng.random() < LONG_PAUSE_RATE:
+                gap = rng.uniform(0.25, 0.8)
+            else:
+                gap = rng.choice((0.0, 0.02, 0.05, 0.1))
+            start = t + gap
+            end = start + rng.uniform(0.08, 0.5)
+            words.append(Word(round(start, 3), round(end, 3), rng.choice(SYLLABLES), 0.9))
+            t = end
+        text = "".join(w.word for w in words)
+        segments.append(
+            Segment(len(segments), 0, words[0].start, words[-1].end, text, [], -0.2, 1.3, 0.01, words, 0.0)
+        )
+        made += n
+        t += rng.choice((0.0, 0.1, 0.4, 1.0))
+    return segments
+
+
+class TranscriptionInfo(NamedTuple):
+    """faster-whisper の TranscriptionInfo のうち、ここで使う属性だけを持つ合成データ。"""
+
+    language: str
+    language_probability: float
+    duration: float
+
+
+class StubWhisperModel:
+    """WhisperModel と同じ呼び出し方で合成セグメントを返すスタブ。
+
+    transcribe() の戻り値は faster-whisper と同じく (セグメントのジェネレーター, info)。
+    合成データは初期化時に作っておき、計測には含めない。
+    """
+
+    def __init__(self, minutes: float, seed: int = RANDOM_SEED):
+        self.duration = minutes * 60.0
+        self.word_count = int(minutes * WORDS_PER_MINUTE)
+        segments = make_segments(self.word_count, seed)
+        scale = self.duration / segments[-1].end if segments else 1.0
+        self.segments = [
+            seg._replace(
+                start=seg.start * scale,
+                end=seg.end * scale,
+                words=[w._replace(start=w.start * scale, end=w.end * scale) for w in seg.words],
+            )
+            for seg in segments
+        ]
+
+    def transcribe(self, audio, clip_timestamps=None, **_kwargs):
+        clip_start = float((clip_timestamps or [0])[0])
+        segments = (seg for seg in self.segments if seg.start >= clip_start)
+        return segments, TranscriptionInfo("ja", 1.0, self.duration)
+
+
+def display_width(text: str) -> int:
+    """全角文字を2桁として数えた表示幅を返す。"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def pad_label(text: str, width: int) -> str:
+    """表示幅が width になるよう右側を空白で埋める。"""
+    return text + " " * max(0, width - display_width(text))
+
+
+def best_time(func: Callable[[], object], repeat: int = REPEAT) -> tuple[float, object]:
+    """func を repeat 回実行し、最速の所要時間（秒）と最後の戻り値を返す。
+
+    timeit と同様に、計測中はガベージコレクションを止めて揺らぎを抑える。
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return best, result
+
+
+def bench_segmenter(word_count: int) -> None:
+    """従来のループ実装と配列ベースの分割エンジンを比較する。"""
+    segments = make_segments(word_count)
+    print(f"📊 文分割ベンチマーク: {word_count:,}語 / {len(segments):,}セグメント")
+
+    cases = [
+        ("上限なし", None, None),
+        ("単語数上限 12", None, 12),
+        ("秒数上限 6.0", 6.0, None),
+        ("秒数 6.0 + 単語数 12", 6.0, 12),
+    ]
+    for label, max_seconds, max_words in cases:
+        loop_time, expected = best_time(
+            lambda: sentence_segmenter.split_into_sentences_loop(
+                segments, MAX_GAP_SECONDS, max_seconds, max_words
+            )
+        )
+        vec_time, actual = best_time(
+            lambda: sentence_segmenter.split_into_sentences(
+                segments, MAX_GAP_SECONDS, max_seconds, max_words
+            )
+        )
+        words = sentence_segmenter.collect_word_arrays(segments)
+        split_time, _ = best_time(
+            lambda: sentence_segmenter.split_word_arrays(words, MAX_GAP_SECONDS, max_seconds, max_words)
+        )
+        cross_time, cross = best_time(
+            lambda: sentence_segmenter.split_word_arrays(
+                words, MAX_GAP_SECONDS, max_seconds, max_words, cross_segment=True
+            )
+        )
+        status = "一致" if actual == expected else "❌ 不一致"
+        print(f"  [{label}] {len(expected):,}文 / 結果: {status}")
+        print(f"    ループ実装      : {loop_time * 1000:8.1f} ms  ({word_count / loop_time:,.0f} 語/秒)")
+        print(f"    配列（変換込み）: {vec_time * 1000:8.1f} ms  (x{loop_time / vec_time:.1f})")
+        print(f"    配列（分割のみ）: {split_time * 1000:8.1f} ms  (x{loop_time / split_time:.1f})")
+        print(f"    セグメント跨ぎ  : {cross_time * 1000:8.1f} ms  ({len(cross):,}文)")
+
+    check_segmenter_equivalence()
+    check_forced_split_points()
+
+
+def make_whisper_style_segments(rng: random.Random) -> List[Segment]:
+    """Whisper と同じ小数2桁の時刻を持つ、短い合成セグメント（終了時刻が単調でない単語を含む）。"""
+    segments: List[Segment] = []
+    t = 0.0
+    for _ in range(rng.randint(1, 6)):
+        words: List[Word] = []
+        for _ in range(rng.randint(1, 60)):
+            start = round(t + rng.choice((0.0, 0.02, 0.05, 0.3)), 2)
+            end = round(start + rng.choice((0.05, 0.1, 0.25, 0.45, 0.5)), 2)
+            if rng.random() < 0.05:
+                end = round(start - 0.01, 2)
+            words.append(Word(start, end, rng.choice(SYLLABLES), 0.9))
+            t = max(t, end)
+        segments.append(
+            Segment(len(segments), 0, words[0].start, words[-1].end, "", [], -0.2, 1.3, 0.01, words, 0.0)
+        )
+    return segments
+
+
+def check_segmenter_equivalence(trials: int = 300, seed: int = RANDOM_SEED) -> None:
+    """秒数の上限（MAX_SENTENCE_SECONDS）がちょうど境目になる時刻で、ループ実装と配列実装の結果を比べる。
+
+    split_into_sentences は入力の単語数で実装を切り替えるため、両者が一致しないと
+    ストリーミング出力と一括出力で文の区切りが変わる。
+    """
+    rng = random.Random(seed)
+    cases = [(max_seconds, max_words) for max_seconds in (0.3, 0.5, 1.0, 1.5) for max_words in (None, 5)]
+    mismatches = 0
+    for _ in range(trials):
+        segments = make_whisper_style_segments(rng)
+        words = sentence_segmenter.collect_word_arrays(segments)
+        for max_seconds, max_words in cases:
+            expected = sentence_segmenter.split_into_sentences_loop(segments, MAX_GAP_SECONDS, max_seconds, max_words)
+            actual = sentence_segmenter.split_word_arrays(words, MAX_GAP_SECONDS, max_seconds, max_words)
+            mismatches += actual != expected
+    status = "一致" if mismatches == 0 else f"❌ 不一致 {mismatches:,}件"
+    print(f"  [小数2桁の時刻・秒数上限の境目] {trials * len(cases):,}通り / ループ実装と配列実装: {status}")
+
+
+# 上限で区切った後の文の分割位置（max_seconds, max_words, 期待する文）。
+# 従来の実装では 2文目以降がセグメントの先頭の時刻から始まる（単語数の上限では None になる）
+FORCED_SPLIT_CASES = [
+    (1.0, None, [(0.0, 1.4, "abc"), (1.5, 2.4, "de")]),
+    (None, 2, [(0.0, 0.9, "ab"), (1.0, 1.9, "cd"), (2.0, 2.4, "e")]),
+    (1.0, 2, [(0.0, 0.9, "ab"), (1.0, 1.9, "cd"), (2.0, 2.4, "e")]),
+]
+
+
+def check_forced_split_points() -> None:
+    """秒数・単語数の上限で区切った後の文が、その文の最初の単語の時刻から始まることを確かめる。"""
+    words = [Word(i * 0.5, i * 0.5 + 0.4, text, 0.9) for i, text in enumerate("abcde")]
+    segments = [Segment(0, 0, 0.0, 2.4, "abcde", [], -0.2, 1.3, 0.01, words, 0.0)]
+    arrays = sentence_segmenter.collect_word_arrays(segments)
+    mismatches = 0
+    for max_seconds, max_words, expected in FORCED_SPLIT_CASES:
+        loop = sentence_segmenter.split_into_sentences_loop(segments, MAX_GAP_SECONDS, max_seconds, max_words)
+        vec = sentence_segmenter.split_word_arrays(arrays, MAX_GAP_SECONDS, max_seconds, max_words)
+        mismatches += (loop != expected) + (vec != expected)
+    status = "一致" if mismatches == 0 else f"❌ 不一致 {mismatches:,}件"
+    print(f"  [上限で区切った後の開始時刻] {len(FORCED_SPLIT_CASES)}通り / 期待する分割位置: {status}")
+
+
+def measure_stage(func: Callable[[], object]) -> tuple[float, float, object]:
+    """func の所要時間（秒）とピークメモリ（MiB）を測る。
+
+    tracemalloc は処理を遅くするため、時間とメモリは別々の実行で測る。
+    """
+    elapsed, result = best_time(func)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), result
+
+
+def bench_transcription(minutes: float) -> None:
+    """スタブモデルで文字起こしルートの各段階の速度とピークメモリを測る。"""
+    import auto_audio_to_vtt as pipeline
+
+    model = StubWhisperModel(minutes)
+    print(f"📊 文字起こしルート ベンチマーク: 音声 {minutes:g}分 / {model.word_count:,}語（スタブモデル）")
+
+    segments = list(model.transcribe("stub")[0])
+    results = []
+    elapsed, peak, sentences = measure_stage(lambda: pipeline.split_into_sentences(segments))
+    results.append(("文分割", elapsed, peak, model.word_count, "語"))
+
+    def format_all():
+        return [
+            (pipeline.format_timestamp(start), pipeline.format_timestamp(end))
+            for start, end, _text in sentences
+        ]
+
+    elapsed, peak, _ = measure_stage(format_all)
+    results.append(("タイムスタンプ整形", elapsed, peak, len(sentences), "キュー"))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / "bench.vtt"
+        audio_path = Path(tmp_dir) / "bench.wav"
+        audio_path.write_bytes(b"")
+
+        def write_whole():
+            pipeline.save_vtt(pipeline.sentences_to_vtt(sentences), output_path)
+
+        elapsed, peak, _ = measure_stage(write_whole)
+        results.append(("VTT 書き出し（一括）", elapsed, peak, len(sentences), "キュー"))
+
+        def write_streaming():
+            writer = pipeline.StreamingVttWriter(output_path, audio_path, sync_interval=pipeline.STREAM_SYNC_INTERVAL)
+            writer.open()
+            for group in sentence_segmenter.iter_closed_groups(segments, MAX_GAP_SECONDS, False):
+                writer.write_sentences(pipeline.split_into_sentences(group), group[-1].end)
+            writer.finish()
+
+        elapsed, peak, _ = measure_stage(write_streaming)
+        results.append(("分割+書き出し（逐次）", elapsed, peak, len(sentences), "キュー"))
+
+        # スタブの空の音声はデコードできないため、文字起こし・デコード済み音声のキャッシュはどちらも使わない
+        use_cache = pipeline.USE_TRANSCRIPT_CACHE, pipeline.USE_PCM_CACHE
+        pipeline.USE_TRANSCRIPT_CACHE = pipeline.USE_PCM_CACHE = False
+        try:
+            elapsed, peak, _ = measure_stage(lambda: pipeline.transcribe_with_model(model, audio_path))
+        finally:
+            pipeline.USE_TRANSCRIPT_CACHE, pipeline.USE_PCM_CACHE = use_cache
+        results.append(("全体（スタブ→VTT）", elapsed, peak, model.word_count, "語"))
+
+    for label, elapsed, peak, count, unit in results:
+        print(f"  {pad_label(label, 22)}: {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} {unit}/秒  ピーク {peak:7.1f} MiB")
+
+
+def make_cues(cue_count: int, seed: int = RANDOM_SEED) -> List[Cue]:
+    """parse_subtitle_from_file() と同じ形の合成キュー（近接・重複する時刻を含む）。"""
+    rng = random.Random(seed)
+    cues = []
+    millis = 0
+    for index in range(cue_count):
+        millis += rng.choice([0, 50, 100, 400, 1200, 2500])
+        end = millis + rng.choice([80, 100, 900, 1800, 3200])
+        cues.append(Cue(millis, end, f"セリフ{index}"))
+        millis = end
+    return cues
+
+
+# ---------- 比較用: timeline 導入前の Decimal 文字列実装 ----------
+
+def _legacy_to_seconds(vtt_time: str) -> Decimal:
+    # 元の実装は float に変換して比較していたため、間隔がちょうど 0.1 秒のときに
+    # 押し出されないことがあった（0.68 - 0.58 > 0.1）。結果を照合できるよう Decimal のまま比べる
+    h, m, s = vtt_time.split(":")
+    return Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + Decimal(s)
+
+
+def _legacy_add_offset(vtt_time: str, offset_sec: float) -> str:
+    h, m, s = vtt_time.split(":")
+    base_ms = (Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + Decimal(s)) * Decimal(1000)
+    offset_ms = (Decimal(str(offset_sec)) * Decimal(1000)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    return format_ms(int((base_ms + offset_ms).quantize(Decimal("1"), rounding=ROUND_HALF_UP)))
+
+
+def _legacy_to_timecode(vtt_time: str, fps: int) -> str:
+    h, m, s = vtt_time.split(":")
+    if h == "00" and m == "00" and s == "00.000":
+        s = "00.100"
+    total = Decimal(int(h)) * 3600 + Decimal(int(m)) * 60 + Decimal(s)
+    sec_int = int(total)
+    frame = int(((total - Decimal(sec_int)) * fps).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    if frame >= fps:
+        frame = 0
+        sec_int += 1
+    return f"{sec_int // 3600:02d}:{sec_int % 3600 // 60:02d}:{sec_int % 60:02d}:{frame:02d}"
+
+
+def _legacy_cut_timecodes(cues: List[dict], min_gap: float, fps: int) -> List[str]:
+    min_gap = Decimal(str(min_gap))
+    points = []
+    for cue in cues:
+        points.append((_legacy_to_seconds(cue["start"]), cue["start"]))
+        points.append((_legacy_to_seconds(cue["end"]), cue["end"]))
+    points.sort(key=lambda x: x[0])
+    cut_entries = []
+    seen = set()
+    for _, adjusted in points:
+        adjusted_sec = _legacy_to_seconds(adjusted)
+        last_sec = cut_entries[-1][0] if cut_entries else Decimal("-Infinity")
+        while adjusted_sec - last_sec <= min_gap or adjusted in seen:
+            adjusted = _legacy_add_offset(adjusted, min_gap)
+            adjusted_sec = _legacy_to_seconds(adjusted)
+        seen.add(adjusted)
+        cut_entries.append((adjusted_sec, adjusted))
+    cut_entries.sort(key=lambda x: x[0])
+    return [_legacy_to_timecode(t, fps) for _, t in cut_entries]
+
+
+def bench_timeline(cut_point_count: int) -> None:
+    """カットポイント抽出とタイムコード変換を、Decimal 文字列実装と比較する。"""
+    import auto_fcp_vtt_srt_to_telop as telop
+    import timeline
+
+    cues = make_cues(cut_point_count // 2)
+    print(f"📊 タイムライン ベンチマーク: {len(cues):,}キュー / {len(cues) * 2:,}カットポイント（{telop.RATE}）")
+
+    legacy_time, expected = best_time(
+        lambda: _legacy_cut_timecodes(cues, telop.MIN_GAP_SEC, telop.RATE.nominal), repeat=1
+    )
+    new_time, actual = best_time(lambda: telop.cut_timecodes(telop.collect_cut_points(cues)))
+    mismatches = sum(a != b for a, b in zip(actual, expected)) + abs(len(actual) - len(expected))
+    status = "一致" if not mismatches else f"❌ {mismatches:,}件不一致"
+    print(f"  カットポイント → タイムコード（結果: {status}）")
+    print(f"    Decimal 文字列: {legacy_time * 1000:9.1f} ms")
+    print(f"    ティック      : {new_time * 1000:9.1f} ms  (x{legacy_time / new_time:.1f})")
+
+    ticks = telop.collect_cut_points(cues)
+    for label, rate in [
+        ("29.97 NDF", timeline.FrameRate.parse("29.97")),
+        ("29.97 DF", timeline.FrameRate.parse("29.97", drop_frame=True)),
+        ("23.976", timeline.FrameRate.parse("23.976")),
+    ]:
+        tc_time, _ = best_time(lambda: timeline.to_timecodes(ticks, rate))
+        xml_time, _ = best_time(lambda: timeline.to_fcpxml_times(ticks, rate))
+        print(f"  {pad_label(label, 10)}: タイムコード {tc_time * 1000:7.1f} ms / FCPXML {xml_time * 1000:7.1f} ms")
+    vtt_time, _ = best_time(lambda: timeline.to_vtt_timestamps(ticks))
+    parse_time, _ = best_time(lambda: [timeline.parse_timestamp(cue["start"]) for cue in cues])
+    print(f"  VTT 書式化: {vtt_time * 1000:7.1f} ms / VTT 解析（{len(cues):,}件）: {parse_time * 1000:7.1f} ms")
+
+    check_plan_waits(telop, cues[:200])
+
+
+def check_plan_waits(telop, cues: List[Cue]) -> None:
+    """固定ウェイト（sum_waits=True）の最適化で、待ち時間の合計が変わらないことを確かめる。
+
+    再開時のプラン（全選択 → 貼り付け を含む）で、最適化後の見積もりが最適化前から
+    pyautogui の呼び出しを減らした分（PYAUTOGUI_PAUSE × 回数）だけ短くなることを比べる。
+    """
+    from telop_plan import CALL_COUNTS, PYAUTOGUI_PAUSE, estimate_seconds, optimize
+
+    plan = telop.build_plan(telop.collect_cut_points(cues), cues, pastes_done=1, reposition=True)
+    optimized = optimize(plan, sum_waits=True)
+    saved_calls = sum(CALL_COUNTS[a.kind] for a in plan) - sum(CALL_COUNTS[a.kind] for a in optimized)
+    expected = estimate_seconds(plan, telop.SLEEP_SHORT) - saved_calls * PYAUTOGUI_PAUSE
+    actual = estimate_seconds(optimized, telop.SLEEP_SHORT)
+    status = "一致" if abs(actual - expected) < 1e-6 else f"❌ 不一致（{actual:.2f}秒 ⇔ {expected:.2f}秒）"
+    print(f"  固定ウェイトの最適化（再開プラン {len(plan):,}操作 → {len(optimized):,}操作）: 待ち時間の合計 {status}")
+
+
+def write_subtitle_file(path: Path, cues: List[Cue], newline: str) -> None:
+    """キューを VTT（拡張子 .srt なら SRT）として書き出す。"""
+    srt = path.suffix == ".srt"
+    with open(path, "w", encoding="utf-8", newline=newline) as f:
+        if not srt:
+            f.write("WEBVTT\n\n")
+        for number, cue in enumerate(cues, start=1):
+            start, end = (cue.start, cue.end) if not srt else (cue.start.replace(".", ","), cue.end.replace(".", ","))
+            f.write(f"{number}\n{start} --> {end}\n{cue.text}\n\n")
+
+
+def _legacy_parse_subtitles(path: Path) -> List[dict]:
+    """比較用: 共通パーサー導入前の、全体を読み込んで "\\n\\n" で分割する実装。"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    cues = []
+    for block in text.strip().split("\n\n"):
+        lines = [line for line in block.strip().splitlines() if line.strip() != ""]
+        time_line_index = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if time_line_index is None:
+            continue
+        parts = lines[time_line_index].split("-->")
+        if len(parts) != 2:
+            continue
+        cue_text = "\n".join(lines[time_line_index + 1:]).strip()
+        if cue_text:
+            cues.append({"start": parts[0].strip().replace(",", "."), "end": parts[1].strip().replace(",", "."), "text": cue_text})
+    return cues
+
+
+def bench_subtitles(cue_count: int) -> None:
+    """共通の字幕パーサーの処理速度とピークメモリを、従来の分割方式と比較する。"""
+    import subtitle_parser
+
+    cues = make_cues(cue_count)
+    print(f"📊 字幕パーサー ベンチマーク: {cue_count:,}キュー")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, newline in [("bench.vtt", "\n"), ("bench.srt", "\n"), ("bench_crlf.vtt", "\r\n")]:
+            path = Path(tmp_dir) / name
+            write_subtitle_file(path, cues, newline)
+            size_mb = path.stat().st_size / (1024 * 1024)
+
+            legacy_time, legacy_peak, legacy = measure_stage(lambda: _legacy_parse_subtitles(path))
+            new_time, new_peak, parsed = measure_stage(lambda: subtitle_parser.parse_subtitle_from_file(str(path)))
+            stream_time, stream_peak, count = measure_stage(
+                lambda: sum(1 for _ in subtitle_parser.iter_subtitle_cues(str(path)))
+            )
+            status = "一致" if parsed == cues and count == cue_count else "❌ 不一致"
+            print(f"  [{name}] {size_mb:.1f} MB / 従来: {len(legacy):,}件・共通: {len(parsed):,}件（{status}）")
+            print(f"    従来（分割）  : {legacy_time * 1000:8.1f} ms  {len(legacy) / legacy_time:>10,.0f} 件/秒  ピーク {legacy_peak:7.1f} MiB")
+            print(f"    共通（一覧）  : {new_time * 1000:8.1f} ms  {cue_count / new_time:>10,.0f} 件/秒  ピーク {new_peak:7.1f} MiB")
+            print(f"    共通（逐次）  : {stream_time * 1000:8.1f} ms  {size_mb / stream_time:>10,.1f} MB/秒  ピーク {stream_peak:7.1f} MiB")
+
+
+def make_reading_data(line_count: int, entry_count: int, seed: int = RANDOM_SEED) -> tuple[dict, List[str]]:
+    """合成の読み辞書（英単語・漢字の表記 → カタカナ）と、その表記を含むセリフ。"""
+    rng = random.Random(seed)
+    latin = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    kanji = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+    kana = [chr(c) for c in range(0x30A1, 0x30F7)]
+    filler = kanji + list("のがをにはでと、")
+
+    entries = {}
+    while len(entries) < entry_count:
+        if rng.random() < 0.4:
+            surface = "".join(rng.choice(latin) for _ in range(rng.randint(3, 10)))
+        else:
+            surface = "".join(rng.choice(kanji) for _ in range(rng.randint(2, 5)))
+        entries[surface] = "".join(rng.choice(kana) for _ in range(len(surface) + 2))
+
+    surfaces = list(entries)
+    lines = []
+    for _ in range(line_count):
+        parts = [
+            rng.choice(surfaces) if rng.random() < 0.3 else "".join(rng.choice(filler) for _ in range(rng.randint(2, 8)))
+            for _ in range(rng.randint(3, 8))
+        ]
+        lines.append("".join(parts) + "。")
+    return entries, lines
+
+
+def _legacy_apply_readings(voice: str, replace_list: List[List[str]]) -> str:
+    """比較用: 読み辞書導入前の、規則ごとに in と str.replace を繰り返す実装。"""
+    for replace_item in replace_list:
+        if replace_item[0] in voice:
+            voice = voice.replace(replace_item[0], replace_item[1])
+    return voice
+
+
+def bench_reading(line_count: int, entry_count: int) -> None:
+    """読み辞書のコンパイル・キャッシュ読み込み・置き換えを、従来のループと比較する。"""
+    import csv
+
+    import reading_dictionary
+
+    entries, lines = make_reading_data(line_count, entry_count)
+    print(f"📊 読み辞書 ベンチマーク: セリフ {line_count:,}行 × 辞書 {entry_count:,}件")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dict_path = Path(tmp_dir) / "reading_dictionary.csv"
+        with open(dict_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(reading_dictionary.HEADER)
+            writer.writerows(entries.items())
+        cache_dir = Path(tmp_dir) / "cache"
+
+        compile_time, _ = best_time(lambda: reading_dictionary.load_dictionary(dict_path))
+        reading_dictionary.load_dictionary(dict_path, cache_dir)
+        cached_time, dictionary = best_time(lambda: reading_dictionary.load_dictionary(dict_path, cache_dir))
+        print(f"  読み込み: CSV からコンパイル {compile_time * 1000:7.1f} ms / キャッシュから {cached_time * 1000:7.1f} ms")
+
+    replace_list = [list(item) for item in entries.items()]
+    legacy_time, expected = best_time(lambda: [_legacy_apply_readings(line, replace_list) for line in lines], repeat=1)
+    new_time, actual = best_time(lambda: [dictionary.apply(line)[0] for line in lines])
+    differs = sum(a != b for a, b in zip(actual, expected))
+    print(f"  置き換え（従来と結果が異なる行: {differs:,}行。規則の重なりの扱いの違い）")
+    print(f"    従来（規則ごとのループ）: {legacy_time * 1000:9.1f} ms  {line_count / legacy_time:>10,.0f} 行/秒")
+    print(f"    最左最長一致（トライ木）: {new_time * 1000:9.1f} ms  {line_count / new_time:>10,.0f} 行/秒  (x{legacy_time / new_time:.1f})")
+
+
+def write_scenario_csv(path: Path, row_count: int, seed: int = RANDOM_SEED) -> None:
+    """合成のシナリオ CSV（実行フラグ・キャラクター・空欄のセリフが混ざる）を書き出す。"""
+    import csv
+
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["実行", "キャラクター", "セリフ"])
+        for index in range(row_count):
+            run = rng.choice(["1", "1", "1", "0", "", "1.0", "x"])
+            character = rng.choice(["魔理沙", "魔理沙", "霊夢"])
+            text = "" if rng.random() < 0.05 else f"セリフ{index}です。今回は、動画制作の効率化について紹介します。"
+            writer.writerow([run, character, text])
+
+
+def _pandas_scenario_lines(path: Path, character: str) -> List[str]:
+    """比較用: scenario_reader 導入前の pandas（read_csv + to_numeric + iterrows）での抽出。"""
+    import pandas as pd
+
+    df = pd.read_csv(path, encoding="utf-8", header=0)
+    df["実行"] = pd.to_numeric(df["実行"], errors="coerce")
+    voices = []
+    for _, row in df.iterrows():
+        if pd.isna(row["実行"]) or row["実行"] != 1:
+            continue
+        if character != row["キャラクター"]:
+            continue
+        voice = row["セリフ"]
+        if pd.isna(voice):
+            continue
+        voices.append(voice)
+    return voices
+
+
+def _import_time(module: str) -> Optional[float]:
+    """新しいプロセスで module を import するのにかかる時間（秒）。import できなければ None。"""
+    import subprocess
+    import sys
+
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    best = None
+    for _ in range(REPEAT):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        if result.returncode != 0:
+            return None
+        elapsed = float(result.stdout.strip())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_scenario(row_count: int) -> None:
+    """シナリオ CSV の読み込みを、pandas での従来の処理と起動時間・行/秒で比較する。"""
+    import scenario_reader
+
+    character = "魔理沙"
+    print(f"📊 シナリオ CSV ベンチマーク: {row_count:,}行")
+
+    pandas_import = _import_time("pandas")
+    reader_import = _import_time("scenario_reader")
+    print("  起動（import にかかる時間）")
+    if pandas_import is not None:
+        print(f"    pandas          : {pandas_import * 1000:8.1f} ms")
+    else:
+        print("    pandas          : （未インストールのため計測なし）")
+    print(f"    scenario_reader : {reader_import * 1000:8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "scenario.csv"
+        write_scenario_csv(path, row_count)
+
+        new_time, new_peak, lines = measure_stage(
+            lambda: [line.text for line in scenario_reader.iter_scenario_lines(path, character)]
+        )
+        print(f"  読み込み・抽出（{len(lines):,}行が対象）")
+        if pandas_import is not None:
+            old_time, old_peak, expected = measure_stage(lambda: _pandas_scenario_lines(path, character))
+            status = "一致" if expected == lines else "❌ 不一致"
+            print(f"    pandas（iterrows）: {old_time * 1000:9.1f} ms  {row_count / old_time:>10,.0f} 行/秒  ピーク {old_peak:7.1f} MiB（結果: {status}）")
+        print(f"    逐次読み込み      : {new_time * 1000:9.1f} ms  {row_count / new_time:>10,.0f} 行/秒  ピーク {new_peak:7.1f} MiB")
+
+
+def bench_wavs(file_count: int, seed: int = RANDOM_SEED) -> None:
+    """WAV の長さの取得を、ヘッダーだけ読む場合と音声データまで読む場合（wave.readframes）で比較する。"""
+    import wave
+    from fractions import Fraction
+
+    import wav_to_subtitle
+    from timeline import FrameRate
+    from wav_wait import wav_header
+
+    rng = random.Random(seed)
+    sample_rate = 16_000
+    print(f"📊 WAV の長さ計測: {file_count:,}ファイル（0.5〜4秒・{sample_rate} Hz）")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = Path(tmp_dir)
+        for number in range(1, file_count + 1):
+            data_size = rng.randint(sample_rate // 2, sample_rate * 4) * 2
+            path = directory / f"{number}_セリフ{number}.wav"
+            path.write_bytes(wav_header(data_size, sample_rate) + bytes(data_size))
+        total_mib = sum(p.stat().st_size for p in directory.iterdir()) / 1024 / 1024
+
+        def decode_all() -> List[Fraction]:
+            durations = []
+            for wav in wav_to_subtitle.list_numbered_wavs(directory)[0]:
+                with wave.open(str(wav.path)) as reader:
+                    frames = len(reader.readframes(reader.getnframes())) // reader.getsampwidth()
+                    durations.append(Fraction(frames, reader.getframerate()))
+            return durations
+
+        def headers_only() -> List[Fraction]:
+            wavs = wav_to_subtitle.list_numbered_wavs(directory)[0]
+            return [wav_to_subtitle.read_wav_duration(wav.path) for wav in wavs]
+
+        old_time, old_peak, expected = measure_stage(decode_all)
+        new_time, new_peak, durations = measure_stage(headers_only)
+        status = "一致" if durations == expected else "❌ 不一致"
+        print(f"  長さの取得（合計 {total_mib:,.0f} MiB・{float(sum(durations)) / 60:,.1f}分。ディスクキャッシュに載った状態。結果: {status}）")
+        print(f"    音声も読む（wave） : {old_time * 1000:9.1f} ms  {file_count / old_time:>10,.0f} ファイル/秒  ピーク {old_peak:7.1f} MiB")
+        print(f"    ヘッダーだけ      : {new_time * 1000:9.1f} ms  {file_count / new_time:>10,.0f} ファイル/秒  ピーク {new_peak:7.1f} MiB  (x{old_time / new_time:.1f})")
+
+        wavs = wav_to_subtitle.list_numbered_wavs(directory)[0]
+        texts = [wav.name_text for wav in wavs]
+        rate = FrameRate.parse(30)
+        build_time, spans = best_time(lambda: wav_to_subtitle.build_spans(wavs, durations, texts, rate))
+        print(f"  区間の計算（{len(spans):,}キュー）: {build_time * 1000:9.1f} ms")
+
+
+def bench_real_models(audio: Path, models: List[str], compute_types: List[str], device: str) -> None:
+    """実際の Whisper モデルで読み込み時間と実時間係数を測る。"""
+    from faster_whisper import WhisperModel
+
+    import auto_audio_to_vtt as pipeline
+
+    print(f"📊 実モデル ベンチマーク: {audio}（device={device}）")
+    for model_name in models:
+        for compute_type in compute_types:
+            label = pad_label(f"{model_name} / {compute_type}", 24)
+            try:
+                started = time.perf_counter()
+                model = WhisperModel(model_name, device=device, compute_type=compute_type)
+                load_time = time.perf_counter() - started
+
+                started = time.perf_counter()
+                segments, info = pipeline.run_whisper(model, audio)
+                word_count = sum(len(seg.words or []) for seg in segments)
+                elapsed = time.perf_counter() - started
+            except Exception as exc:  # noqa: BLE001
+                print(f"  {label}: ❌ {exc}")
+                continue
+
+            rtf = elapsed / info.duration if info.duration > 0 else float("nan")
+            print(
+                f"  {label}: 読み込み {load_time:6.1f}秒 / 処理 {elapsed:7.1f}秒"
+                f" / RTF {rtf:.3f} / {word_count:,}語"
+            )
+            del model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="文字起こしルートのベンチマーク")
+    sub = parser.add_subparsers(dest="target", required=True)
+
+    seg_parser = sub.add_parser("segmenter", help="文分割エンジンの比較")
+    seg_parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help="合成データの単語数")
+
+    tr_parser = sub.add_parser("transcription", help="文字起こしルートの段階別計測（スタブモデル）")
+    tr_parser.add_argument("--minutes", type=float, default=DEFAULT_MINUTES, help="合成音声の長さ（分）")
+
+    tl_parser = sub.add_parser("timeline", help="カットポイント抽出と時刻変換")
+    tl_parser.add_argument("--cut-points", type=int, default=DEFAULT_CUT_POINTS, help="カットポイント数")
+
+    sub_parser = sub.add_parser("subtitles", help="字幕パーサーの処理速度")
+    sub_parser.add_argument("--cues", type=int, default=DEFAULT_SUBTITLE_CUES, help="合成字幕のキュー数")
+
+    reading_parser = sub.add_parser("reading", help="読み辞書の置き換え速度")
+    reading_parser.add_argument("--lines", type=int, default=DEFAULT_READING_LINES, help="合成セリフの行数")
+    reading_parser.add_argument("--entries", type=int, default=DEFAULT_READING_ENTRIES, help="合成辞書の件数")
+
+    scenario_parser = sub.add_parser("scenario", help="シナリオ CSV の読み込み速度")
+    scenario_parser.add_argument("--rows", type=int, default=DEFAULT_SCENARIO_ROWS, help="合成シナリオの行数")
+
+    wav_parser = sub.add_parser("wavs", help="WAV の長さの取得（ヘッダーだけ ⇔ 音声も読む）")
+    wav_parser.add_argument("--files", type=int, default=DEFAULT_WAV_FILES, help="合成 WAV のファイル数")
+
+    real_parser = sub.add_parser("real", help="実モデルの実時間係数")
+    real_parser.add_argument("--audio", type=Path, required=True, help="計測に使う音声ファイル")
+    real_parser.add_argument("--models", nargs="+", default=DEFAULT_REAL_MODELS, help="モデル名")
+    real_parser.add_argument("--compute-types", nargs="+", default=DEFAULT_REAL_COMPUTE_TYPES, help="計算精度")
+    real_parser.add_argument("--device", default="auto", help="デバイス")
+
+    args = parser.parse_args()
+    if args.target == "segmenter":
+        bench_segmenter(args.words)
+    elif args.target == "transcription":
+        bench_transcription(args.minutes)
+    elif args.target == "timeline":
+        bench_timeline(args.cut_points)
+    elif args.target == "subtitles":
+        bench_subtitles(args.cues)
+    elif args.target == "reading":
+        bench_reading(args.lines, args.entries)
+    elif args.target == "scenario":
+        bench_scenario(args.rows)
+    elif args.target == "wavs":
+        bench_wavs(args.files)
+    elif args.target == "real":
+        bench_real_models(args.audio, args.models, args.compute_types, args.device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""このマシンで使う Whisper のモデルと計算精度を、実測した実時間係数で選ぶ。
+
+基準の音声クリップを候補のモデル × 計算精度ごとに文字起こしし、
+実時間係数（RTF = 処理時間 / 音声長）とピークメモリを測る。
+RTF が TARGET_RTF 以下の組み合わせのうち、CANDIDATE_MODELS の先頭に近い
+（精度の高い）モデルを選び、そのモデルの中で最も速い計算精度を採用する。
+目標を満たす組み合わせがない場合は、最も速い組み合わせを採用する。
+
+結果はホスト名ごとに auto_audio_to_vtt.py の CALIBRATION_PATH へ保存し、
+auto_audio_to_vtt.py / transcription_server.py は起動時にこのマシンの結果を使う。
+
+使い方:
+    python scripts/calibrate_whisper.py
+    python scripts/calibrate_whisper.py --audio audio_input/sample.m4a --target-rtf 0.3
+    python scripts/calibrate_whisper.py --models small medium --compute-types int8 float32
+
+計測は候補ごとに別プロセスで行うため、ピークメモリは他の候補の影響を受けません
+（GPU のメモリは含みません）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import auto_audio_to_vtt as pipeline
+from audio_pcm_cache import load_pcm_file
+
+# ===================== 設定 =====================
+# 候補のモデル（精度の高い順）
+CANDIDATE_MODELS = ["large-v2", "medium", "small"]
+
+# 候補の計算精度
+CANDIDATE_COMPUTE_TYPES = ["int8", "int8_float16", "float16", "float32"]
+
+# デバイス: "auto" / "cpu" / "cuda"
+DEVICE = "auto"
+
+# 目標の実時間係数（処理時間 / 音声長）。0.5 なら音声の半分の時間で処理できること
+TARGET_RTF = 0.5
+
+# 計測に使う基準クリップの長さ（秒）。音声の先頭からこの長さだけを使う
+REFERENCE_SECONDS = 60.0
+# ===================== 設定ここまで =====================
+
+CALIBRATION_FORMAT_VERSION = 1
+
+
+def peak_memory_mb() -> float:
+    """このプロセスのピーク常駐メモリ（MiB）を返す。"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS はバイト、Linux は KiB 単位
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _measure_candidate(
+    model_name: str,
+    device: str,
+    compute_type: str,
+    audio_path: Path,
+    pcm_file: Optional[Path],
+    samples: int,
+) -> dict:
+    """別プロセスで1つの組み合わせを読み込み、基準クリップを文字起こしして計測する。"""
+    from faster_whisper import WhisperModel
+
+    if pcm_file is not None:
+        audio = load_pcm_file(pcm_file, 0, samples)
+    else:
+        from faster_whisper.audio import decode_audio
+
+        audio = decode_audio(str(audio_path), sampling_rate=pipeline.SAMPLING_RATE)[:samples]
+    audio_seconds = len(audio) / pipeline.SAMPLING_RATE
+
+    started = time.perf_counter()
+    model = WhisperModel(model_name, device=device, compute_type=compute_type)
+    load_seconds = time.perf_counter() - started
+
+    # 実際の文字起こしと同じデコード方式で測る
+    started = time.perf_counter()
+    if pipeline.DECODE_MODE == "tiered":
+        segments, _duration = pipeline.transcribe_tiered(model, audio)
+    else:
+        segments, _info = pipeline.run_whisper(model, audio)
+    segment_count = sum(1 for _seg in segments)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "model_name": model_name,
+        "compute_type": compute_type,
+        "load_seconds": round(load_seconds, 3),
+        "rtf": round(elapsed / audio_seconds, 4) if audio_seconds > 0 else None,
+        "peak_memory_mb": round(peak_memory_mb(), 1),
+        "segments": segment_count,
+    }
+
+
+def measure_all(
+    audio_path: Path,
+    models: List[str],
+    compute_types: List[str],
+    device: str,
+    reference_seconds: float,
+) -> List[dict]:
+    """全候補を1つずつ計測する。読み込めない組み合わせは error を記録して続ける。"""
+    samples = int(reference_seconds * pipeline.SAMPLING_RATE)
+    pcm_cache = pipeline.open_pcm_cache()
+    # デコード済みの波形を先に作っておき、各計測プロセスはメモリマップで読む
+    pcm_file = pcm_cache.entry_path(audio_path) if pcm_cache is not None else None
+
+    results: List[dict] = []
+    for model_name in models:
+        for compute_type in compute_types:
+            label = f"{model_name} / {compute_type}"
+            # 候補ごとに新しいプロセスを使い、ピークメモリを個別に測る
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(
+                    _measure_candidate, model_name, device, compute_type, audio_path, pcm_file, samples
+                )
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    print(f"  {label}: ❌ {exc}")
+                    results.append({"model_name": model_name, "compute_type": compute_type, "error": str(exc)})
+                    continue
+
+            print(
+                f"  {label}: 読み込み {result['load_seconds']:.1f}秒 / RTF {result['rtf']:.3f}"
+                f" / ピークメモリ {result['peak_memory_mb']:,.0f}MiB"
+            )
+            results.append(result)
+    return results
+
+
+def choose_best(results: List[dict], models: List[str], target_rtf: float) -> Optional[tuple[dict, bool]]:
+    """採用する組み合わせと、目標 RTF を満たしたかどうかを返す。計測できた候補がなければ None。"""
+    measured = [r for r in results if "error" not in r and r["rtf"] is not None]
+    if not measured:
+        return None
+
+    within = [r for r in measured if r["rtf"] <= target_rtf]
+    if within:
+        return min(within, key=lambda r: (models.index(r["model_name"]), r["rtf"])), True
+    return min(measured, key=lambda r: r["rtf"]), False
+
+
+def save_calibration(path: Path, host: str, entry: dict) -> None:
+    """このマシンの結果を保存する。他のマシンの結果は残す。"""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    if data.get("version") != CALIBRATION_FORMAT_VERSION:
+        data = {"version": CALIBRATION_FORMAT_VERSION, "hosts": {}}
+    data["hosts"][host] = entry
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Whisper のモデルと計算精度を実測で選ぶ")
+    parser.add_argument("--audio", type=Path, default=None, help="基準クリップ（既定: AUDIO_FILENAME）")
+    parser.add_argument("--target-rtf", type=float, default=TARGET_RTF, help="目標の実時間係数")
+    parser.add_argument("--models", nargs="+", default=CANDIDATE_MODELS, help="候補のモデル（精度の高い順）")
+    parser.add_argument("--compute-types", nargs="+", default=CANDIDATE_COMPUTE_TYPES, help="候補の計算精度")
+    parser.add_argument("--device", default=DEVICE, help="デバイス")
+    parser.add_argument("--seconds", type=float, default=REFERENCE_SECONDS, help="基準クリップの長さ（秒）")
+    args = parser.parse_args()
+
+    audio_path = args.audio or pipeline.resolve_audio_path(
+        pipeline.AUDIO_FILENAME, pipeline.AUDIO_DIR, pipeline.ALLOWED_EXTS
+    )
+    if not audio_path.exists():
+        raise FileNotFoundError(f"基準クリップが見つかりません: {audio_path}")
+
+    host = pipeline.calibration_host()
+    print(f"📏 キャリブレーション開始: {host}（{audio_path} の先頭 {args.seconds:.0f}秒 / device={args.device}）")
+    print(f"🎯 目標 RTF: {args.target_rtf}")
+    results = measure_all(audio_path, args.models, args.compute_types, args.device, args.seconds)
+
+    chosen = choose_best(results, args.models, args.target_rtf)
+    if chosen is None:
+        print("❌ 計測できた組み合わせがありません。保存しませんでした")
+        return
+    best, met_target = chosen
+
+    save_calibration(
+        pipeline.CALIBRATION_PATH,
+        host,
+        {
+            "model_name": best["model_name"],
+            "device": args.device,
+            "compute_type": best["compute_type"],
+            "rtf": best["rtf"],
+            "peak_memory_mb": best["peak_memory_mb"],
+            "target_rtf": args.target_rtf,
+            "met_target": met_target,
+            "reference_audio": str(audio_path),
+            "reference_seconds": args.seconds,
+            "measured_at": datetime.now().isoformat(timespec="seconds"),
+            "results": results,
+        },
+    )
+    if not met_target:
+        print(f"⚠ 目標 RTF {args.target_rtf} を満たす組み合わせがないため、最も速い組み合わせを採用します")
+    print(f"✅ 採用: {best['model_name']} / {best['compute_type']}（RTF {best['rtf']:.3f}）")
+    print(f"📂 保存先: {pipeline.CALIBRATION_PATH}")
+
+
+if __name__ == "__main__":
+    main()
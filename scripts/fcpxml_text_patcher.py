@@ -0,0 +1,305 @@
+"""既存の FCPXML のテロップ（<title>）のテキストだけを書き換えるスクリプト。
+
+FCP や Vrew から書き出したプロジェクト（xml_output/sample.fcpxml など）で、
+テロップの時刻は正しいが文字が違う場合に、VTT / SRT / TXT のテキストで置き換える。
+
+- <title> の name 属性と、<text> 内の <text-style> の文字を書き換える
+  （複数の <text-style> に分かれている場合は、最初のものに全文を入れ、残りは空にする）
+- 対応づけ: "order"（出現順に1件ずつ）/ "time"（時刻の重なりが最も大きいキュー。VTT / SRT のみ）
+- それ以外のバイト列（インデントや属性の順序、コメントなど）は入力をそのままコピーする
+
+expat でストリーミング処理し、書き換えが確定した位置までを順に出力するため、
+数万件のテロップを含むプロジェクトでもメモリ使用量は一定で、数秒で処理できる。
+
+使い方:
+    python scripts/fcpxml_text_patcher.py xml_output/sample.fcpxml --source vtt_input/sample.vtt
+    python scripts/fcpxml_text_patcher.py project.fcpxml --source txt_input/sample.txt --match order -o out.fcpxml
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import deque
+from fractions import Fraction
+from itertools import accumulate
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from xml.parsers import expat
+from xml.sax.saxutils import escape
+
+from subtitle_parser import iter_cues
+from timeline import parse_fcpxml_time
+
+# ===================== 設定 =====================
+# 出力先（None で入力と同じディレクトリに「<入力名>.patched.fcpxml」）
+OUTPUT_PATH: Optional[Path] = None
+
+# 対応づけの方法: "order" / "time"
+MATCH_MODE = "time"
+# ===================== 設定ここまで =====================
+
+# 入力を読み込む単位（バイト）
+READ_CHUNK_SIZE = 1024 * 1024
+
+# 開始タグ全体（属性値の中の ">" も正しく扱う）
+START_TAG_RE = re.compile(rb"""<[^\s/>]+(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*(/?)>""")
+NAME_ATTR_RE = re.compile(rb"""\sname\s*=\s*(["'])""")
+
+TextChooser = Callable[[int, Optional[float], Optional[float]], Optional[str]]
+
+
+class SourceCue(NamedTuple):
+    """置き換え元のテキスト。時刻は秒（TXT の場合は None）。"""
+
+    start: Optional[float]
+    end: Optional[float]
+    text: str
+
+
+def load_source(path: str) -> List[SourceCue]:
+    """VTT / SRT / TXT から置き換え元のテキストを読み込む（TXT は1行1件で、時刻なし）。"""
+    return [
+        SourceCue(
+            cue.start_ms / 1000 if cue.start_ms is not None else None,
+            cue.end_ms / 1000 if cue.end_ms is not None else None,
+            cue.text,
+        )
+        for cue in iter_cues(path)
+    ]
+
+
+def order_chooser(cues: List[SourceCue]) -> TextChooser:
+    """n 番目のテロップに n 番目のテキストを割り当てる。"""
+
+    def choose(index: int, _start, _end) -> Optional[str]:
+        return cues[index].text if index < len(cues) else None
+
+    return choose
+
+
+def overlap_chooser(cues: List[SourceCue]) -> TextChooser:
+    """テロップと時刻の重なりが最も大きいキューのテキストを割り当てる。"""
+    if any(c.start is None for c in cues):
+        raise ValueError("時刻での対応づけには VTT / SRT が必要です（TXT は --match order を使ってください）")
+    cues = sorted(cues, key=lambda c: c.start)
+    starts = [c[0] for c in cues]
+    # i 番目までのキューの終了時刻の最大値（これ以前のキューが重なりうるかの判定に使う）
+    max_ends = list(accumulate((c[1] for c in cues), max))
+
+    def choose(_index: int, start, end) -> Optional[str]:
+        if start is None:
+            return None
+        best, best_overlap = None, 0.0
+        j = bisect_right(starts, end) - 1
+        while j >= 0 and max_ends[j] > start:
+            cue_start, cue_end, text = cues[j]
+            overlap = min(end, cue_end) - max(start, cue_start)
+            if overlap > best_overlap:
+                best, best_overlap = text, overlap
+            j -= 1
+        return best
+
+    return choose
+
+
+class _Edit(NamedTuple):
+    start: int  # 置き換える範囲の先頭（入力の絶対バイト位置）
+    end: int
+    data: bytes
+
+
+class _Frame(NamedTuple):
+    name: str
+    offset: Optional[str]  # 親のローカル時刻での位置（属性の文字列のまま）
+    start: Optional[str]  # この要素のローカル時刻の先頭
+
+
+class FcpxmlTextPatcher:
+    """FCPXML を少しずつ受け取り、テロップのテキストを書き換えて out に書き出す。"""
+
+    def __init__(self, out, choose_text: TextChooser):
+        self.out = out
+        self.choose_text = choose_text
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+
+        self.buffer = bytearray()
+        self.buffer_start = 0  # buffer[0] の入力上の位置
+        self.edits: deque = deque()
+        self.last_event = 0  # 最後に処理したタグの開始位置（これより前は確定済み）
+        self.barrier: Optional[int] = None  # 書き換え中の <text-style> の中身の先頭
+
+        self.stack: List[_Frame] = [_Frame("", None, None)]
+        self.title_text: Optional[str] = None  # 処理中の <title> に入れるテキスト
+        self.title_runs = 0
+        self.titles = 0
+        self.patched = 0
+
+    # ---------- 入出力 ----------
+
+    def feed(self, data: bytes) -> None:
+        self.buffer += data
+        self.parser.Parse(data, False)
+        self._flush(self.last_event if self.barrier is None else min(self.last_event, self.barrier))
+
+    def close(self) -> None:
+        self.parser.Parse(b"", True)
+        self._flush(self.buffer_start + len(self.buffer))
+
+    def _flush(self, safe: int) -> None:
+        """safe より前のバイトを、書き換えを反映して出力する。"""
+        pos = self.buffer_start
+        while self.edits and self.edits[0].start < safe:
+            edit = self.edits.popleft()
+            self.out.write(self.buffer[pos - self.buffer_start:edit.start - self.buffer_start])
+            self.out.write(edit.data)
+            pos = edit.end
+        if safe > pos:
+            self.out.write(self.buffer[pos - self.buffer_start:safe - self.buffer_start])
+            pos = safe
+        del self.buffer[:pos - self.buffer_start]
+        self.buffer_start = pos
+
+    def _start_tag(self, index: int) -> re.Match:
+        match = START_TAG_RE.match(self.buffer, index - self.buffer_start)
+        if match is None:
+            raise ValueError(f"開始タグを読み取れません（{index}バイト目）")
+        return match
+
+    # ---------- expat のハンドラ ----------
+
+    def _start(self, name: str, attrs: dict) -> None:
+        index = self.parser.CurrentByteIndex
+        self.last_event = index
+
+        parent = self.stack[-1]
+        self.stack.append(_Frame(name, attrs.get("offset"), attrs.get("start")))
+
+        if name == "title":
+            abs_start, abs_end = self._title_range(attrs.get("duration"))
+            self.title_text = self.choose_text(self.titles, abs_start, abs_end)
+            self.title_runs = 0
+            self.titles += 1
+            if self.title_text is not None:
+                self.patched += 1
+                if "name" in attrs:
+                    self._replace_name(index)
+        elif name == "text-style" and self.title_text is not None and parent.name == "text":
+            self._begin_text_run(index)
+
+    def _end(self, name: str) -> None:
+        index = self.parser.CurrentByteIndex
+        self.last_event = index
+        self.stack.pop()
+
+        if name == "text-style" and self.barrier is not None:
+            self.edits.append(_Edit(self.barrier, index, self._run_text()))
+            self.barrier = None
+        elif name == "title":
+            self.title_text = None
+
+    def _title_range(self, duration: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+        """処理中の <title> のタイムライン上の (開始, 終了) 秒。offset がなければ (None, None)。
+
+        offset は親のローカル時刻で、親の start がタイムライン上の親の offset に当たる。
+        時刻の計算はテロップの分だけで済むよう、ここで祖先をたどって行う。
+        """
+        if self.stack[-1].offset is None or duration is None:
+            return None, None
+        position = Fraction(0)
+        for frame in self.stack[1:]:
+            if frame.offset is not None:
+                position += parse_fcpxml_time(frame.offset)
+            if frame is not self.stack[-1] and frame.start is not None:
+                position -= parse_fcpxml_time(frame.start)
+        return float(position), float(position + parse_fcpxml_time(duration))
+
+    def _replace_name(self, index: int) -> None:
+        """<title> の開始タグの name 属性の値を置き換える。"""
+        tag = self._start_tag(index)
+        attr = NAME_ATTR_RE.search(self.buffer, tag.start(), tag.end())
+        quote = attr.group(1)
+        value_start = attr.end()
+        value_end = self.buffer.index(quote, value_start)
+        entities = {'"': "&quot;"} if quote == b'"' else {"'": "&apos;"}
+        value = escape(self.title_text.replace("\n", " "), entities).replace("\r", "")
+        self.edits.append(_Edit(
+            self.buffer_start + value_start,
+            self.buffer_start + value_end,
+            value.encode("utf-8"),
+        ))
+
+    def _begin_text_run(self, index: int) -> None:
+        """<text-style> の中身の置き換えを始める（空要素なら中身を足す）。"""
+        tag = self._start_tag(index)
+        tag_end = self.buffer_start + tag.end()
+        if tag.group(1):
+            # <text-style .../> → <text-style ...>テキスト</text-style>
+            self.edits.append(_Edit(
+                self.buffer_start + tag.start(1),
+                tag_end,
+                b">" + self._run_text() + b"</text-style>",
+            ))
+        else:
+            self.barrier = tag_end
+
+    def _run_text(self) -> bytes:
+        """最初の <text-style> には全文、2つ目以降は空文字を入れる。"""
+        self.title_runs += 1
+        text = self.title_text if self.title_runs == 1 else ""
+        return escape(text).encode("utf-8")
+
+
+def patch_fcpxml(input_path: Path, output_path: Path, choose_text: TextChooser) -> FcpxmlTextPatcher:
+    """input_path のテロップを書き換えて output_path に保存する。"""
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with open(input_path, "rb") as src, open(tmp_path, "wb") as dst:
+        patcher = FcpxmlTextPatcher(dst, choose_text)
+        while chunk := src.read(READ_CHUNK_SIZE):
+            patcher.feed(chunk)
+        patcher.close()
+    os.replace(tmp_path, output_path)
+    return patcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FCPXML のテロップのテキストを VTT / SRT / TXT で書き換える")
+    parser.add_argument("input", type=Path, help="書き換える FCPXML")
+    parser.add_argument("--source", required=True, help="置き換え元のテキスト（.vtt / .srt / .txt）")
+    parser.add_argument("--match", choices=["order", "time"], default=MATCH_MODE, help="対応づけの方法")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_PATH, help="出力先")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ FCPXML が見つかりません: {args.input}")
+        return
+    if not os.path.exists(args.source):
+        print(f"❌ 置き換え元のファイルが見つかりません: {args.source}")
+        return
+    output_path = args.output or args.input.with_name(f"{args.input.stem}.patched.fcpxml")
+
+    cues = load_source(args.source)
+    try:
+        chooser = overlap_chooser(cues) if args.match == "time" else order_chooser(cues)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return
+
+    started = time.perf_counter()
+    patcher = patch_fcpxml(args.input, output_path, chooser)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {patcher.patched}/{patcher.titles}件のテロップを書き換えました: {output_path}（{elapsed:.2f}秒）")
+    if patcher.patched < patcher.titles:
+        print(f"⚠ {patcher.titles - patcher.patched}件は対応するテキストがないため、そのままです")
+    if args.match == "order" and len(cues) != patcher.titles:
+        print(f"⚠ テキストの件数（{len(cues)}）とテロップの件数（{patcher.titles}）が一致しません")
+
+
+if __name__ == "__main__":
+    main()
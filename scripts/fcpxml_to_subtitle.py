@@ -0,0 +1,129 @@
+"""FCPXML（Vrew / FCP の書き出し）のテロップを、字幕のキューとして取り出すスクリプト。
+
+xml_output/sample.fcpxml のような FCPXML から、<title> ごとに
+parse_subtitle_from_file() と同じ Cue（ミリ秒の時刻とテキスト）を作り、VTT / SRT に書き出す。
+
+- 時刻は <gap> / <title> などの有理数の offset / start / duration から求める
+  （offset は親のローカル時刻で、親の start がタイムライン上の親の offset に当たる）
+- 時刻は、その要素が属する <format> の frameDuration のフレーム境界に丸める
+  （frameDuration のない <format> は、親の要素のフレームレートを使う）
+- iterparse で読み、処理の済んだ要素は順に捨てるため、巨大なライブラリでもメモリ使用量は増えない
+
+使い方:
+    python scripts/fcpxml_to_subtitle.py xml_output/sample.fcpxml
+    python scripts/fcpxml_to_subtitle.py project.fcpxml -o srt_input/project.srt
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from xml.etree.ElementTree import iterparse
+
+from subtitle_parser import Cue, write_subtitle_file
+from timeline import parse_fcpxml_time
+
+# ===================== 設定 =====================
+# 出力先のディレクトリ（-o を指定しない場合は「<入力名>.vtt」）
+OUTPUT_DIR = Path("vtt_output")
+# ===================== 設定ここまで =====================
+
+
+class _Frame(NamedTuple):
+    element: object
+    frame_duration: Optional[Fraction]  # この要素の時刻を丸めるフレームの長さ
+    in_title: bool
+
+
+def snap_to_frame(seconds: Fraction, frame_duration: Optional[Fraction]) -> Fraction:
+    """秒数を最も近いフレーム境界に丸める（フレームの長さが不明ならそのまま）。"""
+    if not frame_duration:
+        return seconds
+    return round(seconds / frame_duration) * frame_duration
+
+
+def _timeline_position(stack: List[_Frame], element) -> Fraction:
+    """element の offset のタイムライン上の時刻。
+
+    offset は親のローカル時刻で、親の start がタイムライン上の親の offset に当たる。
+    時刻の計算はテロップの分だけで済むよう、ここで祖先をたどって行う。
+    """
+    position = parse_fcpxml_time(element.get("offset", "0s"))
+    for frame in stack:
+        attrs = frame.element.attrib
+        if "offset" in attrs:
+            position += parse_fcpxml_time(attrs["offset"]) - parse_fcpxml_time(attrs.get("start", "0s"))
+    return position
+
+
+def _title_text(title) -> str:
+    """<title> の <text> 内の <text-style> の文字をつなげる。"""
+    text = title.find("text")
+    if text is None:
+        return ""
+    return "".join(style.text or "" for style in text.iter("text-style")).strip()
+
+
+def iter_cues(fcpxml_path: str) -> Iterator[Cue]:
+    """FCPXML の <title> を、文書内の順にキューとして返す（行番号は持たない）。"""
+    formats: Dict[str, Optional[Fraction]] = {}
+    stack: List[_Frame] = []
+
+    for event, element in iterparse(fcpxml_path, events=("start", "end")):
+        if event == "start":
+            parent = stack[-1] if stack else _Frame(None, None, False)
+            attrs = element.attrib
+            if element.tag == "format":
+                frame_duration = attrs.get("frameDuration")
+                formats[attrs.get("id", "")] = parse_fcpxml_time(frame_duration) if frame_duration else None
+
+            frame_duration = formats.get(attrs.get("format", "")) or parent.frame_duration
+            stack.append(_Frame(element, frame_duration, parent.in_title or element.tag == "title"))
+            continue
+
+        frame = stack.pop()
+        if element.tag == "title" and "offset" in element.attrib and "duration" in element.attrib:
+            text = _title_text(element)
+            if text:
+                start = _timeline_position(stack, element)
+                end = start + parse_fcpxml_time(element.attrib["duration"])
+                yield Cue(
+                    round(snap_to_frame(start, frame.frame_duration) * 1000),
+                    round(snap_to_frame(end, frame.frame_duration) * 1000),
+                    text,
+                )
+
+        # <title> の中身は、<title> の終わりで文字を取り出すまで残しておく
+        if not frame.in_title or element.tag == "title":
+            element.clear()
+            if stack:
+                stack[-1].element.remove(element)
+
+
+def extract_cues(fcpxml_path: str) -> List[Cue]:
+    """FCPXML のテロップを、開始時刻順のキューの一覧にする。"""
+    return sorted(iter_cues(fcpxml_path), key=lambda cue: cue.start_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FCPXML のテロップを VTT / SRT に書き出す")
+    parser.add_argument("input", help="読み込む FCPXML")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="出力先（拡張子 .srt で SRT、それ以外は VTT）")
+    args = parser.parse_args()
+
+    if not Path(args.input).exists():
+        print(f"❌ FCPXML が見つかりません: {args.input}")
+        return
+    output_path = args.output or OUTPUT_DIR / f"{Path(args.input).stem}.vtt"
+
+    started = time.perf_counter()
+    cues = extract_cues(args.input)
+    write_subtitle_file(output_path, cues)
+    print(f"✅ {len(cues)}件のテロップを書き出しました: {output_path}（{time.perf_counter() - started:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""読み上げ前にセリフの読みを直す「読み辞書」。
+
+CSV（列: 表記, 読み）から辞書を読み込み、トライ木にまとめて1回だけコンパイルする。
+セリフは左から1回走査し、各位置で最も長く一致する表記を読みに置き換える（最左最長一致）。
+
+- 置き換えた結果は再び走査しないため、ある規則の読みが別の規則に書き換えられることはない
+- 「Final Cut Pro」と「Final」のように重なる表記は、長い方が優先される
+- 1行の処理時間は規則の数によらず、「文字数 × 一致した表記の長さ」程度で済む
+
+コンパイルした辞書は、CSV の中身のハッシュをキーに cache/ に保存し、
+辞書が変わらない限り次回からはそれを読み込む。
+"""
+
+from __future__ import annotations
+
+import csv
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from transcript_cache import file_sha256
+
+# コンパイル済み辞書のキャッシュ形式のバージョン（形式を変えたら上げる）
+CACHE_FORMAT_VERSION = 1
+
+# トライ木のノードで「ここまでで表記が終わる」ことを表すキー（1文字のキーとは重ならない）
+_END = ""
+
+# 辞書 CSV のヘッダー行（あれば読み飛ばす）
+HEADER = ("表記", "読み")
+
+
+def load_entries(path: Path) -> Dict[str, str]:
+    """辞書 CSV を {表記: 読み} にする。
+
+    空行と、先頭が # の行は読み飛ばす。同じ表記が複数あれば後の行を使う。
+    """
+    entries: Dict[str, str] = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0] or row[0].startswith("#") or tuple(row[:2]) == HEADER:
+                continue
+            entries[row[0]] = row[1]
+    return entries
+
+
+class ReadingDictionary:
+    """コンパイル済みの読み辞書。"""
+
+    def __init__(self, trie: dict, size: int):
+        self.trie = trie
+        self.size = size
+        # 表記の先頭になりうる文字。それ以外の位置ではトライ木をたどらない
+        self._first_chars = re.compile("[" + "".join(re.escape(ch) for ch in trie) + "]") if trie else None
+
+    @classmethod
+    def compile(cls, entries: Dict[str, str]) -> "ReadingDictionary":
+        """{表記: 読み} からトライ木を作る。"""
+        trie: dict = {}
+        for surface, reading in entries.items():
+            if not surface:
+                continue
+            node = trie
+            for ch in surface:
+                node = node.setdefault(ch, {})
+            node[_END] = reading
+        return cls(trie, len(entries))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def apply(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """text の読みを直し、(直した文字列, 置き換えた (表記, 読み) の一覧) を返す。"""
+        if self._first_chars is None:
+            return text, []
+
+        parts: List[str] = []
+        replaced: List[Tuple[str, str]] = []
+        pos = 0
+        length = len(text)
+        for match in self._first_chars.finditer(text):
+            start = match.start()
+            if start < pos:
+                continue  # 直前に置き換えた表記の途中
+            node = self.trie
+            i = start
+            end = reading = None
+            while i < length:
+                node = node.get(text[i])
+                if node is None:
+                    break
+                i += 1
+                if _END in node:
+                    end, reading = i, node[_END]
+            if end is not None:
+                parts.append(text[pos:start])
+                parts.append(reading)
+                replaced.append((text[start:end], reading))
+                pos = end
+        if not replaced:
+            return text, []
+        parts.append(text[pos:])
+        return "".join(parts), replaced
+
+
+def load_dictionary(path: Path, cache_dir: Optional[Path] = None) -> ReadingDictionary:
+    """辞書 CSV を読み込んでコンパイルする。
+
+    cache_dir を指定すると、CSV の中身のハッシュが同じ間はコンパイル済みの辞書を読み込む
+    （古い辞書のキャッシュは保存時に削除する）。
+    """
+    if cache_dir is None:
+        return ReadingDictionary.compile(load_entries(path))
+
+    cache_path = cache_dir / f"{file_sha256(path)}.pickle"
+    try:
+        with open(cache_path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == CACHE_FORMAT_VERSION:
+            return ReadingDictionary(data["trie"], data["size"])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    dictionary = ReadingDictionary.compile(load_entries(path))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for old in cache_dir.glob("*.pickle"):
+        old.unlink(missing_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"version": CACHE_FORMAT_VERSION, "trie": dictionary.trie, "size": dictionary.size},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    tmp_path.replace(cache_path)
+    return dictionary
@@ -0,0 +1,81 @@
+"""シナリオ CSV（列: 実行, キャラクター, セリフ）を1行ずつ読むリーダー。
+
+pandas を使わずに標準の csv モジュールで先頭から読み、条件に合う行だけを
+ScenarioLine として返す。ファイル全体を読み込まないため、大きなシナリオでも
+メモリ使用量は増えず、起動も速い。
+
+読み飛ばす行（従来の pandas での処理と同じ）:
+- 「実行」が数値として 1 でない行（空欄・数値でない値を含む）
+- 「キャラクター」が指定したキャラクターと一致しない行
+- 「セリフ」が空欄の行
+- 空行
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+# 必須の列名
+RUN_COLUMN = "実行"
+CHARACTER_COLUMN = "キャラクター"
+TEXT_COLUMN = "セリフ"
+
+
+class ScenarioLine(NamedTuple):
+    """読み上げるセリフ1行。line_no は CSV の行番号（ヘッダーが1行目）。"""
+
+    line_no: int
+    character: str
+    text: str
+
+
+def _open_csv(path: Path):
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def read_columns(path: Path) -> List[str]:
+    """ヘッダー行の列名を返す。"""
+    with _open_csv(path) as f:
+        return next(csv.reader(f), [])
+
+
+def _is_run(value: str) -> bool:
+    """「実行」の値が数値として 1 か（"1" / "1.0" / " 1 " など）。"""
+    try:
+        return float(value) == 1
+    except ValueError:
+        return False
+
+
+def iter_scenario_lines(path: Path, character: Optional[str] = None) -> Iterator[ScenarioLine]:
+    """実行対象のセリフを1行ずつ返す（character を指定するとそのキャラクターの行だけ）。
+
+    必須の列がなければ ValueError。
+    """
+    with _open_csv(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = [c for c in (RUN_COLUMN, CHARACTER_COLUMN, TEXT_COLUMN) if c not in header]
+        if missing:
+            raise ValueError(f"CSV に必要な列がありません: {', '.join(missing)}（列名: {header}）")
+        run_index = header.index(RUN_COLUMN)
+        character_index = header.index(CHARACTER_COLUMN)
+        text_index = header.index(TEXT_COLUMN)
+        width = max(run_index, character_index, text_index) + 1
+
+        for row in reader:
+            if len(row) < width:
+                # 列の足りない行は、足りない列を空欄として扱う
+                if not any(row):
+                    continue
+                row = row + [""] * (width - len(row))
+            if row[run_index] != "1" and not _is_run(row[run_index]):
+                continue
+            if character is not None and row[character_index] != character:
+                continue
+            text = row[text_index]
+            if not text:
+                continue
+            yield ScenarioLine(reader.line_num, row[character_index], text)
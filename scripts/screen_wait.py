@@ -0,0 +1,176 @@
+"""画面の指定領域が変化しなくなるまで待つ、固定ウェイトの代わりの待機処理。
+
+FCP の自動操作では、キー操作のたびに SLEEP_SHORT などの固定時間だけ待っている。
+この値は最も遅い場合に合わせてあるため、速いマシンでは大半が何もしない待ち時間になる。
+
+ScreenWaiter.wait(上限秒) は、監視する領域のチェックサムを一定間隔で取り、
+同じ値が STABLE_POLLS 回続いた（描画が止まった）時点で戻る。
+上限秒（従来の固定ウェイト）を過ぎても変化が続く場合は、そこで打ち切る。
+
+画面の取得元は差し替えられる:
+- PyAutoGuiScreen: 実際の画面（pyautogui のスクリーンショット）
+- FakeScreen: 操作のたびに一定時間だけ変化する疑似画面（画面のない Linux での確認用）
+
+`python scripts/screen_wait.py` で、疑似画面を使って短縮できる時間を試算できます。
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from typing import Callable, Optional, Tuple
+
+Region = Tuple[int, int, int, int]  # (left, top, width, height)
+
+# ===================== 設定 =====================
+# チェックサムを取る間隔（秒）
+POLL_INTERVAL = 0.05
+
+# 同じチェックサムがこの回数続いたら、描画が終わったとみなす
+STABLE_POLLS = 3
+
+# 操作直後、画面が反応し始める前に戻らないよう最低限待つ時間（秒）
+MIN_WAIT = 0.1
+# ===================== 設定ここまで =====================
+
+
+class PyAutoGuiScreen:
+    """pyautogui で実際の画面を取得する。"""
+
+    def grab(self, region: Optional[Region]) -> bytes:
+        import pyautogui
+
+        return pyautogui.screenshot(region=region).tobytes()
+
+
+class VirtualClock:
+    """実際には眠らずに時刻だけを進める時計（FakeScreen と組み合わせて使う）。"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+
+class FakeScreen:
+    """操作（touch）のたびに busy_seconds の間だけ内容が変わり続ける疑似画面。"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.busy_until = 0.0
+        self.frame = 0
+
+    def touch(self, busy_seconds: float) -> None:
+        """操作を受け付け、busy_seconds 後まで描画が続く状態にする。"""
+        self.busy_until = self.clock() + busy_seconds
+
+    def grab(self, region: Optional[Region]) -> bytes:
+        if self.clock() < self.busy_until:
+            self.frame += 1
+        return self.frame.to_bytes(8, "little")
+
+
+class ScreenWaiter:
+    """画面の変化が止まるまで待ち、固定ウェイトと比べて短縮した時間を集計する。"""
+
+    def __init__(
+        self,
+        source,
+        region: Optional[Region] = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.source = source
+        self.region = region
+        self.enabled = enabled
+        self.clock = clock
+        self.sleep = sleep
+        self.wait_count = 0
+        self.timeout_count = 0
+        self.fixed_total = 0.0  # 固定ウェイトだった場合の合計（秒）
+        self.waited_total = 0.0  # 実際に待った合計（秒）
+
+    def checksum(self) -> int:
+        """監視領域の内容のチェックサム。"""
+        return zlib.crc32(self.source.grab(self.region))
+
+    def wait(self, timeout: float) -> float:
+        """監視領域が変化しなくなるまで、最大 timeout 秒待つ。実際に待った秒数を返す。
+
+        無効な場合や取得元が失敗した場合は、従来どおり timeout 秒待つ。
+        """
+        started = self.clock()
+        if self.enabled:
+            try:
+                timed_out = self._poll_until_stable(started + timeout)
+            except Exception as exc:  # noqa: BLE001
+                print(f"⚠ 画面の取得に失敗したため、固定ウェイトに戻します: {exc}")
+                self.enabled = False
+                timed_out = False
+            else:
+                self.timeout_count += timed_out
+        if not self.enabled:
+            self.sleep(max(0.0, started + timeout - self.clock()))
+
+        waited = self.clock() - started
+        self.wait_count += 1
+        self.fixed_total += timeout
+        self.waited_total += waited
+        return waited
+
+    def _poll_until_stable(self, deadline: float) -> bool:
+        """描画が止まるか deadline を過ぎるまでポーリングする。打ち切った場合は True。"""
+        self.sleep(min(MIN_WAIT, max(0.0, deadline - self.clock())))
+        last = self.checksum()
+        stable = 0
+        while stable < STABLE_POLLS:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return True
+            self.sleep(min(POLL_INTERVAL, remaining))
+            current = self.checksum()
+            if current == last:
+                stable += 1
+            else:
+                stable = 0
+                last = current
+        return False
+
+    @property
+    def saved_seconds(self) -> float:
+        """固定ウェイトと比べて短縮した時間（秒）。"""
+        return self.fixed_total - self.waited_total
+
+    def report(self) -> None:
+        """短縮できた時間を表示する。"""
+        if not self.wait_count:
+            return
+        print(
+            f"⏱ 待機 {self.wait_count}回: {self.waited_total:.1f}秒"
+            f"（固定ウェイト {self.fixed_total:.1f}秒 → {self.saved_seconds:.1f}秒短縮"
+            f" / 上限まで待った回数 {self.timeout_count}回）"
+        )
+
+
+def simulate(actions: int = 600, timeout: float = 0.5, seed: int = 1234) -> ScreenWaiter:
+    """疑似画面で、描画時間がばらつく操作を actions 回行ったときの待機時間を試算する。"""
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    screen = FakeScreen(clock.time)
+    waiter = ScreenWaiter(screen, clock=clock.time, sleep=clock.sleep)
+    for _ in range(actions):
+        # 大半の操作はすぐ描画が終わり、まれに固定ウェイトを超えるほど遅くなる
+        screen.touch(rng.choice([0.02, 0.05, 0.1, 0.15, 0.3, 0.8]))
+        waiter.wait(timeout)
+    return waiter
+
+
+if __name__ == "__main__":
+    print("🧪 疑似画面で試算します（600回の操作 / 固定ウェイト 0.5秒）")
+    simulate().report()
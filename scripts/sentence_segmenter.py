@@ -0,0 +1,292 @@
+"""Whisper の単語タイムスタンプを文単位に分割する配列ベースの分割エンジン。
+
+ファイル全体の単語の開始・終了時刻を NumPy 配列に並べ、
+無音ギャップ・文の長さ（秒）・単語数による分割位置をまとめて求める。
+
+- cross_segment=False: セグメントの境界で必ず区切る（従来の split_into_sentences と同じ分割）
+- cross_segment=True: セグメントの境界でも単語間の無音で判定する
+  （Whisper のセグメントをまたぐ無音も分割点になる）
+
+単語を持たないセグメントは、そのまま1文として扱い、前後の区切りにもなる。
+
+従来の実装からの変更点として、秒数・単語数の上限で区切った後の文は、その文の最初の
+単語の開始時刻から始まる。従来はセグメントの最初の単語の開始時刻に戻って前の文と
+時刻が重なり（単語数の上限で続けて区切ると開始時刻が None になり）、秒数の上限も
+次の無音ギャップまで効かなくなっていた。
+"""
+
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+Sentence = Tuple[float, float, str]
+
+# この単語数未満の入力は配列を作らずループ実装で分割する
+SMALL_INPUT_WORDS = 256
+
+# 秒数の上限の候補を searchsorted で求めるときに、丸め誤差の分だけ手前から探す幅（秒）
+_TIME_TOLERANCE = 1e-6
+
+_get_start = attrgetter("start")
+_get_end = attrgetter("end")
+_get_word = attrgetter("word")
+
+
+class WordArrays(NamedTuple):
+    """ファイル全体の単語を並べた配列。"""
+
+    starts: np.ndarray  # 単語の開始時刻（秒）
+    ends: np.ndarray  # 単語の終了時刻（秒）
+    texts: List[str]  # 単語のテキスト
+    segment_ids: np.ndarray  # 単語が属するセグメントの番号
+    wordless: List[Tuple[int, Sentence]]  # 単語のないセグメント（直後の単語の位置, 文）
+
+
+def collect_word_arrays(segments: Iterable) -> WordArrays:
+    """Whisper のセグメント列から単語の配列を作る。"""
+    all_words: list = []
+    segment_sizes: List[int] = []
+    wordless: List[Tuple[int, Sentence]] = []
+
+    for seg in segments:
+        words = seg.words or []
+        if not words:
+            wordless.append((len(all_words), (seg.start, seg.end, seg.text.strip())))
+            segment_sizes.append(0)
+            continue
+        all_words.extend(words)
+        segment_sizes.append(len(words))
+
+    n = len(all_words)
+    return WordArrays(
+        np.fromiter(map(_get_start, all_words), dtype=np.float64, count=n),
+        np.fromiter(map(_get_end, all_words), dtype=np.float64, count=n),
+        list(map(_get_word, all_words)),
+        np.repeat(np.arange(len(segment_sizes), dtype=np.int64), segment_sizes),
+        wordless,
+    )
+
+
+def _hard_breaks(words: WordArrays, cross_segment: bool) -> np.ndarray:
+    """必ず区切る位置（その単語の直前で区切る）のマスクを返す。"""
+    n = len(words.texts)
+    hard = np.zeros(n, dtype=bool)
+    if n == 0:
+        return hard
+    hard[0] = True
+    if not cross_segment:
+        hard[1:] = words.segment_ids[1:] != words.segment_ids[:-1]
+    # 単語のないセグメントの直後は区切る
+    for pos, _sentence in words.wordless:
+        if pos < n:
+            hard[pos] = True
+    return hard
+
+
+def find_sentence_starts(
+    words: WordArrays,
+    max_gap: float,
+    max_seconds: Optional[float] = None,
+    max_words: Optional[int] = None,
+    cross_segment: bool = False,
+) -> np.ndarray:
+    """各文の先頭の単語位置を昇順で返す。
+
+    無音ギャップと単語数による区切りは配列演算で一度に求める。
+    秒数の上限は文の開始位置に依存するため、全単語について「そこから文を始めた場合の
+    最後の単語」を searchsorted でまとめて求め、1文に収まらないランだけその連鎖をたどる。
+    """
+    n = len(words.texts)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    starts, ends = words.starts, words.ends
+    run_break = _hard_breaks(words, cross_segment)
+    run_break[1:] |= (starts[1:] - ends[:-1]) > max_gap
+
+    if max_seconds is None:
+        if max_words is None:
+            return np.flatnonzero(run_break)
+        # 区切りの間（ラン）の中での位置が max_words の倍数になる単語で区切る
+        index = np.arange(n)
+        run_start = np.maximum.accumulate(np.where(run_break, index, 0))
+        offset = index - run_start
+        return np.flatnonzero(run_break | ((offset > 0) & (offset % max_words == 0)))
+
+    # 各単語から文を始めたとき、その文の最後になる単語位置を全単語についてまとめて求める。
+    # 判定はループ実装と同じ「終了 - 開始 >= 上限」の引き算で行う（「終了 >= 開始 + 上限」とは
+    # 浮動小数点の丸めで結果が変わる）。searchsorted には少し手前の候補を返させ、候補から確かめる
+    index = np.arange(n)
+    max_end = np.maximum.accumulate(ends)
+    last = np.searchsorted(max_end, starts + (max_seconds - _TIME_TOLERANCE), side="left")
+
+    # 手前の単語の終了時刻がすでに上限を超えている（終了時刻が単調でない）場合は個別に探す
+    for i in np.flatnonzero(last < index).tolist():
+        hits = np.flatnonzero(ends[i:] - starts[i] >= max_seconds)
+        last[i] = i + int(hits[0]) if len(hits) else n
+
+    # 候補が上限に届いていなければ、届く単語まで1つずつ進める（丸め誤差の範囲の単語だけ）
+    pending = np.flatnonzero(last < n)
+    while len(pending):
+        pending = pending[(ends[last[pending]] - starts[pending]) < max_seconds]
+        last[pending] += 1
+        pending = pending[last[pending] < n]
+
+    run_starts = np.flatnonzero(run_break)
+    run_stops = np.append(run_starts[1:], n)
+    run_ids = np.cumsum(run_break) - 1
+    last = np.minimum(last, run_stops[run_ids] - 1)
+    if max_words is not None:
+        last = np.minimum(last, index + max_words - 1)
+
+    # ラン全体が1文に収まらないランだけ、先頭から「文の最後の次の単語」をたどって区切る
+    heads = run_break.copy()
+    overflow = np.flatnonzero(last[run_starts] < run_stops - 1)
+    if len(overflow):
+        next_head = (last + 1).tolist()
+        for run_begin, run_stop in zip(run_starts[overflow].tolist(), run_stops[overflow].tolist()):
+            i = next_head[run_begin]
+            while i < run_stop:
+                heads[i] = True
+                i = next_head[i]
+
+    return np.flatnonzero(heads)
+
+
+def split_word_arrays(
+    words: WordArrays,
+    max_gap: float,
+    max_seconds: Optional[float] = None,
+    max_words: Optional[int] = None,
+    cross_segment: bool = False,
+) -> List[Sentence]:
+    """単語の配列を (開始秒, 終了秒, テキスト) の文の一覧に分割する。"""
+    n = len(words.texts)
+    heads = find_sentence_starts(words, max_gap, max_seconds, max_words, cross_segment)
+    tails = np.append(heads[1:], n)[:len(heads)] - 1
+
+    # 全単語を1つの文字列につなげ、文のテキストは文字位置の範囲で切り出す
+    joined = "".join(words.texts)
+    char_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, words.texts), dtype=np.int64, count=n), out=char_offsets[1:])
+    text_begins = char_offsets[heads].tolist()
+    text_ends = char_offsets[tails + 1].tolist()
+
+    head_starts = words.starts[heads].tolist()
+    tail_ends = words.ends[tails].tolist()
+
+    texts = [joined[begin:end].strip() for begin, end in zip(text_begins, text_ends)]
+    sentences: List[Sentence] = list(zip(head_starts, tail_ends, texts))
+    if not words.wordless:
+        return sentences
+
+    # 単語のないセグメントを元の順序の位置に差し込む
+    merged: List[Sentence] = []
+    wordless = iter(words.wordless)
+    pending = next(wordless, None)
+    for head, sentence in zip(heads.tolist(), sentences):
+        while pending is not None and pending[0] <= head:
+            merged.append(pending[1])
+            pending = next(wordless, None)
+        merged.append(sentence)
+    while pending is not None:
+        merged.append(pending[1])
+        pending = next(wordless, None)
+
+    return merged
+
+
+def split_into_sentences(
+    segments: Iterable,
+    max_gap: float,
+    max_seconds: Optional[float] = None,
+    max_words: Optional[int] = None,
+    cross_segment: bool = False,
+) -> List[Sentence]:
+    """Whisper のセグメントを文単位に分割する（配列ベース）。
+
+    ストリーミング出力のように少数のセグメントを何度も分割する場合は、配列を作る
+    手間の方が大きいため、結果が同じになるループ実装で処理する。
+    """
+    segments = list(segments)
+    if not cross_segment and sum(len(seg.words or []) for seg in segments) < SMALL_INPUT_WORDS:
+        return split_into_sentences_loop(segments, max_gap, max_seconds, max_words)
+    words = collect_word_arrays(segments)
+    return split_word_arrays(words, max_gap, max_seconds, max_words, cross_segment)
+
+
+def iter_closed_groups(segments: Iterable, max_gap: float, cross_segment: bool) -> Iterator[list]:
+    """分割結果が後続のセグメントに左右されない単位でセグメントをまとめて返す。
+
+    cross_segment=False ではセグメントごと、True では前のセグメントの最後の単語と
+    次のセグメントの最初の単語の間が max_gap を超えたところ（または単語のないセグメント）
+    で区切る。ストリーミング出力で、確定した文から順に書き出すために使う。
+    """
+    group: list = []
+    last_end: Optional[float] = None
+    for seg in segments:
+        words = seg.words or []
+        if group and (
+            not cross_segment
+            or not words
+            or last_end is None
+            or (words[0].start - last_end) > max_gap
+        ):
+            yield group
+            group = []
+        group.append(seg)
+        last_end = words[-1].end if words else None
+    if group:
+        yield group
+
+
+def split_into_sentences_loop(
+    segments: Iterable,
+    max_gap: float,
+    max_seconds: Optional[float] = None,
+    max_words: Optional[int] = None,
+) -> List[Sentence]:
+    """セグメントごとに単語を1つずつ処理する従来の分割処理（比較・検証用）。
+
+    上限で区切った後の文の開始時刻は、その文の最初の単語の開始時刻にする（モジュールの説明を参照）。
+    """
+    sentences: List[Sentence] = []
+
+    for seg in segments:
+        words = seg.words or []
+        if not words:
+            sentences.append((seg.start, seg.end, seg.text.strip()))
+            continue
+
+        buffer: list[str] = []
+        start_time = words[0].start
+        last_end = words[0].end
+
+        for w in words:
+            word_text = w.word
+            start_w, end_w = w.start, w.end
+
+            # 無音ギャップで分割
+            if buffer and (start_w - last_end) > max_gap:
+                sentences.append((start_time, last_end, "".join(buffer).strip()))
+                buffer = []
+
+            if not buffer:
+                start_time = start_w
+            buffer.append(word_text)
+            last_end = end_w
+
+            over_time = max_seconds is not None and (last_end - start_time) >= max_seconds
+            over_words = max_words is not None and len(buffer) >= max_words
+
+            if over_time or over_words:
+                sentences.append((start_time, last_end, "".join(buffer).strip()))
+                buffer = []
+
+        if buffer:
+            sentences.append((start_time, last_end, "".join(buffer).strip()))
+
+    return sentences
@@ -0,0 +1,199 @@
+"""VTT / SRT / TXT の字幕ファイルを読み込む、全スクリプト共通のパーサー。
+
+ファイルを先頭から1行ずつ読み、キューを1件ずつ Cue として返す（全体を読み込んで
+"\\n\\n" で分割しないため、CRLF のファイルや巨大なファイルでもそのまま扱える）。
+
+- iter_cues(): VTT / SRT はタイムスタンプ付きのキュー、TXT はセリフ1行を1件として返す
+- iter_text_lines(): 形式によらず、メタデータ行を除いたテキスト行を1件ずつ返す
+- parse_subtitle_from_file(): VTT / SRT のキューの一覧（ファイルがなければ終了する）
+- write_subtitle_file(): キューを VTT / SRT として書き出す
+
+Cue の時刻は整数のミリ秒で、元のファイルの行番号（タイムスタンプ行、TXT はその行）を持つ。
+従来の辞書形式と同じく cue["start"] / cue["end"] / cue["text"] でも参照できる。
+GUI 操作用のライブラリ（pyautogui など）には依存しない。
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+
+from timeline import TICKS_PER_MS, parse_timestamp
+
+SUBTITLE_EXTS = (".vtt", ".srt")
+
+
+class Cue:
+    """字幕のキュー1件。時刻はミリ秒（TXT のセリフは None）。"""
+
+    __slots__ = ("start_ms", "end_ms", "text", "line_no")
+
+    def __init__(self, start_ms, end_ms, text, line_no=None):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        self.line_no = line_no
+
+    @property
+    def start(self):
+        """開始時刻（"00:00:04.288" 形式）。"""
+        return format_ms(self.start_ms)
+
+    @property
+    def end(self):
+        """終了時刻（"00:00:04.288" 形式）。"""
+        return format_ms(self.end_ms)
+
+    def __getitem__(self, key):
+        # 従来の {start, end, text} の辞書と同じように参照できるようにする
+        if key not in ("start", "end", "text"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, Cue):
+            return NotImplemented
+        return (self.start_ms, self.end_ms, self.text) == (other.start_ms, other.end_ms, other.text)
+
+    def __repr__(self):
+        where = f"L{self.line_no} " if self.line_no is not None else ""
+        if self.start_ms is None:
+            return f"Cue({where}{self.text!r})"
+        return f"Cue({where}{self.start} --> {self.end} {self.text!r})"
+
+
+def normalize_time(time_str: str) -> str:
+    """時刻文字列をピリオド区切りに正規化する。
+    SRT のカンマ区切り（"00:00:01,060"）と VTT のピリオド区切り（"00:00:01.060"）
+    の両方を受け付け、内部形式（ピリオド区切り）に統一する。
+    """
+    return time_str.replace(",", ".")
+
+def timestamp_to_ms(time_str: str) -> int:
+    """"00:00:04.288"（SRT の "00:00:04,288"、"00:04.288" も可）をミリ秒にする。"""
+    s = time_str.strip()
+    if len(s) == 12 and s[2] == ":" and s[5] == ":" and s[8] in ".,":
+        # ほとんどのファイルはこの固定長の形式なので、桁の位置で直接読む
+        return int(s[:2]) * 3_600_000 + int(s[3:5]) * 60_000 + int(s[6:8]) * 1000 + int(s[9:])
+    return (parse_timestamp(s) * 2 + TICKS_PER_MS) // (TICKS_PER_MS * 2)
+
+def format_ms(millis, separator: str = ".") -> str:
+    """ミリ秒を "00:00:04.288" 形式にする（SRT は separator=","）。"""
+    hours, remainder = divmod(millis, 3_600_000)
+    minutes, remainder = divmod(remainder, 60_000)
+    secs, ms = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+def is_metadata_line(line: str) -> bool:
+    """VTT / SRT のメタデータ行かどうかを判定する。
+
+    スキップ対象:
+    - 空行
+    - # で始まるコメント行
+    - "WEBVTT" ヘッダー
+    - タイムスタンプ行（例: 00:00:00.000 --> 00:00:04.220）
+    - 連番行（数字のみ）
+    """
+    s = line.strip()
+    if not s:
+        return True
+    if s.startswith("#"):
+        return True
+    if s == "WEBVTT":
+        return True
+    if re.fullmatch(r"[\d:.,\- >]+", s):
+        return True
+    return False
+
+def _open_text(file_path: str):
+    # utf-8-sig で BOM を除き、改行は CRLF / CR も "\n" に揃える
+    return open(file_path, encoding="utf-8-sig", newline=None)
+
+def iter_text_lines(file_path: str):
+    """メタデータ行（空行・コメント・ヘッダー・タイムスタンプ・連番）を除いた行を Cue で返す。"""
+    with _open_text(file_path) as f:
+        for line_no, line in enumerate(f, start=1):
+            if not is_metadata_line(line):
+                yield Cue(None, None, line.rstrip("\n"), line_no)
+
+def iter_subtitle_cues(file_path: str):
+    """VTT / SRT を1行ずつ読み、テキストのあるキューを Cue で返す。
+
+    空行で区切られたブロックのうち、"-->" を含む行をタイムスタンプ行とし、
+    その後の行をテキストとする（番号・ID・NOTE などの行は無視する）。
+    """
+    timing = None  # (開始ms, 終了ms, 行番号)
+    text_lines = []
+    with _open_text(file_path) as f:
+        for line_no, line in enumerate(f, start=1):
+            stripped = line.strip()
+            if not stripped:
+                # ブロックの終わり
+                if timing is not None and text_lines:
+                    yield Cue(timing[0], timing[1], "\n".join(text_lines), timing[2])
+                timing = None
+                text_lines = []
+                continue
+
+            if timing is None:
+                if "-->" not in stripped:
+                    continue
+                start, _, rest = stripped.partition("-->")
+                # VTT のキュー設定（"align:start" など）は読み飛ばす
+                end = rest.split(maxsplit=1)[0] if rest.strip() else ""
+                try:
+                    timing = (timestamp_to_ms(start), timestamp_to_ms(end), line_no)
+                except ValueError:
+                    print(f"⚠ {line_no}行目のタイムスタンプを解析できませんでした: {stripped}")
+                continue
+            text_lines.append(stripped)
+
+    if timing is not None and text_lines:
+        yield Cue(timing[0], timing[1], "\n".join(text_lines), timing[2])
+
+def iter_cues(file_path: str):
+    """拡張子で形式を判別し、キューを1件ずつ返す（.vtt / .srt 以外は TXT として1行1件）。"""
+    if os.path.splitext(file_path)[1].lower() in SUBTITLE_EXTS:
+        return iter_subtitle_cues(file_path)
+    return iter_text_lines(file_path)
+
+def parse_subtitle_from_file(file_path: str):
+    """VTT または SRT ファイルをパースして、Cue の一覧を返す。
+
+    拡張子で形式を判別し、どちらの形式でも同一の Cue のリストを返す。
+    時刻は cue.start_ms / cue.end_ms（ミリ秒）、cue["start"] はピリオド区切り（VTT形式）。
+    """
+    if not os.path.exists(file_path):
+        ext = os.path.splitext(file_path)[1].lower()
+        dir_hint = "vtt_input/" if ext == ".vtt" else "srt_input/"
+        print(f"❌ ファイルが見つかりません: {file_path}")
+        print(f"   {dir_hint} ディレクトリにファイルを配置してください。")
+        sys.exit(1)
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in SUBTITLE_EXTS:
+        print(f"❌ 未対応のファイル形式です: {ext}（.vtt または .srt を指定してください）")
+        sys.exit(1)
+
+    return list(iter_subtitle_cues(file_path))
+
+def cues_to_vtt(cues) -> str:
+    """キューを VTT 形式のテキストにする。"""
+    lines = ["WEBVTT", ""]
+    for cue in cues:
+        lines += [f"{cue.start} --> {cue.end}", cue.text, ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+def cues_to_srt(cues) -> str:
+    """キューを SRT 形式のテキストにする（連番は1から振り直す）。"""
+    lines = []
+    for number, cue in enumerate(cues, start=1):
+        lines += [str(number), f"{format_ms(cue.start_ms, ',')} --> {format_ms(cue.end_ms, ',')}", cue.text, ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+def write_subtitle_file(output_path: Path, cues) -> None:
+    """キューを拡張子に合わせて SRT（.srt）または VTT（それ以外）で保存する。"""
+    output_path = Path(output_path)
+    text = cues_to_srt(cues) if output_path.suffix.lower() == ".srt" else cues_to_vtt(cues)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(text, encoding="utf-8")
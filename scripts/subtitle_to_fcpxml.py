@@ -0,0 +1,168 @@
+"""VTT / SRT の字幕から、テロップ（タイトル）を並べた FCPXML を直接作るスクリプト。
+
+auto_fcp_vtt_srt_to_telop.py のように Final Cut Pro を GUI 操作せず、
+キューごとに <title> を置いたプロジェクトを .fcpxml として書き出す。
+画面は不要で、数千件のテロップでも数秒で生成できる。
+
+構造は xml_output/sample.fcpxml（Vrew の出力）と同じで、
+基本ストーリーラインにキューの区間ごとの <gap> を並べ、各 <gap> の
+接続レーン（lane="1"）にテロップの <title> を置く。キューのない区間は空の <gap> になる。
+時刻はすべてフレーム単位の有理数（例: "47/30s"、29.97fps では "47047/30000s"）で書く。
+
+使い方:
+1. vtt_input/ または srt_input/ に字幕ファイルを配置し、INPUT_FILE を変更
+2. `python scripts/subtitle_to_fcpxml.py` を実行（引数で入力ファイルを指定することも可能）
+3. xml_output/ に出力された .fcpxml を Final Cut Pro で読み込む（ファイル → 読み込む → XML）
+4. 読み込まれたプロジェクトのテロップを、編集中のプロジェクトにコピーする
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from subtitle_parser import Cue, parse_subtitle_from_file
+from timeline import TICKS_PER_MS, FrameRate, format_fcpxml, frame_duration, ticks_to_frames
+
+# ===================== 設定 =====================
+# 字幕ファイル（.vtt または .srt に対応）
+INPUT_FILE = "vtt_input/sample.vtt"
+
+# FCPXML の出力ディレクトリ
+OUTPUT_DIR = Path("xml_output")
+
+# タイムラインのフレームレート（プロジェクトに合わせて変更。23.976 / 29.97 / 59.94 も可）
+FPS = 30
+
+# タイムラインの解像度
+WIDTH, HEIGHT = 1920, 1080
+
+# テロップに使うタイトル（Final Cut Pro に入っているもの）
+TITLE_EFFECT_NAME = "Custom"
+TITLE_EFFECT_UID = ".../Titles.localized/Build In:Out.localized/Custom.localized/Custom.moti"
+
+# テロップの文字スタイル（<text-style> の属性）
+TEXT_STYLE = {
+    "alignment": "center",
+    "fontColor": "255 255 255 1",
+    "font": "Apple SD Gothic Neo",
+    "fontSize": "70",
+    "lineSpacing": "-14.0",
+    "baseline": "-508.0",
+    "strokeColor": "0 0 0 0",
+    "strokeWidth": "-6",
+}
+# ===================== 設定ここまで =====================
+
+FCPXML_VERSION = "1.6"
+
+
+def plan_titles(cues: List[Cue], rate: FrameRate) -> List[Tuple[int, int, str]]:
+    """キューを (開始フレーム, 終了フレーム, テキスト) の重ならない並びにする。
+
+    前のキューと重なる開始は前のキューの終了まで押し出し、
+    長さが1フレーム未満になったキューは飛ばす。
+    """
+    titles: List[Tuple[int, int, str]] = []
+    cursor = 0
+    for cue in cues:
+        start = max(ticks_to_frames(cue.start_ms * TICKS_PER_MS, rate), cursor)
+        end = ticks_to_frames(cue.end_ms * TICKS_PER_MS, rate)
+        if end <= start:
+            print(f"⚠ 長さが1フレーム未満のためスキップ: {cue['start']} --> {cue['end']} {cue['text']}")
+            continue
+        titles.append((start, end, cue["text"]))
+        cursor = end
+    return titles
+
+
+def _attr(value: str) -> str:
+    """属性値用にエスケープする（改行は空白にする）。"""
+    return escape(value.replace("\n", " "), {'"': "&quot;"})
+
+
+def build_fcpxml(titles: List[Tuple[int, int, str]], project_name: str, rate: FrameRate) -> str:
+    """テロップの並びから FCPXML のテキストを作る。"""
+    t = lambda frames: format_fcpxml(frames, rate)  # noqa: E731
+    style_attrs = " ".join(f'{key}="{_attr(value)}"' for key, value in TEXT_STYLE.items())
+    total = titles[-1][1] if titles else 0
+
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<fcpxml version="{FCPXML_VERSION}">',
+        "  <import-options>",
+        '    <option value="1" key="suppress warnings"/>',
+        "  </import-options>",
+        "  <resources>",
+        f'    <format id="f0" frameDuration="{frame_duration(rate)}" width="{WIDTH}" height="{HEIGHT}"/>',
+        f'    <effect id="e1" name="{_attr(TITLE_EFFECT_NAME)}" uid="{_attr(TITLE_EFFECT_UID)}"/>',
+        "  </resources>",
+        "  <library>",
+        "    <event>",
+        f'      <project name="{_attr(project_name)}">',
+        f'        <sequence duration="{t(total)}" format="f0" tcStart="0s">',
+        "          <spine>",
+    ]
+
+    cursor = 0
+    for index, (start, end, text) in enumerate(titles):
+        if start > cursor:
+            # キューのない区間は空の gap で埋める
+            lines.append(f'            <gap start="{t(cursor)}" offset="{t(cursor)}" duration="{t(start - cursor)}"/>')
+        duration = t(end - start)
+        lines += [
+            f'            <gap start="{t(start)}" offset="{t(start)}" duration="{duration}">',
+            f'              <title lane="1" name="{_attr(text)}" ref="e1" offset="{t(start)}" start="{t(start)}" duration="{duration}">',
+            "                <text>",
+            f'                  <text-style ref="ts{index}">{escape(text)}</text-style>',
+            "                </text>",
+            f'                <text-style-def id="ts{index}">',
+            f"                  <text-style {style_attrs}/>",
+            "                </text-style-def>",
+            "              </title>",
+            "            </gap>",
+        ]
+        cursor = end
+
+    lines += [
+        "          </spine>",
+        "        </sequence>",
+        "      </project>",
+        "    </event>",
+        "  </library>",
+        "</fcpxml>",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def export_fcpxml(input_file: str, output_path: Optional[Path] = None, fps=FPS) -> Path:
+    """字幕ファイルを FCPXML に変換して保存し、出力先のパスを返す。"""
+    rate = FrameRate.parse(fps)
+    cues = parse_subtitle_from_file(input_file)
+    titles = plan_titles(cues, rate)
+
+    project_name = Path(input_file).stem
+    if output_path is None:
+        output_path = OUTPUT_DIR / f"{project_name}.fcpxml"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(build_fcpxml(titles, project_name, rate), encoding="utf-8")
+    return output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VTT / SRT の字幕からテロップ入りの FCPXML を作る")
+    parser.add_argument("input", nargs="?", default=INPUT_FILE, help="字幕ファイル（.vtt / .srt）")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="出力先（既定: xml_output/<入力名>.fcpxml）")
+    parser.add_argument("--fps", default=FPS, help="タイムラインのフレームレート（29.97 なども可）")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    output_path = export_fcpxml(args.input, args.output, args.fps)
+    print(f"✅ FCPXML を出力しました: {output_path}（{time.perf_counter() - started:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
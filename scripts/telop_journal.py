@@ -0,0 +1,104 @@
+"""FCP のテロップ作業で完了したカットと貼り付けを記録するジャーナル。
+
+実行プランの各操作が終わるたびに、カット（blade）と貼り付け（paste / replace_text）を
+1行1 JSON でファイルに追記し、fsync する。途中で止まった場合は、記録された件数から
+「済んだカットポイント」と「済んだセリフ」を求めて続きから再開できる。
+
+1行目には入力ファイルと設定の情報を書き、再開時に一致しない場合（字幕ファイルを
+書き換えた・FPS を変えたなど）は再開しない。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+from telop_plan import Action
+
+JOURNAL_FORMAT_VERSION = 1
+
+
+def source_info(input_file: str, **settings) -> dict:
+    """再開してよいかの判定に使う、入力ファイルと設定の情報。"""
+    stat = os.stat(input_file)
+    return {
+        "version": JOURNAL_FORMAT_VERSION,
+        "input": os.path.abspath(input_file),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        **settings,
+    }
+
+
+class TelopJournal:
+    """完了したカットと貼り付けを追記するジャーナル。"""
+
+    def __init__(self, path: Path, source: dict):
+        self.path = path
+        self.source = source
+        self._file = None
+        self._last_timecode: Optional[str] = None
+        self.cuts_done = 0
+        self.pastes_done = 0
+
+    def load(self) -> Optional[Tuple[int, int]]:
+        """記録済みの (カット数, 貼り付け数) を返す。記録がなければ None。
+
+        記録が別の入力ファイル・設定のものなら ValueError を送出する。
+        """
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return None
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # 書き込み途中で止まった最後の行は無視する
+                continue
+        if not records or records[0] != self.source:
+            raise ValueError(f"記録が現在の字幕ファイル・設定と一致しません: {self.path}")
+
+        self.cuts_done = sum(1 for r in records[1:] if "cut" in r)
+        self.pastes_done = sum(1 for r in records[1:] if "paste" in r)
+        return self.cuts_done, self.pastes_done
+
+    def open(self, resume: bool) -> None:
+        """記録を開く。resume=False なら前回の記録を捨てて書き直す。"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._file = open(self.path, "a", encoding="utf-8")
+            return
+        self.cuts_done = self.pastes_done = 0
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._append(self.source)
+
+    def _append(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, _index: int, action: Action) -> None:
+        """telop_plan.execute() の on_done から呼ぶ。カットと貼り付けだけを記録する。"""
+        if action.kind == "move_playhead":
+            self._last_timecode = action.value
+        elif action.kind == "blade":
+            self.cuts_done += 1
+            self._append({"cut": self.cuts_done, "timecode": self._last_timecode})
+        elif action.kind in ("paste", "replace_text"):
+            self.pastes_done += 1
+            self._append({"paste": self.pastes_done, "text": action.value})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """すべて完了したので記録を削除する。"""
+        self.close()
+        self.path.unlink(missing_ok=True)
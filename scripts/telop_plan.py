@@ -0,0 +1,283 @@
+"""FCP のテロップ作業を「操作の一覧（プラン）」として組み立て、最適化・見積もり・実行する。
+
+auto_fcp_telop_split_paste.py / auto_fcp_vtt_srt_to_telop.py は、pyautogui を直接
+呼ぶ代わりに、まず1回分の作業をプランとして組み立てる。プランは
+
+- optimize(): 無駄なフォーカス・移動の削除や、キー操作・ウェイトのまとめ
+- print_plan() / estimate_seconds(): 実行前の確認と、設定ウェイトからの所要時間の見積もり
+- execute(): 最適化したプランの実行
+
+に使う。画面を操作するのは execute() だけなので、見積もり（ドライラン）は画面なしで動く。
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Callable, List, NamedTuple, Optional
+
+# pyautogui の各関数呼び出しの後に入る待ち時間（pyautogui.PAUSE の既定値、秒）
+PYAUTOGUI_PAUSE = 0.1
+
+# 操作の種類ごとの pyautogui 呼び出し回数（見積もり用）
+CALL_COUNTS = {
+    "move_playhead": 5,  # ctrl+p, Cmd+V, Enter
+    "blade": 3,  # Cmd+B
+    "select_clip": 1,  # C（再生ヘッド位置のクリップを選択）
+    "next_clip": 3,  # Cmd+→（count 回押す）
+    "prev_clip": 3,  # Cmd+←（count 回押す）
+    "down": 1,  # ↓
+    "focus": 1,  # クリック
+    "tab": 1,  # Tab
+    "select_all": 3,  # Cmd+A
+    "paste": 3,  # Cmd+V
+    "replace_text": 6,  # Cmd+A, Cmd+V
+    "wait": 0,
+}
+
+# クリップを移動する操作と、その向き
+NAVIGATION = {"next_clip": 1, "prev_clip": -1}
+
+# テキストフィールドのフォーカスを動かさない操作
+FOCUS_KEEPING = {"select_all", "paste", "replace_text", "wait"}
+
+# これより後に編集操作がなければ不要になる操作
+TRAILING_REMOVABLE = {"next_clip", "prev_clip", "down", "focus", "tab", "wait"}
+
+
+class Action(NamedTuple):
+    """プランの1操作。wait は操作後に待つ時間の上限（秒）。"""
+
+    kind: str
+    value: Optional[str] = None  # move_playhead はタイムコード、paste はテキスト、focus は "x,y"
+    count: int = 1  # next_clip / prev_clip で続けて押す回数
+    wait: float = 0.0
+
+
+# =====================================================
+# 最適化パス
+# =====================================================
+
+def merge_waits(plan: List[Action], combine: Callable[[float, float], float] = max) -> List[Action]:
+    """単独の wait を直前の操作の待ち時間にまとめる。
+
+    画面の待機では待ち時間は描画完了を待つ上限なので、続けて待つ必要はなく長い方を使う（combine=max）。
+    固定ウェイトでは従来と同じ時間だけ待つよう、合計する（combine=operator.add）。
+    """
+    result: List[Action] = []
+    for action in plan:
+        if action.kind == "wait" and result:
+            result[-1] = result[-1]._replace(wait=combine(result[-1].wait, action.wait))
+        else:
+            result.append(action)
+    return result
+
+
+def merge_navigation(plan: List[Action], combine: Callable[[float, float], float] = max) -> List[Action]:
+    """続けて行うクリップ移動を1回のキー操作にまとめる。逆向きの移動は打ち消す。
+
+    待ち時間は merge_waits と同じく combine でまとめる。
+    """
+    result: List[Action] = []
+    for action in plan:
+        if action.kind in NAVIGATION and result and result[-1].kind in NAVIGATION:
+            previous = result.pop()
+            steps = NAVIGATION[previous.kind] * previous.count + NAVIGATION[action.kind] * action.count
+            wait = combine(previous.wait, action.wait)
+            if steps > 0:
+                result.append(Action("next_clip", count=steps, wait=wait))
+            elif steps < 0:
+                result.append(Action("prev_clip", count=-steps, wait=wait))
+        else:
+            result.append(action)
+    return result
+
+
+def drop_redundant_focus(plan: List[Action]) -> List[Action]:
+    """同じフィールドにフォーカス済みで、その後フォーカスが動いていなければクリックを省く。"""
+    result: List[Action] = []
+    focused: Optional[str] = None
+    for action in plan:
+        if action.kind == "focus":
+            if action.value == focused:
+                continue
+            focused = action.value
+        elif action.kind not in FOCUS_KEEPING:
+            focused = None
+        result.append(action)
+    return result
+
+
+def merge_replace_text(plan: List[Action], combine: Callable[[float, float], float] = max) -> List[Action]:
+    """全選択の直後の貼り付けを、間で待たない1つの置き換え操作にまとめる。
+
+    全選択の後の待ち時間は、merge_waits と同じく combine で貼り付けの待ち時間にまとめる。
+    """
+    result: List[Action] = []
+    for action in plan:
+        if action.kind == "paste" and result and result[-1].kind == "select_all":
+            wait = combine(result[-1].wait, action.wait)
+            result[-1] = action._replace(kind="replace_text", wait=wait)
+        else:
+            result.append(action)
+    return result
+
+
+def drop_trailing_navigation(plan: List[Action]) -> List[Action]:
+    """最後の編集操作より後の移動・フォーカス・待機を省く。"""
+    end = len(plan)
+    while end > 0 and plan[end - 1].kind in TRAILING_REMOVABLE:
+        end -= 1
+    return plan[:end]
+
+
+OPTIMIZATION_PASSES: List[Callable[[List[Action]], List[Action]]] = [
+    merge_waits,
+    merge_navigation,
+    drop_redundant_focus,
+    merge_replace_text,
+    drop_trailing_navigation,
+]
+
+
+# 待ち時間をまとめるパス（combine で長い方を使うか合計するかを選ぶ）
+WAIT_COMBINING_PASSES = (merge_waits, merge_navigation, merge_replace_text)
+
+
+def optimize(plan: List[Action], sum_waits: bool = False) -> List[Action]:
+    """すべての最適化パスを順に適用する。
+
+    sum_waits=True（画面の待機を使わない固定ウェイト）では、まとめた待ち時間を合計し、
+    最適化前と同じ時間だけ待つ。
+    """
+    combine = operator.add if sum_waits else max
+    for optimization in OPTIMIZATION_PASSES:
+        if optimization in WAIT_COMBINING_PASSES:
+            plan = optimization(plan, combine)
+        else:
+            plan = optimization(plan)
+    return plan
+
+
+# =====================================================
+# 見積もり・表示
+# =====================================================
+
+def estimate_seconds(plan: List[Action], step_wait: float, pause: float = PYAUTOGUI_PAUSE) -> float:
+    """設定ウェイトから所要時間を見積もる（画面の描画待ちを上限まで待った場合）。
+
+    step_wait は move_playhead の途中（ctrl+p の後、タイムコード貼り付けの後）の待ち時間。
+    """
+    total = 0.0
+    for action in plan:
+        total += CALL_COUNTS[action.kind] * pause + action.wait
+        if action.kind == "move_playhead":
+            total += 2 * step_wait
+    return total
+
+
+def describe(action: Action) -> str:
+    """操作を1行で表す。"""
+    text = action.kind
+    if action.count != 1:
+        text += f" ×{action.count}"
+    if action.value is not None:
+        text += f" {action.value!r}"
+    return f"{text}（待機 {action.wait:g}秒）"
+
+
+def print_plan(
+    plan: List[Action],
+    step_wait: float,
+    original: Optional[List[Action]] = None,
+    verbose: bool = True,
+) -> None:
+    """プランと見積もり時間を表示する。
+
+    original を渡すと最適化前との比較も表示する。verbose=False では見積もりだけを表示する。
+    """
+    if verbose:
+        print("=== 実行プラン ===")
+        for index, action in enumerate(plan, start=1):
+            print(f"  {index:4d}. {describe(action)}")
+        print("==================")
+    estimate = estimate_seconds(plan, step_wait)
+    print(f"🧮 操作 {len(plan)}件 / 見積もり {format_duration(estimate)}")
+    if original is not None:
+        before = estimate_seconds(original, step_wait)
+        print(f"   最適化前: 操作 {len(original)}件 / {format_duration(before)}（{format_duration(before - estimate)}短縮）")
+
+
+def format_duration(seconds: float) -> str:
+    """秒数を「X分Y秒」の形で表す。"""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}分{secs:02d}秒" if minutes else f"{secs}秒"
+
+
+# =====================================================
+# 実行
+# =====================================================
+
+def _press_with(modifier: str, key: str, presses: int = 1) -> None:
+    """修飾キーを押したまま key を押す。
+
+    macOS では pyautogui.hotkey() で修飾キーが取りこぼされることがあるため、
+    keyDown / press / keyUp に分けて送る。
+    """
+    import pyautogui
+
+    pyautogui.keyDown(modifier)
+    pyautogui.press(key, presses=presses)
+    pyautogui.keyUp(modifier)
+
+
+def execute(
+    plan: List[Action],
+    waiter,
+    step_wait: float,
+    on_done: Optional[Callable[[int, Action], None]] = None,
+) -> None:
+    """プランを順に実行する。
+
+    waiter は screen_wait.ScreenWaiter（wait(秒) を持つもの）。on_done を渡すと、
+    各操作の完了後に (プラン内の位置, 操作) で呼ぶ。
+    """
+    import pyautogui
+    import pyperclip
+
+    for index, action in enumerate(plan):
+        print(f"  [{index + 1}/{len(plan)}] {describe(action)}")
+        kind = action.kind
+        if kind == "move_playhead":
+            _press_with("ctrl", "p")
+            waiter.wait(step_wait)
+            pyperclip.copy(action.value)
+            pyautogui.hotkey("command", "v")
+            waiter.wait(step_wait)
+            pyautogui.press("enter")
+        elif kind == "blade":
+            _press_with("command", "b")
+        elif kind == "select_clip":
+            pyautogui.press("c")
+        elif kind in NAVIGATION:
+            _press_with("command", "right" if kind == "next_clip" else "left", presses=action.count)
+        elif kind == "down":
+            pyautogui.press("down")
+        elif kind == "focus":
+            x, y = (int(v) for v in action.value.split(","))
+            pyautogui.click(x, y)
+        elif kind == "tab":
+            pyautogui.press("tab")
+        elif kind == "select_all":
+            _press_with("command", "a")
+        elif kind in ("paste", "replace_text"):
+            pyperclip.copy(action.value)
+            if kind == "replace_text":
+                _press_with("command", "a")
+            _press_with("command", "v")
+        elif kind != "wait":
+            raise ValueError(f"未対応の操作です: {kind}")
+
+        if action.wait > 0:
+            waiter.wait(action.wait)
+        if on_done is not None:
+            on_done(index, action)
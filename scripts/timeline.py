@@ -0,0 +1,204 @@
+"""字幕・FCPXML・タイムコードの時刻を、誤差なく扱うためのタイムライン計算。
+
+時刻はすべて整数の「ティック」（1秒 = TICKS_PER_SECOND ティック）で持つ。
+TICKS_PER_SECOND はミリ秒と、NTSC（23.976 / 29.97 / 59.94）を含む主なフレームレートの
+1フレームの長さをどちらも整数で表せる値にしてあるため、丸めは「フレームにするとき」と
+「ミリ秒にするとき」の1回だけで済む。文字列は読み込み時に1回だけ解析し、
+出力時は to_timecodes() などでまとめて変換する。
+
+- FrameRate: フレームレート（"29.97" は 30000/1001 として扱う）とドロップフレームの指定
+- parse_timestamp(): "00:00:04.288" / "00:00:04,288" → ティック
+- parse_fcpxml_time(): "47/30s" → 秒数の有理数
+- ticks_to_frames() / frames_to_ticks(): ティック ⇔ フレーム番号
+- format_timecode() / format_vtt() / format_fcpxml(): タイムコード・VTT・FCPXML の文字列
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Callable, Iterable, List, NamedTuple, Union
+
+# 1秒あたりのティック数（1000 と 24000 / 25 / 30000 / 60000 などの公倍数）
+TICKS_PER_SECOND = 120_000
+TICKS_PER_MS = TICKS_PER_SECOND // 1000
+
+# 小数で書かれがちな NTSC のフレームレート
+NTSC_RATES = {
+    "23.976": Fraction(24000, 1001),
+    "23.98": Fraction(24000, 1001),
+    "29.97": Fraction(30000, 1001),
+    "59.94": Fraction(60000, 1001),
+}
+
+
+class FrameRate(NamedTuple):
+    """フレームレート（fps = numerator / denominator）。"""
+
+    numerator: int
+    denominator: int = 1
+    drop_frame: bool = False
+
+    @classmethod
+    def parse(cls, fps: Union[int, float, str, Fraction], drop_frame: bool = False) -> "FrameRate":
+        """25 / 29.97 / "30000/1001" などからフレームレートを作る。"""
+        text = str(fps).strip()
+        rate = NTSC_RATES.get(text) or Fraction(text).limit_denominator(1001)
+        if rate <= 0 or (TICKS_PER_SECOND * rate.denominator) % rate.numerator:
+            raise ValueError(f"未対応のフレームレートです: {fps}")
+        result = cls(rate.numerator, rate.denominator, drop_frame)
+        if drop_frame and result.drop_frames_per_minute == 0:
+            raise ValueError(f"ドロップフレームは 29.97 / 59.94 fps でのみ使えます: {fps}")
+        return result
+
+    @property
+    def fps(self) -> Fraction:
+        return Fraction(self.numerator, self.denominator)
+
+    @property
+    def nominal(self) -> int:
+        """タイムコードの1秒あたりのフレーム数（29.97 なら 30）。"""
+        return round(self.numerator / self.denominator)
+
+    @property
+    def frame_ticks(self) -> int:
+        """1フレームの長さ（ティック）。"""
+        return TICKS_PER_SECOND * self.denominator // self.numerator
+
+    @property
+    def drop_frames_per_minute(self) -> int:
+        """ドロップフレームで1分ごとに飛ばすフレーム番号の数（29.97 なら 2）。"""
+        if self.denominator != 1001 or self.nominal % 30:
+            return 0
+        return self.nominal // 15
+
+    def __str__(self) -> str:
+        fps = f"{float(self.fps):.3f}".rstrip("0").rstrip(".")
+        return f"{fps}fps{' DF' if self.drop_frame else ''}"
+
+
+# =====================================================
+# 解析（文字列 → ティック）
+# =====================================================
+
+def parse_timestamp(timestamp: str) -> int:
+    """"00:00:04.288"（"00:04.288"、SRT の "00:00:04,288" も可）をティックにする。"""
+    *head, seconds = timestamp.strip().replace(",", ".").split(":")
+    whole, _, fraction = seconds.partition(".")
+    total = 0
+    for value in head:
+        total = total * 60 + int(value)
+    total = total * 60 + int(whole)
+    ticks = total * TICKS_PER_SECOND
+    if fraction:
+        # ミリ秒までは割り切れる。それより細かい桁は最も近いティックに丸める
+        scale = 10 ** len(fraction)
+        ticks += (int(fraction) * TICKS_PER_SECOND * 2 + scale) // (scale * 2)
+    return ticks
+
+
+def parse_fcpxml_time(value: str) -> Fraction:
+    """FCPXML の時刻（"47/30s"、"5s" など）を秒数の有理数にする。"""
+    value = value.strip().rstrip("s")
+    numerator, _, denominator = value.partition("/")
+    if denominator:
+        return Fraction(int(numerator), int(denominator))
+    return Fraction(value or "0")
+
+
+def seconds_to_ticks(seconds: Union[int, float, Fraction]) -> int:
+    """秒数を最も近いティックにする。"""
+    return round(Fraction(seconds) * TICKS_PER_SECOND)
+
+
+# =====================================================
+# 変換（ティック ⇔ フレーム）
+# =====================================================
+
+def ticks_to_frames(ticks: int, rate: FrameRate) -> int:
+    """ティックを最も近いフレーム番号にする（0.5 フレームは切り上げ）。"""
+    frame_ticks = rate.frame_ticks
+    return (ticks * 2 + frame_ticks) // (frame_ticks * 2)
+
+
+def frames_to_ticks(frames: int, rate: FrameRate) -> int:
+    return frames * rate.frame_ticks
+
+
+# =====================================================
+# 書式（→ 文字列）
+# =====================================================
+
+def format_timecode(frames: int, rate: FrameRate) -> str:
+    """フレーム番号を "HH:MM:SS:FF"（ドロップフレームは "HH:MM:SS;FF"）にする。
+
+    29.97 などのノンドロップは、1秒 = nominal フレームとして数える（FCP の表示と同じ）。
+    """
+    return _timecode_formatter(rate)(frames)
+
+
+def _timecode_formatter(rate: FrameRate) -> Callable[[int], str]:
+    """フレームレートごとの定数を先に求めた、フレーム番号 → タイムコードの関数。"""
+    nominal = rate.nominal
+    frames_per_hour = nominal * 3600
+    frames_per_minute = nominal * 60
+
+    def split(frames: int, separator: str) -> str:
+        hours, frames = divmod(frames, frames_per_hour)
+        minutes, frames = divmod(frames, frames_per_minute)
+        secs, frame = divmod(frames, nominal)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{frame:02d}"
+
+    if not rate.drop_frame:
+        return lambda frames: split(frames, ":")
+
+    # 10分ごと以外の毎分の先頭で、drop 個のフレーム番号を飛ばす
+    drop = rate.drop_frames_per_minute
+    per_minute = frames_per_minute - drop
+    per_ten_minutes = per_minute * 10 + drop
+
+    def drop_frame(frames: int) -> str:
+        tens, remainder = divmod(frames, per_ten_minutes)
+        frames += drop * 9 * tens
+        if remainder > drop:
+            frames += drop * ((remainder - drop) // per_minute)
+        return split(frames, ";")
+
+    return drop_frame
+
+
+def format_vtt(ticks: int, separator: str = ".") -> str:
+    """ティックを "00:00:04.288" にする（ミリ秒に四捨五入。SRT は separator=","）。"""
+    millis = (ticks * 2 + TICKS_PER_MS) // (TICKS_PER_MS * 2)
+    hours, remainder = divmod(millis, 3_600_000)
+    minutes, remainder = divmod(remainder, 60_000)
+    secs, ms = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def format_fcpxml(frames: int, rate: FrameRate) -> str:
+    """フレーム数を FCPXML の有理数時刻にする（30fps なら "47/30s"、29.97fps なら "47047/30000s"）。"""
+    return f"{frames * rate.denominator}/{rate.numerator}s"
+
+
+def frame_duration(rate: FrameRate) -> str:
+    """<format> の frameDuration（"1/30s"、"1001/30000s" など）。"""
+    return format_fcpxml(1, rate)
+
+
+def to_timecodes(ticks: Iterable[int], rate: FrameRate) -> List[str]:
+    """ティックの並びを、まとめてタイムコードにする。"""
+    format_frames = _timecode_formatter(rate)
+    frame_ticks = rate.frame_ticks
+    return [format_frames((t * 2 + frame_ticks) // (frame_ticks * 2)) for t in ticks]
+
+
+def to_vtt_timestamps(ticks: Iterable[int], separator: str = ".") -> List[str]:
+    """ティックの並びを、まとめて VTT の時刻にする。"""
+    return [format_vtt(t, separator) for t in ticks]
+
+
+def to_fcpxml_times(ticks: Iterable[int], rate: FrameRate) -> List[str]:
+    """ティックの並びを、フレームに丸めてまとめて FCPXML の時刻にする。"""
+    frame_ticks = rate.frame_ticks
+    denominator, suffix = rate.denominator, f"/{rate.numerator}s"
+    return [f"{(t * 2 + frame_ticks) // (frame_ticks * 2) * denominator}{suffix}" for t in ticks]
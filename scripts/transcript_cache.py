@@ -0,0 +1,192 @@
+"""Whisper の単語タイムスタンプを保存するコンテンツアドレス方式のキャッシュ。
+
+音声ファイルの中身のハッシュと、モデル名・計算精度・ビームサイズから
+キーを作り、model.transcribe(..., word_timestamps=True) の結果を JSON で保存する。
+文の分割設定（MAX_GAP_SECONDS など）を変えて VTT を作り直すときは、
+Whisper を再実行せずにキャッシュから分割だけをやり直せる。
+
+キャッシュ全体のサイズには上限があり、超えた分は最終利用が古い順（LRU）に削除する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+# ハッシュ計算時の読み込み単位（バイト）
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# ファイルのハッシュを (サイズ, 更新時刻) と紐付けて記録するインデックス
+HASH_INDEX_NAME = "hash_index.json"
+
+# キャッシュ形式のバージョン（形式を変えたら上げる）
+CACHE_FORMAT_VERSION = 1
+
+
+class CachedWord(NamedTuple):
+    """faster-whisper の Word と同じ属性名を持つ単語。"""
+
+    start: float
+    end: float
+    word: str
+
+
+class CachedSegment(NamedTuple):
+    """faster-whisper の Segment と同じ属性名を持つセグメント（分割に必要な分のみ）。"""
+
+    start: float
+    end: float
+    text: str
+    words: List[CachedWord]
+
+
+def file_sha256(path: Path) -> str:
+    """ファイルの中身の SHA-256 を返す。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_hash_index(index_dir: Path) -> dict:
+    try:
+        return json.loads((index_dir / HASH_INDEX_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def recorded_hash(path: Path, index_dir: Path) -> Optional[str]:
+    """前回 content_hash() で記録したハッシュを返す（ファイルが変わっていても返す）。"""
+    entry = _load_hash_index(index_dir).get(str(path.resolve()))
+    return entry["sha256"] if entry else None
+
+
+def content_hash(path: Path, index_dir: Path) -> str:
+    """ファイルの中身のハッシュを返す。
+
+    (パス, サイズ, 更新時刻) が前回と同じなら index_dir のインデックスに記録した値を使い、
+    大きな音声ファイルを毎回読み直さないようにする。ファイルが変わっていれば計算し直す。
+    """
+    stat = path.stat()
+    index_path = index_dir / HASH_INDEX_NAME
+    key = str(path.resolve())
+    index = _load_hash_index(index_dir)
+
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = file_sha256(path)
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    index_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(index_path, json.dumps(index, ensure_ascii=False))
+    return sha256
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """一時ファイルに書いてから置き換え、書きかけのファイルを残さない。"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class TranscriptCache:
+    """単語タイムスタンプのキャッシュ。1エントリ = 1 JSON ファイル。"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def make_key(
+        self,
+        audio_path: Path,
+        model_name: str,
+        compute_type: str,
+        beam_size: int,
+        variant: str = "",
+    ) -> str:
+        """音声の中身と文字起こし条件からキャッシュキーを作る。
+
+        variant には結果が変わりうるデコード方式の違い（チャンク並列など）を渡す。
+        """
+        audio_hash = content_hash(audio_path, self.cache_dir)
+        source = f"v{CACHE_FORMAT_VERSION}:{audio_hash}:{model_name}:{compute_type}:{beam_size}:{variant}"
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> Optional[tuple[List[CachedSegment], float]]:
+        """キャッシュがあれば (セグメント一覧, 音声長[秒]) を返す。なければ None。"""
+        path = self._entry_path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        # 最終利用時刻として更新時刻を進める（LRU 判定に使う）
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        segments = [
+            CachedSegment(s, e, text, [CachedWord(*w) for w in words])
+            for s, e, text, words in data["segments"]
+        ]
+        return segments, data["duration"]
+
+    def store(self, key: str, segments: Iterable, duration: float) -> None:
+        """セグメント一覧を保存し、サイズ上限を超えた分を古い順に削除する。"""
+        data = {
+            "version": CACHE_FORMAT_VERSION,
+            "duration": duration,
+            "segments": [
+                [
+                    seg.start,
+                    seg.end,
+                    seg.text,
+                    [[w.start, w.end, w.word] for w in (seg.words or [])],
+                ]
+                for seg in segments
+            ],
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self._entry_path(key), json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        self.evict()
+
+    def evict(self) -> None:
+        """合計サイズが上限以下になるまで、最終利用が古いエントリから削除する。"""
+        evict_lru(self.cache_dir, "*.json", self.max_bytes)
+
+
+def evict_lru(cache_dir: Path, pattern: str, max_bytes: int, keep: Optional[Path] = None) -> None:
+    """cache_dir 内の pattern に合うファイルを、合計が max_bytes 以下になるまで古い順に削除する。
+
+    最終利用時刻には更新時刻を使う（読み込み時に os.utime で進めておく）。
+    keep は直後に使うファイルで、それだけで max_bytes を超えていても削除しない。
+    """
+    entries = []
+    total = 0
+    for path in cache_dir.glob(pattern):
+        if path.name == HASH_INDEX_NAME:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
@@ -0,0 +1,197 @@
+"""Whisper モデルを読み込んだまま常駐し、文字起こしの依頼を受け付けるサーバー。
+
+auto_audio_to_vtt.py を実行するたびにかかる faster_whisper の読み込みと
+モデルのロードを省くため、Unix ドメインソケットで依頼を待ち受ける。
+届いた依頼はキューに積み、1つずつ順番に処理する。
+
+使い方:
+1. リポジトリのルートで `python scripts/transcription_server.py` を起動（Ctrl+C で終了）
+2. 別のターミナルで `python scripts/auto_audio_to_vtt.py` を実行すると、処理がサーバーに渡されます
+   - サーバーが動いていない場合は、これまでどおり自分でモデルを読み込みます
+   - モデル名・デバイス・計算精度がサーバーと異なる場合も、自分で処理します
+
+通信は1行1 JSON で、依頼は {"audio_path", "output_path", "settings"}、
+応答は {"status": "ok" | "error" | "mismatch", ...} の形式です。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from pathlib import Path
+
+import auto_audio_to_vtt as pipeline
+
+# ===================== 設定 =====================
+# 待ち受ける Unix ドメインソケット（auto_audio_to_vtt.py と同じパス）
+SOCKET_PATH = pipeline.SERVER_SOCKET_PATH
+
+# キューに積める依頼の最大数（超えた依頼はエラーを返す）
+MAX_QUEUED_REQUESTS = 32
+# ===================== 設定ここまで =====================
+
+# サーバーが読み込んだモデルと一致しなければならない設定
+MODEL_SETTINGS = ("MODEL_NAME", "DEVICE", "COMPUTE_TYPE")
+
+# 依頼ごとに依頼元の値を使う設定
+REQUEST_SETTINGS = (
+    "BEAM_SIZE",
+    "DECODE_MODE",
+    "FAST_TIER_BATCH_SIZE",
+    "REDECODE_MIN_AVG_LOGPROB",
+    "REDECODE_MAX_COMPRESSION_RATIO",
+    "MAX_GAP_SECONDS",
+    "MAX_SENTENCE_SECONDS",
+    "MAX_SENTENCE_WORDS",
+    "SPLIT_ACROSS_SEGMENTS",
+    "STREAMING_OUTPUT",
+    "USE_TRANSCRIPT_CACHE",
+    "USE_PCM_CACHE",
+    "PARALLEL_CHUNKS",
+    "CHUNK_MAX_SECONDS",
+    "CHUNK_MIN_SILENCE_SECONDS",
+    "CHUNK_WORKERS",
+)
+
+
+class Job:
+    """キューに積む1件の依頼と、その応答。"""
+
+    def __init__(self, request: dict):
+        self.request = request
+        self.enqueued_at = time.perf_counter()
+        self.response: dict = {}
+        self.done = threading.Event()
+
+
+def snapshot_settings() -> dict:
+    """依頼ごとに差し替える設定の、サーバー起動時の値。"""
+    return {key: getattr(pipeline, key) for key in REQUEST_SETTINGS}
+
+
+def process_request(request: dict, enqueued_at: float, defaults: dict) -> dict:
+    """依頼を1件処理して応答を返す。ワーカースレッドからのみ呼ぶ。
+
+    設定は依頼ごとにサーバー起動時の値（defaults）へ戻してから依頼元の値を反映するため、
+    前の依頼の設定が次の依頼に残ることはない。対応していない設定は応答の ignored で返す。
+    """
+    settings = request.get("settings", {})
+    mismatched = [
+        f"{key}={settings[key]}（サーバー: {getattr(pipeline, key)}）"
+        for key in MODEL_SETTINGS
+        if key in settings and settings[key] != getattr(pipeline, key)
+    ]
+    if mismatched:
+        return {"status": "mismatch", "error": ", ".join(mismatched)}
+
+    ignored = sorted(key for key in settings if key not in MODEL_SETTINGS and key not in REQUEST_SETTINGS)
+    if ignored:
+        print(f"⚠ 対応していない設定を無視します: {', '.join(ignored)}")
+
+    # 依頼は1つずつ処理するため、モジュールの設定値を依頼元の値に差し替えてよい
+    for key in REQUEST_SETTINGS:
+        setattr(pipeline, key, settings.get(key, defaults[key]))
+
+    started = time.perf_counter()
+    try:
+        audio_path = Path(request["audio_path"])
+        output_path = Path(request["output_path"])
+        print(f"🎙 文字起こし開始: {audio_path}")
+        duration = pipeline.transcribe_file(audio_path, output_path)
+    except Exception as exc:  # noqa: BLE001
+        print(f"❌ 失敗: {exc}")
+        return {"status": "error", "error": str(exc), "ignored": ignored}
+    finally:
+        for key, value in defaults.items():
+            setattr(pipeline, key, value)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ 完了: {output_path}（{pipeline.format_rtf(duration, elapsed)}）")
+    return {
+        "status": "ok",
+        "duration": duration,
+        "elapsed": elapsed,
+        "queued": started - enqueued_at,
+        "ignored": ignored,
+    }
+
+
+def worker_loop(jobs: queue.Queue, defaults: dict) -> None:
+    """キューから依頼を取り出して順番に処理する。"""
+    while True:
+        job = jobs.get()
+        job.response = process_request(job.request, job.enqueued_at, defaults)
+        job.done.set()
+
+
+def handle_connection(conn: socket.socket, jobs: queue.Queue) -> None:
+    """1接続分の依頼を受け取り、キューに積んで処理の完了を待ってから応答する。"""
+    with conn, conn.makefile("rwb") as stream:
+        line = stream.readline()
+        try:
+            job = Job(json.loads(line))
+            jobs.put_nowait(job)
+        except ValueError:
+            response = {"status": "error", "error": "依頼の形式が正しくありません"}
+        except queue.Full:
+            response = {"status": "error", "error": "依頼が多すぎます。しばらく待ってから再実行してください"}
+        else:
+            job.done.wait()
+            response = job.response
+
+        try:
+            stream.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            stream.flush()
+        except OSError:
+            # 依頼元が先に終了した場合（出力ファイルは書き終えている）
+            pass
+
+
+def open_server_socket(path: Path) -> socket.socket:
+    """ソケットを作って待ち受ける。前回の異常終了で残ったソケットファイルは削除する。"""
+    if path.exists():
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            path.unlink(missing_ok=True)
+        else:
+            raise RuntimeError(f"別の常駐サーバーが動いています: {path}")
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    # 他のユーザーからは依頼できないようにする
+    os.chmod(path, 0o600)
+    server.listen()
+    return server
+
+
+def main() -> None:
+    pipeline.report_calibration(pipeline.apply_calibration())
+    print(f"⏳ モデルを読み込みます: {pipeline.MODEL_NAME}（{pipeline.DEVICE} / {pipeline.COMPUTE_TYPE}）")
+    started = time.perf_counter()
+    pipeline.get_model()
+    print(f"✅ 読み込み完了（{time.perf_counter() - started:.1f}秒）")
+
+    jobs: queue.Queue = queue.Queue(maxsize=MAX_QUEUED_REQUESTS)
+    threading.Thread(target=worker_loop, args=(jobs, snapshot_settings()), daemon=True).start()
+
+    server = open_server_socket(SOCKET_PATH)
+    print(f"👂 待ち受け中: {SOCKET_PATH}（Ctrl+C で終了）")
+    try:
+        while True:
+            conn, _addr = server.accept()
+            threading.Thread(target=handle_connection, args=(conn, jobs), daemon=True).start()
+    except KeyboardInterrupt:
+        print("🛑 終了します")
+    finally:
+        server.close()
+        SOCKET_PATH.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
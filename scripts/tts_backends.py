@@ -0,0 +1,308 @@
+"""セリフの音声（WAV）を作る読み上げエンジン（TTS バックエンド）の共通インターフェースと実装。
+
+auto_aques_talk_player.py は、セリフの一覧を TtsJob にしてバックエンドに渡すだけで、
+どのエンジンで音声を作るかは BACKEND の設定で切り替えられる。
+
+- VoicevoxBackend: VOICEVOX 互換の HTTP エンジン（/audio_query → /synthesis）。
+  CONCURRENCY 本の keep-alive 接続を使い回し、複数のセリフを同時に合成して
+  「番号_セリフ.wav」を直接書き出す（swap_title_number.py でのリネームは不要）
+- MockTtsEngine: VOICEVOX 互換の API を持つローカルの疑似エンジン（エンジンなしでの確認用）
+- AquesTalk Player の GUI 操作は auto_aques_talk_player.py の AquesTalkGuiBackend
+
+`python scripts/tts_backends.py` で、疑似エンジンを使って同時合成数ごとの処理時間を比べられます。
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from wav_wait import SEC_PER_MORA, count_morae, wav_header
+
+# ===================== 設定 =====================
+# VOICEVOX エンジンの URL と話者 ID（話者 ID は /speakers で確認）
+VOICEVOX_URL = "http://127.0.0.1:50021"
+VOICEVOX_SPEAKER = 1
+
+# 同時に合成するセリフの数（= エンジンへの接続数）
+CONCURRENCY = 4
+
+# 1リクエストの待ち時間の上限（秒）
+REQUEST_TIMEOUT = 60.0
+# ===================== 設定ここまで =====================
+
+# ファイル名に含めるセリフの文字数
+FILENAME_TEXT_LENGTH = 20
+# ファイル名に使えない文字（空白を含む）
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+class TtsError(Exception):
+    """読み上げエンジンが使えない、または合成に失敗した。"""
+
+
+class TtsJob(NamedTuple):
+    """合成するセリフ1行。number は WAV のファイル名の先頭に付ける番号（1から）。"""
+
+    number: int
+    text: str
+
+
+class TtsResult(NamedTuple):
+    job: TtsJob
+    path: Optional[Path]  # 書き出した WAV（失敗した場合は None）
+    error: Optional[str]
+    elapsed: float
+
+
+def wav_filename(job: TtsJob) -> str:
+    """「番号_セリフ.wav」（swap_title_number.py でリネームした後と同じ形）。"""
+    text = _UNSAFE_FILENAME_RE.sub("", job.text)[:FILENAME_TEXT_LENGTH]
+    return f"{job.number}_{text}.wav"
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """一時ファイルに書いてから置き換え、書きかけの WAV を残さない。"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class TtsBackend:
+    """読み上げエンジンの共通インターフェース。"""
+
+    name = ""
+
+    def check(self) -> None:
+        """エンジンが使える状態か確かめる（使えなければ TtsError）。"""
+
+    def synthesize(self, jobs: List[TtsJob], output_dir: Path) -> Iterator[TtsResult]:
+        """jobs を合成して output_dir に書き出し、結果を jobs の順に返す。"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """接続などを片付ける。"""
+
+
+class VoicevoxBackend(TtsBackend):
+    """VOICEVOX 互換の HTTP エンジンで、複数のセリフを同時に合成する。
+
+    ワーカースレッドごとに1本の HTTP/1.1 接続を持ち、同じ接続で次々にリクエストを送る
+    （接続は最大 concurrency 本）。エンジン側で切れた接続は、1回だけつなぎ直して再送する。
+    """
+
+    name = "voicevox"
+
+    def __init__(
+        self,
+        base_url: str = VOICEVOX_URL,
+        speaker: int = VOICEVOX_SPEAKER,
+        concurrency: int = CONCURRENCY,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        url = urlsplit(base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.speaker = speaker
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.connections_opened = 0
+
+    # ---------- HTTP ----------
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and not fresh:
+            return conn
+        if conn is not None:
+            conn.close()
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> bytes:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection(fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as exc:
+                if attempt == 0:
+                    continue
+                raise TtsError(f"{self.host}:{self.port} に接続できません: {exc}") from exc
+            if response.status != 200:
+                raise TtsError(f"{method} {path.split('?')[0]} が失敗しました（{response.status}）: {data[:200]!r}")
+            return data
+        raise AssertionError("unreachable")
+
+    # ---------- TtsBackend ----------
+
+    def check(self) -> None:
+        version = self._request("GET", "/version").decode("utf-8").strip('"')
+        print(f"🔊 VOICEVOX エンジン {version}（{self.host}:{self.port}、話者 {self.speaker}、同時合成 {self.concurrency}）")
+
+    def synthesize_text(self, text: str) -> bytes:
+        """1行を合成して WAV のバイト列を返す。"""
+        query = self._request("POST", "/audio_query?" + urlencode({"text": text, "speaker": self.speaker}))
+        return self._request("POST", "/synthesis?" + urlencode({"speaker": self.speaker}), body=query)
+
+    def _synthesize_job(self, job: TtsJob, output_dir: Path) -> TtsResult:
+        started = time.perf_counter()
+        try:
+            data = self.synthesize_text(job.text)
+            path = output_dir / wav_filename(job)
+            write_atomic(path, data)
+        except (TtsError, OSError) as exc:
+            return TtsResult(job, None, str(exc), time.perf_counter() - started)
+        return TtsResult(job, path, None, time.perf_counter() - started)
+
+    def synthesize(self, jobs: List[TtsJob], output_dir: Path) -> Iterator[TtsResult]:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # ワーカー（と各ワーカーの接続）は close() まで使い回す
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        futures = [self._executor.submit(self._synthesize_job, job, output_dir) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+# =====================================================
+# 疑似エンジン
+# =====================================================
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/version":
+            self._reply(200, b'"mock"', "application/json")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with self.server.lock:
+            self.server.requests += 1
+
+        if url.path == "/audio_query":
+            text = query.get("text", [""])[0]
+            data = {"text": text, "morae": count_morae(text), "speedScale": 1.0}
+            self._reply(200, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json")
+        elif url.path == "/synthesis":
+            morae = json.loads(body)["morae"]
+            # 合成にかかる時間を、モーラ数に比例した待ち時間で再現する
+            time.sleep(morae * self.server.synth_sec_per_mora)
+            data_size = int(morae * SEC_PER_MORA * MockTtsEngine.SAMPLE_RATE) * 2
+            wav = wav_header(data_size, MockTtsEngine.SAMPLE_RATE) + b"\0" * data_size
+            self._reply(200, wav, "audio/wav")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+
+class MockTtsEngine:
+    """VOICEVOX 互換の API（/version, /audio_query, /synthesis）を持つ疑似エンジン。
+
+    無音の WAV（長さはモーラ数に比例）を返す。with 文で起動・停止し、
+    受け付けた接続数とリクエスト数を数える。
+    """
+
+    SAMPLE_RATE = 24_000
+
+    def __init__(self, synth_sec_per_mora: float = 0.005, port: int = 0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _MockHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = 0
+        self.server.synth_sec_per_mora = synth_sec_per_mora
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return self.server.connections
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    def __enter__(self) -> "MockTtsEngine":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def simulate(lines: int = 40) -> None:
+    """疑似エンジンで、同時合成数ごとの処理時間と接続数を比べる。"""
+    texts = ["はい。", "こんにちは、まりさだぜ。", "今回は動画制作の効率化について紹介します。",
+             "テロップを手作業で入力すると、十分の動画でも三十分以上かかることがあります。"]
+    jobs = [TtsJob(i + 1, texts[i % len(texts)]) for i in range(lines)]
+    for concurrency in (1, CONCURRENCY):
+        with MockTtsEngine() as engine, tempfile.TemporaryDirectory() as tmp_dir:
+            backend = VoicevoxBackend(engine.url, concurrency=concurrency)
+            started = time.perf_counter()
+            results = list(backend.synthesize(jobs, Path(tmp_dir)))
+            elapsed = time.perf_counter() - started
+            backend.close()
+            failed = sum(1 for r in results if r.error)
+            print(
+                f"  同時合成 {concurrency}: {elapsed:5.2f}秒（{lines / elapsed:5.1f} 行/秒）"
+                f" / 接続 {engine.connections}本・リクエスト {engine.requests}件 / 失敗 {failed}件"
+            )
+
+
+if __name__ == "__main__":
+    print("🧪 疑似エンジンで試算します（40行）")
+    simulate()
@@ -1,99 +1,447 @@
 """
-VTT ファイルのタイムスタンプ重なりをチェックするスクリプト。
-前の終了時刻より次の開始時刻が早い（gap < 0）箇所を報告します。
+VTT / SRT ファイルのタイムスタンプをチェックし、必要なら修正版を書き出すスクリプト。
+
+キューを開始時刻順に並べてから1回走査し、次の問題をすべて報告します
+（ファイル内の順序や、隣り合っていないキュー同士の重なりも見つかります）。
+- 重なり: 時間が重なっているキューの組すべて
+- 短い隙間: 前のキューの終了から次の開始までが 1フレーム未満、または MIN_GAP_SEC 以下
+  （隙間なしを含む。テロップ挿入時にカットを後ろへずらす必要がある箇所）
+- 長さ0: 終了時刻が開始時刻以前のキュー（0 < 長さ <= MIN_GAP_SEC は「短いキュー」）
 問題がなければ「タイムスタンプに異常はありません」と表示します。
 
+--fix を付けると、指定した方法で問題を解消したファイルを書き出します。
+キューの間隔と長さは、MIN_GAP_SEC を超える最小のフレーム数（25fps なら 0.12秒）にそろえます。
+- trim: 前のキューの終わりを削る（削ると短くなりすぎる場合は、次のキューの頭を削る）
+- shift: 次のキューを、長さを保ったまま後ろへずらす
+- merge: 重なる・近すぎるキューを1つにまとめ、テキストを改行でつなぐ
+長さ0・短いキューは、どの方法でも最小の長さまで伸ばします（テキストは失われません）。
+修正版を使えば、auto_fcp_vtt_srt_to_telop.py などでカットが押し出されることはありません。
+
+ディレクトリを指定するか --all を付けると、中の VTT / SRT をプロセスプールでまとめてチェックし、
+ファイルごとの問題と処理時間を JSON のレポート（REPORT_PATH）に書き出します。
+結果は更新時刻とハッシュで cache/timestamp_check/ にキャッシュし、変わっていないファイルは飛ばします。
+問題のあるファイルが1つでもあれば終了コード 1 で終わるため、GUI 実行前のチェックに使えます。
+
 使い方:
-1. VTT_FILE を対象ファイル名に変更
-2. `python scripts/vtt_timestamp_checker.py` を実行
+1. VTT_FILE を対象ファイル名に変更（または引数で指定）
+2. `python scripts/vtt_timestamp_checker.py`
+   `python scripts/vtt_timestamp_checker.py srt_input/sample.srt --fix trim`
+   `python scripts/vtt_timestamp_checker.py --all`（CHECK_DIRS をまとめてチェック）
 """
 
+import argparse
+import heapq
+import json
 import os
 import sys
-from typing import List, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from subtitle_parser import SUBTITLE_EXTS, Cue, iter_subtitle_cues, write_subtitle_file
+from timeline import TICKS_PER_MS, FrameRate
+from transcript_cache import file_sha256
 
 # ===================== 設定 =====================
 # チェック対象の VTT ファイル（vtt_input/ ディレクトリに配置）
 VTT_FILE = "vtt_input/sample.vtt"
+
+# プロジェクトのフレームレート（1フレーム未満の隙間の判定に使う）
+FPS = 25
+# これ以下の隙間を報告する（auto_fcp_vtt_srt_to_telop.py の MIN_GAP_SEC と合わせる）
+MIN_GAP_SEC = 0.1
+
+# --fix の方法: "trim" / "shift" / "merge"
+FIX_POLICY = "trim"
+
+# --all でまとめてチェックするディレクトリ
+CHECK_DIRS = [Path("vtt_input"), Path("srt_input"), Path("vtt_output")]
+# まとめてチェックした結果のレポート
+REPORT_PATH = Path("vtt_output/timestamp_report.json")
+# チェック結果のキャッシュ（更新時刻とハッシュで、変わっていないファイルを飛ばす）
+CACHE_DIR = Path("cache/timestamp_check")
+# 並列数（None で CPU コア数）
+WORKERS: Optional[int] = None
 # ===================== 設定ここまで =====================
 
+FIX_POLICIES = ("trim", "shift", "merge")
+
+ISSUE_LABELS = {"overlap": "重なり", "short_gap": "短い隙間", "zero_length": "長さ0", "short_cue": "短いキュー"}
+
+# 結果キャッシュのファイル名と形式のバージョン（チェック内容を変えたら上げる）
+RESULT_CACHE_NAME = "results.json"
+CHECK_FORMAT_VERSION = 1
 
-def load_vtt(vtt_path: str) -> str:
-    """VTT ファイルを読み込んでテキストを返す。"""
+
+class Issue(NamedTuple):
+    """タイムスタンプの問題1件。"""
+
+    kind: str  # "overlap" / "short_gap" / "zero_length" / "short_cue"
+    first: Cue
+    second: Optional[Cue]
+    gap_ms: int  # 重なりは負、長さ0 はキューの長さ
+
+
+def load_cues(vtt_path: str) -> List[Cue]:
+    """VTT / SRT ファイルのキューを読み込む（共通パーサーを使う）。"""
     if not os.path.exists(vtt_path):
         print(f"❌ VTT ファイルが見つかりません: {vtt_path}")
         sys.exit(1)
-    with open(vtt_path, encoding="utf-8") as f:
-        return f.read()
+    return list(iter_subtitle_cues(vtt_path))
+
+
+def sort_cues(cues: List[Cue]) -> List[Cue]:
+    """開始時刻順（同じなら終了時刻順、さらにファイル内の順）に並べる。"""
+    return sorted(cues, key=lambda cue: (cue.start_ms, cue.end_ms))
+
+
+def _gap_checker(rate: FrameRate, min_gap_sec: float):
+    """隙間・長さ（ミリ秒）が短すぎるかを判定する関数を作る。"""
+    frame_ticks = rate.frame_ticks
+    min_gap_ms = round(min_gap_sec * 1000)
+
+    def is_short(gap_ms: int) -> bool:
+        return gap_ms * TICKS_PER_MS < frame_ticks or gap_ms <= min_gap_ms
 
+    return is_short
 
-def to_seconds(timestamp: str) -> float:
-    """hh:mm:ss.mmm を秒(float)に変換"""
-    hms, millis = timestamp.split(".")
-    hours, minutes, seconds = map(int, hms.split(":"))
-    return hours * 3600 + minutes * 60 + seconds + float(f"0.{millis}")
 
+def min_separation_ms(rate: FrameRate, min_gap_sec: float = MIN_GAP_SEC) -> int:
+    """修正時にそろえる間隔と長さ: MIN_GAP_SEC を超える最小のフレーム数（ミリ秒に切り上げ）。"""
+    frames = round(min_gap_sec * 1000) * TICKS_PER_MS // rate.frame_ticks + 1
+    return -(-frames * rate.frame_ticks // TICKS_PER_MS)
 
-def parse_segments(text: str) -> List[Tuple[float, float, int, str]]:
-    """タイムレンジ行だけを抽出して (start, end, line_no, line_text) に変換"""
-    segments: List[Tuple[float, float, int, str]] = []
-    for idx, line in enumerate(text.splitlines(), start=1):
-        if "-->" not in line:
+
+def find_overlaps(cues: List[Cue]) -> List[Tuple[Cue, Cue]]:
+    """時間が重なっているキューの組をすべて返す（開始時刻順）。
+
+    開始時刻順に走査し、まだ終わっていないキューを終了時刻のヒープで持つ。
+    新しいキューの開始までに終わったものをヒープから除けば、残りはすべて重なっている。
+    """
+    overlaps = []
+    active: List[Tuple[int, int, Cue]] = []  # (終了ms, 順番, キュー)
+    for order, cue in enumerate(sort_cues(cues)):
+        if cue.end_ms <= cue.start_ms:
             continue
-        try:
-            start_str, end_str = line.split("-->")
-            start = to_seconds(start_str.strip())
-            end = to_seconds(end_str.strip())
-        except Exception as exc:  # noqa: BLE001
-            print(f"警告: {idx}行目を解析できませんでした: {line} ({exc})")
+        while active and active[0][0] <= cue.start_ms:
+            heapq.heappop(active)
+        overlaps.extend((other, cue) for _, _, other in sorted(active, key=lambda item: item[1]))
+        heapq.heappush(active, (cue.end_ms, order, cue))
+    return overlaps
+
+
+def analyze(cues: List[Cue], rate: FrameRate, min_gap_sec: float = MIN_GAP_SEC) -> List[Issue]:
+    """重なり・短い隙間・長さ0（と短いキュー）をすべて洗い出す。"""
+    is_short = _gap_checker(rate, min_gap_sec)
+    issues = [
+        Issue("zero_length" if cue.end_ms <= cue.start_ms else "short_cue", cue, None, cue.end_ms - cue.start_ms)
+        for cue in cues if is_short(cue.end_ms - cue.start_ms)
+    ]
+    issues += [Issue("overlap", a, b, b.start_ms - a.end_ms) for a, b in find_overlaps(cues)]
+
+    # 隙間は、それまでに最も遅く終わるキューと次のキューの間で測る
+    latest: Optional[Cue] = None
+    for cue in sort_cues(cues):
+        if cue.end_ms <= cue.start_ms:
             continue
-        segments.append((start, end, idx, line.strip()))
-    return segments
-
-
-def check_intervals(segments: List[Tuple[float, float, int, str]]) -> None:
-    """前区間の終了より次区間の開始が早い（重なり）箇所を報告"""
-    issues = []
-    for i in range(1, len(segments)):
-        prev_start, prev_end, prev_line_no, prev_text = segments[i - 1]
-        curr_start, curr_end, curr_line_no, curr_text = segments[i]
-        gap = curr_start - prev_end
-        if gap < 0:
-            issues.append(
-                {
-                    "gap": gap,
-                    "prev_line_no": prev_line_no,
-                    "curr_line_no": curr_line_no,
-                    "prev_text": prev_text,
-                    "curr_text": curr_text,
-                    "prev_range": (prev_start, prev_end),
-                    "curr_range": (curr_start, curr_end),
-                }
-            )
+        if latest is not None and 0 <= cue.start_ms - latest.end_ms and is_short(cue.start_ms - latest.end_ms):
+            issues.append(Issue("short_gap", latest, cue, cue.start_ms - latest.end_ms))
+        if latest is None or cue.end_ms > latest.end_ms:
+            latest = cue
+    return issues
+
+
+def fix_cues(cues: List[Cue], policy: str, rate: FrameRate, min_gap_sec: float = MIN_GAP_SEC) -> List[Cue]:
+    """policy（trim / shift / merge）で問題を解消したキューの一覧を返す（元の Cue は変更しない）。
+
+    開始時刻順に並べ、直前に確定したキューとの間隔が min_separation_ms() 未満なら直す。
+    """
+    if policy not in FIX_POLICIES:
+        raise ValueError(f"未対応の修正方法です: {policy}（{' / '.join(FIX_POLICIES)}）")
+    sep = min_separation_ms(rate, min_gap_sec)
+
+    fixed: List[Cue] = []
+    for cue in sort_cues(cues):
+        cue = Cue(cue.start_ms, max(cue.end_ms, cue.start_ms + sep), cue.text, cue.line_no)
+        prev = fixed[-1] if fixed else None
+        if prev is None or cue.start_ms - prev.end_ms >= sep:
+            fixed.append(cue)
+        elif policy == "merge":
+            prev.end_ms = max(prev.end_ms, cue.end_ms)
+            prev.text = f"{prev.text}\n{cue.text}"
+        elif policy == "trim" and cue.start_ms - sep - prev.start_ms >= sep:
+            prev.end_ms = cue.start_ms - sep
+            fixed.append(cue)
+        else:
+            if policy == "trim":
+                # 前のキューを最小の長さまで削り、残りは次のキューの頭を削る
+                prev.end_ms = prev.start_ms + sep
+                cue.start_ms = prev.end_ms + sep
+                cue.end_ms = max(cue.end_ms, cue.start_ms + sep)
+            else:
+                duration = cue.end_ms - cue.start_ms
+                cue.start_ms = prev.end_ms + sep
+                cue.end_ms = cue.start_ms + duration
+            fixed.append(cue)
+    return fixed
 
+
+def _describe(cue: Cue) -> str:
+    return f"L{cue.line_no}: {cue.start} --> {cue.end} {cue.text}"
+
+
+def print_report(issues: List[Issue], rate: FrameRate) -> None:
+    """問題の一覧と件数を表示する。"""
     if not issues:
         print("タイムスタンプに異常はありません")
         return
 
+    frame_ms = rate.frame_ticks / TICKS_PER_MS
     for issue in issues:
         print("----")
-        print(
-            f"重なりあり (差: {issue['gap']:.3f} 秒)"
-            f" | 前: {issue['prev_range'][0]:.3f}-{issue['prev_range'][1]:.3f}"
-            f" -> 次: {issue['curr_range'][0]:.3f}-{issue['curr_range'][1]:.3f}"
-        )
-        print(f"前の行(L{issue['prev_line_no']}): {issue['prev_text']}")
-        print(f"次の行(L{issue['curr_line_no']}): {issue['curr_text']}")
+        if issue.second is None:
+            print(f"{ISSUE_LABELS[issue.kind]}のキュー (長さ: {issue.gap_ms / 1000:.3f} 秒)")
+            print(f"  {_describe(issue.first)}")
+            continue
+        if issue.kind == "overlap":
+            print(f"重なりあり (差: {issue.gap_ms / 1000:.3f} 秒)")
+        else:
+            reason = "1フレーム未満" if issue.gap_ms < frame_ms else f"{MIN_GAP_SEC}秒以下"
+            print(f"隙間が短い (差: {issue.gap_ms / 1000:.3f} 秒、{reason})")
+        print(f"  前の行({_describe(issue.first)})")
+        print(f"  次の行({_describe(issue.second)})")
+
+    counts = "、".join(
+        f"{label} {sum(1 for i in issues if i.kind == kind)}件" for kind, label in ISSUE_LABELS.items()
+    )
+    print("----")
+    print(f"⚠ {len(issues)}件の問題があります（{counts}）")
+
+
+# =====================================================
+# ディレクトリのまとめてチェック
+# =====================================================
+
+def find_subtitle_files(directories: List[Path]) -> List[Path]:
+    """ディレクトリ内（サブディレクトリを含む）の VTT / SRT を、パス順に返す。
+
+    --fix で書き出した「*.fixed.*」も対象に含める。
+    """
+    files = set()
+    for directory in directories:
+        for path in directory.rglob("*"):
+            if path.suffix.lower() in SUBTITLE_EXTS and path.is_file():
+                files.add(path)
+    return sorted(files)
+
+
+def _issue_to_dict(issue: Issue) -> dict:
+    def cue_dict(cue: Cue) -> dict:
+        return {"line": cue.line_no, "start": cue.start, "end": cue.end, "text": cue.text}
+
+    data = {"kind": issue.kind, "gap_ms": issue.gap_ms, "first": cue_dict(issue.first)}
+    if issue.second is not None:
+        data["second"] = cue_dict(issue.second)
+    return data
+
+
+def check_file(path: str, rate: FrameRate, min_gap_sec: float, known: Optional[dict] = None) -> dict:
+    """1ファイルをチェックし、レポートの1件分を返す（ワーカープロセスで実行する）。
+
+    known は前回の結果。中身のハッシュが同じなら、チェックせずにそれを返す
+    （更新時刻だけ変わったファイル）。elapsed_sec はこの実行でかかった時間で、
+    前回の結果を使った場合はハッシュの計算時間になる。
+    """
+    started = time.perf_counter()
+    sha256 = file_sha256(Path(path))
+    if known is not None and known["sha256"] == sha256:
+        return {**known, "elapsed_sec": round(time.perf_counter() - started, 4), "cached": True}
+
+    cues = list(iter_subtitle_cues(path))
+    issues = analyze(cues, rate, min_gap_sec)
+    counts: Dict[str, int] = {}
+    for issue in issues:
+        counts[issue.kind] = counts.get(issue.kind, 0) + 1
+    return {
+        "path": path,
+        "sha256": sha256,
+        "cues": len(cues),
+        "counts": counts,
+        "issues": [_issue_to_dict(issue) for issue in issues],
+        "elapsed_sec": round(time.perf_counter() - started, 4),
+        "cached": False,
+    }
+
+
+def _settings_key(rate: FrameRate, min_gap_sec: float) -> str:
+    return f"v{CHECK_FORMAT_VERSION}:{rate.numerator}/{rate.denominator}:{min_gap_sec}"
+
+
+def _load_result_cache(cache_dir: Path, settings: str) -> dict:
+    """前回の結果（パス → {size, mtime_ns, result}）。チェックの設定が違えば空にする。"""
+    try:
+        data = json.loads((cache_dir / RESULT_CACHE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data["files"] if data.get("settings") == settings else {}
+
+
+def _write_json(path: Path, data: dict, indent: Optional[int] = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def check_directories(
+    directories: List[Path],
+    rate: FrameRate,
+    min_gap_sec: float = MIN_GAP_SEC,
+    workers: Optional[int] = WORKERS,
+    cache_dir: Optional[Path] = CACHE_DIR,
+) -> dict:
+    """ディレクトリ内の VTT / SRT をまとめてチェックし、レポートを返す。
+
+    (サイズ, 更新時刻) が前回と同じファイルはキャッシュの結果をそのまま使い、
+    それ以外はプロセスプールでハッシュを求めてチェックする（ハッシュが同じならチェックしない）。
+    cache_dir=None でキャッシュを使わない。
+    """
+    started = time.perf_counter()
+    settings = _settings_key(rate, min_gap_sec)
+    cache = _load_result_cache(cache_dir, settings) if cache_dir else {}
+
+    results: Dict[str, dict] = {}
+    stats: Dict[str, os.stat_result] = {}
+    pending = []
+    for path in find_subtitle_files(directories):
+        key = str(path)
+        stats[key] = stat = path.stat()
+        entry = cache.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            # 前回の処理時間を今回の計測と取り違えないよう、読み込むだけの結果は 0 秒にする
+            results[key] = {**entry["result"], "elapsed_sec": 0.0, "cached": True}
+        else:
+            pending.append((key, entry["result"] if entry else None))
+
+    if pending:
+        args = ([p for p, _ in pending], [rate] * len(pending), [min_gap_sec] * len(pending), [k for _, k in pending])
+        if len(pending) == 1 or workers == 1:
+            checked = list(map(check_file, *args))
+        else:
+            workers = min(workers or os.cpu_count() or 1, len(pending))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                checked = list(executor.map(check_file, *args, chunksize=max(1, len(pending) // (workers * 4))))
+        for result in checked:
+            results[result["path"]] = result
+
+    files = [results[key] for key in sorted(results)]
+    if cache_dir:
+        cache_files = {
+            f["path"]: {
+                "size": stats[f["path"]].st_size,
+                "mtime_ns": stats[f["path"]].st_mtime_ns,
+                "result": {k: v for k, v in f.items() if k != "cached"},
+            }
+            for f in files
+        }
+        _write_json(cache_dir / RESULT_CACHE_NAME, {"settings": settings, "files": cache_files})
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "directories": [str(d) for d in directories],
+        "fps": str(rate),
+        "min_gap_sec": min_gap_sec,
+        "summary": {
+            "files": len(files),
+            "files_with_issues": sum(1 for f in files if f["issues"]),
+            "issues": sum(len(f["issues"]) for f in files),
+            "cached": sum(1 for f in files if f["cached"]),
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+        },
+        "files": files,
+    }
+
+
+def run_directory_mode(directories: List[Path], rate: FrameRate, report_path: Path, workers: Optional[int], use_cache: bool) -> bool:
+    """まとめてチェックしてレポートを保存し、結果を表示する。問題がなければ True。"""
+    missing = [d for d in directories if not d.is_dir()]
+    for directory in missing:
+        print(f"⚠ ディレクトリが見つかりません: {directory}")
+    directories = [d for d in directories if d.is_dir()]
+
+    print(f"📂 まとめてチェック: {', '.join(map(str, directories))}（{rate}、MIN_GAP_SEC={MIN_GAP_SEC}）")
+    report = check_directories(directories, rate, MIN_GAP_SEC, workers, CACHE_DIR if use_cache else None)
+    _write_json(report_path, report, indent=2)
+
+    for f in report["files"]:
+        if f["issues"]:
+            counts = "、".join(f"{ISSUE_LABELS[kind]} {n}件" for kind, n in f["counts"].items())
+            print(f"⚠ {f['path']}: {len(f['issues'])}件（{counts}）")
+    summary = report["summary"]
+    print(
+        f"{'✅' if not summary['issues'] else '⚠'} {summary['files']}ファイル中 {summary['files_with_issues']}ファイルに"
+        f" {summary['issues']}件の問題（キャッシュ利用 {summary['cached']}件、{summary['elapsed_sec']:.2f}秒）"
+    )
+    print(f"📝 レポート: {report_path}")
+    return summary["issues"] == 0
 
 
 def main() -> None:
-    print(f"📄 VTT ファイル: {VTT_FILE}")
-    vtt_text = load_vtt(VTT_FILE)
-    segments = parse_segments(vtt_text)
-    if not segments:
+    parser = argparse.ArgumentParser(description="VTT / SRT のタイムスタンプの重なり・短い隙間をチェック・修正する")
+    parser.add_argument("input", nargs="*", help="チェックする VTT / SRT（ディレクトリならまとめてチェック。省略時は VTT_FILE）")
+    parser.add_argument("--all", action="store_true", help="CHECK_DIRS の VTT / SRT をまとめてチェックする")
+    parser.add_argument("--fix", nargs="?", const=FIX_POLICY, choices=FIX_POLICIES, help="修正版を書き出す（方法を省略すると FIX_POLICY）")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="修正版の出力先（省略時は「<入力名>.fixed.<拡張子>」）")
+    parser.add_argument("--fps", default=str(FPS), help="プロジェクトのフレームレート（29.97 なども可）")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH, help="まとめてチェックしたときのレポートの出力先")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="まとめてチェックするときの並列数")
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使わずにすべてチェックし直す")
+    args = parser.parse_args()
+
+    try:
+        rate = FrameRate.parse(args.fps)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return
+
+    directories = [Path(p) for p in args.input if Path(p).is_dir()]
+    if directories and len(directories) != len(args.input):
+        print("❌ ディレクトリとファイルを同時には指定できません")
+        return
+    if args.all or directories:
+        if args.fix is not None:
+            print("❌ --fix は1ファイルずつ指定してください")
+            return
+        ok = run_directory_mode(CHECK_DIRS if args.all else directories, rate, args.report, args.workers, not args.no_cache)
+        sys.exit(0 if ok else 1)
+
+    if len(args.input) > 1:
+        print("❌ 複数のファイルをチェックする場合は、ディレクトリを指定してください")
+        return
+    input_path = args.input[0] if args.input else VTT_FILE
+    print(f"📄 VTT ファイル: {input_path}（{rate}、MIN_GAP_SEC={MIN_GAP_SEC}）")
+    cues = load_cues(input_path)
+    if not cues:
         print("タイムスタンプ行が見つかりませんでした")
         return
-    check_intervals(segments)
+    issues = analyze(cues, rate)
+    print_report(issues, rate)
+
+    if args.fix is None:
+        if issues:
+            print("💡 --fix trim / shift / merge で修正版を書き出せます")
+        return
+
+    source = Path(input_path)
+    output_path = args.output or source.with_name(f"{source.stem}.fixed{source.suffix}")
+    fixed = fix_cues(cues, args.fix, rate)
+    write_subtitle_file(output_path, fixed)
+    remaining = analyze(fixed, rate)
+    print(f"✅ 修正版を書き出しました（{args.fix}、{len(cues)} → {len(fixed)}件）: {output_path}")
+    if remaining:
+        print(f"⚠ 修正後も {len(remaining)}件の問題が残っています")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+"""wav_output/ の WAV の長さから、セリフごとのテロップを並べた字幕（VTT / SRT）と FCPXML を作るスクリプト。
+
+合成音声ルートでは、各セリフの正確な長さが WAV のヘッダーに書かれている。
+このスクリプトは WAV のヘッダー（fmt / data チャンク）だけを読み、音声はデコードしない。
+そのため、文字起こしし直したり、auto_fcp_telop_split_paste.py で音声の継ぎ目を
+down キーで1つずつたどったりせずに、数千行でもすぐにテロップの時刻が決まる。
+
+WAV は swap_title_number.py でリネームした「番号_セリフ.wav」の番号順に並べ、
+隙間なくつなげて置いたときの開始・終了時刻を、CSV のセリフ1行ごとのキューにする。
+テロップの文字は、ファイル名（先頭の20文字程度・読みを直した後）ではなく CSV のセリフをそのまま使う。
+
+- 番号が 1 から始まりセリフの行数以内なら、番号を CSV の何行目のセリフかとして対応させる
+  （合成に失敗して欠けた番号があっても、ほかの行はずれない）。それ以外は並び順で対応させる
+- Final Cut Pro の基本ストーリーラインではクリップの境界がフレーム単位になるため、
+  SNAP_TO_FRAMES = True では各 WAV の長さをフレームに丸めてから積み上げる（行数が多くてもずれがたまらない）
+
+使い方:
+1. auto_aques_talk_player.py で WAV を作り、swap_title_number.py でリネーム（voicevox の場合は不要）
+2. CSV_FILE, TARGET_CHARACTER を auto_aques_talk_player.py と同じ値にする
+3. `python scripts/wav_to_subtitle.py` を実行
+4. xml_output/ の .fcpxml を Final Cut Pro で読み込む（ファイル → 読み込む → XML）
+   vtt_output/ の VTT は fcpxml_text_patcher.py や vtt_timestamp_checker.py でも使える
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import struct
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from scenario_reader import iter_scenario_lines
+from subtitle_parser import Cue, format_ms, write_subtitle_file
+from subtitle_to_fcpxml import build_fcpxml
+from timeline import TICKS_PER_MS, FrameRate, seconds_to_ticks, ticks_to_frames
+
+# ===================== 設定 =====================
+# WAV のディレクトリ（「番号_セリフ.wav」が並んでいること）
+WAV_DIR = Path("wav_output")
+
+# シナリオ CSV と読み上げ対象のキャラクター（auto_aques_talk_player.py と同じにする）
+CSV_FILE = Path("csv_input/sample.csv")
+TARGET_CHARACTER = "魔理沙"
+
+# 字幕と FCPXML の出力ディレクトリ
+SUBTITLE_DIR = Path("vtt_output")
+FCPXML_DIR = Path("xml_output")
+
+# タイムラインのフレームレート（プロジェクトに合わせて変更。23.976 / 29.97 / 59.94 も可）
+FPS = 30
+
+# WAV 同士の間に空ける秒数（FCP で WAV の間に無音を挟んで並べている場合に指定）
+GAP_SEC = 0.0
+
+# True: 各 WAV の長さをフレームに丸めてから積み上げる（FCP のストーリーラインと同じ）
+# False: 実際の長さのまま積み上げる
+SNAP_TO_FRAMES = True
+# ===================== 設定ここまで =====================
+
+# swap_title_number.py でリネームした後のファイル名（番号_セリフ.wav）
+NUMBERED_WAV_RE = re.compile(r"^(\d+)_(.*)\.wav$", re.IGNORECASE)
+
+# data チャンクのサイズが書かれていない（RF64・ストリーミング）ことを表す値。
+# 書き出し途中の WAV では 0 のこともある
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+class WavHeaderError(ValueError):
+    """WAV のヘッダーを読めない（RIFF / WAVE でない、fmt / data チャンクがない）。"""
+
+
+class NumberedWav(NamedTuple):
+    """「番号_セリフ.wav」1件。name_text はファイル名のセリフ部分。"""
+
+    number: int
+    path: Path
+    name_text: str
+
+
+class TelopSpan(NamedTuple):
+    """テロップ1件の区間（ティック）と文字。"""
+
+    start: int
+    end: int
+    text: str
+    wav: NumberedWav
+
+
+def read_wav_duration(path: Path) -> Fraction:
+    """WAV のヘッダーだけを読み、音声の長さ（秒）を有理数で返す。
+
+    チャンクを先頭から順にたどり、fmt チャンクのサンプルレート・ブロックサイズと
+    data チャンクのサイズから長さを求める（音声データ自体は読まない）。
+    data のサイズが書かれていない（0 や 0xFFFFFFFF の仮の値）・ファイルより大きい場合は、
+    ファイルの残りを音声とみなす（書き出し途中で閉じられていない WAV など）。
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+            raise WavHeaderError(f"WAV ではありません: {path}")
+        file_size = os.fstat(f.fileno()).st_size
+        fmt: Optional[Tuple[int, int, int]] = None
+
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise WavHeaderError(f"data チャンクがありません: {path}")
+            chunk_id = chunk[:4]
+            size = struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                if len(body) < 14:
+                    raise WavHeaderError(f"fmt チャンクが壊れています: {path}")
+                _, _, sample_rate, byte_rate, block_align = struct.unpack("<HHIIH", body[:14])
+                fmt = (sample_rate, byte_rate, block_align)
+                f.seek(size & 1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                available = file_size - f.tell()
+                if size in (0, _UNKNOWN_SIZE) or size > available:
+                    size = available
+                break
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+    if fmt is None:
+        raise WavHeaderError(f"fmt チャンクがありません: {path}")
+    sample_rate, byte_rate, block_align = fmt
+    if block_align and sample_rate:
+        return Fraction(size // block_align, sample_rate)
+    if byte_rate:
+        return Fraction(size, byte_rate)
+    raise WavHeaderError(f"サンプルレートが 0 です: {path}")
+
+
+def list_numbered_wavs(directory: Path) -> Tuple[List[NumberedWav], List[str]]:
+    """「番号_セリフ.wav」を番号順に並べて返す。番号のない WAV は (…, ファイル名の一覧) で返す。"""
+    wavs: List[NumberedWav] = []
+    skipped: List[str] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(".wav") or not entry.is_file():
+                continue
+            match = NUMBERED_WAV_RE.match(entry.name)
+            if match is None:
+                skipped.append(entry.name)
+                continue
+            wavs.append(NumberedWav(int(match.group(1)), Path(entry.path), match.group(2)))
+    wavs.sort(key=lambda w: (w.number, w.path.name))
+    skipped.sort()
+    return wavs, skipped
+
+
+def assign_texts(wavs: List[NumberedWav], texts: List[str]) -> List[str]:
+    """各 WAV のテロップの文字を決める。
+
+    番号が 1〜len(texts) に収まっていれば番号で、そうでなければ並び順で CSV のセリフに対応させる。
+    対応するセリフがない WAV は、ファイル名のセリフ部分を使う。
+    """
+    if not wavs:
+        return []
+    if len(wavs) != len(texts):
+        print(f"⚠ WAV（{len(wavs)}件）と CSV のセリフ（{len(texts)}件）の数が一致しません")
+
+    numbers = [w.number for w in wavs]
+    if len(set(numbers)) != len(numbers):
+        print("⚠ 同じ番号の WAV があります（リネームの重複を確認してください）")
+    if numbers[0] >= 1 and numbers[-1] <= len(texts):
+        missing = len(texts) - len(set(numbers))
+        if missing:
+            print(f"⚠ WAV のない番号が {missing}件あります（その行のテロップは作りません）")
+        return [texts[w.number - 1] for w in wavs]
+
+    if texts:
+        print("⚠ WAV の番号が CSV の行数と合わないため、並び順でセリフに対応させます")
+    return [texts[i] if i < len(texts) else w.name_text for i, w in enumerate(wavs)]
+
+
+def build_spans(
+    wavs: List[NumberedWav],
+    durations: List[Fraction],
+    texts: List[str],
+    rate: FrameRate,
+    gap_sec: float = GAP_SEC,
+    snap_to_frames: bool = SNAP_TO_FRAMES,
+) -> List[TelopSpan]:
+    """WAV を番号順に隙間なく（gap_sec ずつ空けて）並べたときの、テロップの区間を求める。
+
+    時刻は秒の有理数で積み上げ、区間の境界ごとに1回だけティックに丸める。
+    """
+    frame_sec = Fraction(rate.denominator, rate.numerator)
+    if snap_to_frames:
+        snap = lambda sec: ticks_to_frames(seconds_to_ticks(sec), rate) * frame_sec  # noqa: E731
+    else:
+        snap = lambda sec: sec  # noqa: E731
+
+    gap = snap(Fraction(str(gap_sec)))
+    spans: List[TelopSpan] = []
+    cursor = Fraction(0)
+    for wav, duration, text in zip(wavs, durations, texts):
+        start = cursor
+        end = start + snap(duration)
+        spans.append(TelopSpan(seconds_to_ticks(start), seconds_to_ticks(end), text, wav))
+        cursor = end + gap
+    return spans
+
+
+def spans_to_cues(spans: List[TelopSpan]) -> List[Cue]:
+    """区間をミリ秒のキューにする（line_no は WAV の番号）。"""
+    half = TICKS_PER_MS // 2
+    return [
+        Cue((span.start + half) // TICKS_PER_MS, (span.end + half) // TICKS_PER_MS, span.text, span.wav.number)
+        for span in spans
+    ]
+
+
+def spans_to_titles(spans: List[TelopSpan], rate: FrameRate) -> List[Tuple[int, int, str]]:
+    """区間を FCPXML の (開始フレーム, 終了フレーム, テキスト) にする（1フレーム未満のものは飛ばす）。"""
+    titles = []
+    for span in spans:
+        start, end = ticks_to_frames(span.start, rate), ticks_to_frames(span.end, rate)
+        if end <= start:
+            print(f"⚠ 長さが1フレーム未満のためスキップ: {span.wav.path.name}")
+            continue
+        titles.append((start, end, span.text))
+    return titles
+
+
+def load_texts(csv_file: Optional[Path], character: Optional[str]) -> List[str]:
+    """CSV の読み上げ対象のセリフ（読みを直す前の表記）。CSV がなければ空。"""
+    if csv_file is None or not csv_file.exists():
+        print(f"⚠ CSV ファイルが見つかりません: {csv_file}（WAV のファイル名をテロップにします）")
+        return []
+    return [line.text for line in iter_scenario_lines(csv_file, character)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WAV のヘッダーの長さから、セリフごとの字幕と FCPXML を作る")
+    parser.add_argument("wav_dir", nargs="?", type=Path, default=WAV_DIR, help="「番号_セリフ.wav」のディレクトリ")
+    parser.add_argument("--csv", type=Path, default=CSV_FILE, help="シナリオ CSV")
+    parser.add_argument("--character", default=TARGET_CHARACTER, help="読み上げ対象のキャラクター")
+    parser.add_argument("--fps", default=FPS, help="タイムラインのフレームレート（29.97 なども可）")
+    parser.add_argument("--gap", type=float, default=GAP_SEC, help="WAV 同士の間に空ける秒数")
+    parser.add_argument("--no-snap", action="store_true", help="WAV の長さをフレームに丸めない")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="字幕の出力先（既定: vtt_output/<CSV 名>.vtt。.srt も可）")
+    parser.add_argument("--fcpxml", type=Path, default=None, help="FCPXML の出力先（既定: xml_output/<CSV 名>.fcpxml）")
+    parser.add_argument("--no-fcpxml", action="store_true", help="FCPXML を書き出さない")
+    args = parser.parse_args()
+
+    if not args.wav_dir.is_dir():
+        print(f"❌ WAV のディレクトリが見つかりません: {args.wav_dir}")
+        return
+    rate = FrameRate.parse(args.fps)
+    started = time.perf_counter()
+
+    wavs, skipped = list_numbered_wavs(args.wav_dir)
+    for name in skipped:
+        print(f"⚠ スキップ: 番号がありません（swap_title_number.py でリネームしてください）→ {name}")
+    if not wavs:
+        print(f"❌ {args.wav_dir}/ に「番号_セリフ.wav」がありません")
+        return
+
+    durations = []
+    for wav in wavs:
+        try:
+            durations.append(read_wav_duration(wav.path))
+        except (WavHeaderError, OSError) as exc:
+            print(f"❌ {exc}")
+            return
+    header_elapsed = time.perf_counter() - started
+
+    try:
+        texts = assign_texts(wavs, load_texts(args.csv, args.character))
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return
+    spans = build_spans(wavs, durations, texts, rate, args.gap, not args.no_snap)
+
+    project_name = args.csv.stem if args.csv.exists() else args.wav_dir.resolve().name
+    subtitle_path = args.output or SUBTITLE_DIR / f"{project_name}.vtt"
+    write_subtitle_file(subtitle_path, spans_to_cues(spans))
+    print(f"📝 字幕を出力しました: {subtitle_path}")
+    if not args.no_fcpxml:
+        fcpxml_path = args.fcpxml or FCPXML_DIR / f"{project_name}.fcpxml"
+        fcpxml_path.parent.mkdir(parents=True, exist_ok=True)
+        fcpxml_path.write_text(build_fcpxml(spans_to_titles(spans, rate), project_name, rate), encoding="utf-8")
+        print(f"🎞 FCPXML を出力しました: {fcpxml_path}（{rate}）")
+
+    total_ms = (spans[-1].end + TICKS_PER_MS // 2) // TICKS_PER_MS
+    print(
+        f"✅ WAV {len(wavs):,}件・合計 {format_ms(total_ms)}（ヘッダーの読み込み {header_elapsed:.2f}秒"
+        f" / 全体 {time.perf_counter() - started:.2f}秒）"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""AquesTalk Player の WAV の書き出しが終わるまで待つ、ランダムな待ち時間の代わりの待機処理。
+
+auto_aques_talk_player.py は再生ボタンを押したあと、セリフの長さによらず1〜2秒待っていた。
+これでは長いセリフは書き出しの途中で次の入力に移り、短いセリフでは待ち時間が無駄になる。
+
+WavWaiter は、再生ボタンを押す前の wav_output/ の状態を記録しておき、
+新しい（または更新された）WAV が現れて、サイズが SETTLE_SEC の間変わらなくなった時点で戻る。
+RIFF ヘッダーのサイズとファイルサイズが一致していれば、書き終わったとみなしてすぐに戻る。
+待つ上限は、セリフのモーラ数から見積もった読み上げ時間に余裕を足した秒数（line_timeout()）。
+
+- FakeWavProducer: 別スレッドで WAV を少しずつ書き出す疑似プレーヤー（GUI のない Linux での確認用）
+
+`python scripts/wav_wait.py` で、疑似プレーヤーを使ってランダムな待ち時間と比べられます。
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# ===================== 設定 =====================
+# WAV の出力先（AquesTalk Player の保存先と合わせる）
+WAV_DIR = Path("wav_output")
+
+# ファイルの状態を確認する間隔（秒）
+POLL_INTERVAL = 0.05
+
+# サイズがこの秒数変わらなければ、書き出しが終わったとみなす
+SETTLE_SEC = 0.3
+
+# 1モーラあたりの読み上げ時間（秒）と、上限を決めるときの倍率・固定の余裕（秒）
+SEC_PER_MORA = 0.15
+TIMEOUT_FACTOR = 2.0
+TIMEOUT_MARGIN = 3.0
+# ===================== 設定ここまで =====================
+
+# 拗音などの小書き文字（直前の文字と合わせて1モーラ）
+_SMALL_KANA = set("ァィゥェォャュョヮぁぃぅぇぉゃゅょゎ")
+# 読点・句点などは、間の長さとして1モーラ分に数える
+_PAUSE_MARKS = set("、。，．,.！？!?…「」『』")
+
+# WAV ファイルの状態（サイズ, 更新時刻）
+FileState = Tuple[int, int]
+
+
+def count_morae(text: str) -> int:
+    """読み上げ時間の見積もりに使う、おおよそのモーラ数。
+
+    かな・カタカナは1文字1モーラ（小書き文字は直前と合わせて1モーラ、「ー」「っ」は1モーラ）、
+    漢字は1文字2モーラ、英数字は1文字1モーラ、句読点は間として1モーラと数える。
+    """
+    morae = 0
+    for ch in text:
+        if ch in _SMALL_KANA:
+            continue
+        if "ぁ" <= ch <= "ヿ" or ch in _PAUSE_MARKS:
+            morae += 1
+        elif "一" <= ch <= "鿿" or ch == "々":
+            morae += 2
+        elif ch.isalnum():
+            morae += 1
+    return morae
+
+
+def line_timeout(text: str) -> float:
+    """セリフ1行の書き出しを待つ上限（秒）。"""
+    return TIMEOUT_MARGIN + count_morae(text) * SEC_PER_MORA * TIMEOUT_FACTOR
+
+
+def wav_is_complete(path: Path, size: int) -> bool:
+    """RIFF ヘッダーに書かれたサイズとファイルサイズが一致するか（書き終わった WAV か）。"""
+    if size < 44:
+        return False
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return False
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return False
+    return struct.unpack("<I", header[4:8])[0] + 8 == size
+
+
+def snapshot(directory: Path) -> Dict[str, FileState]:
+    """ディレクトリ内の WAV の (サイズ, 更新時刻)。"""
+    states = {}
+    if not directory.is_dir():
+        return states
+    for path in directory.glob("*.wav"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        states[path.name] = (stat.st_size, stat.st_mtime_ns)
+    return states
+
+
+class WavWaiter:
+    """WAV の書き出しが終わるまで待ち、従来のランダムな待ち時間と比べた結果を集計する。"""
+
+    def __init__(
+        self,
+        directory: Path = WAV_DIR,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.directory = directory
+        self.clock = clock
+        self.sleep = sleep
+        self.before: Dict[str, FileState] = {}
+        self.wait_count = 0
+        self.timeout_count = 0
+        self.waited_total = 0.0
+
+    def mark(self) -> None:
+        """再生ボタンを押す直前に呼び、既存の WAV の状態を記録する。"""
+        self.before = snapshot(self.directory)
+
+    def _changed(self) -> Dict[str, FileState]:
+        current = snapshot(self.directory)
+        return {name: state for name, state in current.items() if self.before.get(name) != state}
+
+    def wait(self, timeout: float) -> Optional[Path]:
+        """mark() 以降に現れた WAV の書き出しが終わるまで、最大 timeout 秒待つ。
+
+        書き出しが終わった WAV のパスを返す（上限を過ぎた場合は None）。
+        """
+        started = self.clock()
+        deadline = started + timeout
+        result = None
+        candidate: Optional[str] = None
+        last_state: Optional[FileState] = None
+        stable_since = started
+
+        while self.clock() < deadline:
+            changed = self._changed()
+            if changed:
+                # 複数あれば最後に更新されたものを見る
+                name = max(changed, key=lambda n: changed[n][1])
+                state = changed[name]
+                now = self.clock()
+                if name != candidate or state != last_state:
+                    candidate, last_state, stable_since = name, state, now
+                path = self.directory / name
+                if wav_is_complete(path, state[0]) or (state[0] > 0 and now - stable_since >= SETTLE_SEC):
+                    result = path
+                    break
+            self.sleep(min(POLL_INTERVAL, max(0.0, deadline - self.clock())))
+
+        self.wait_count += 1
+        self.timeout_count += result is None
+        self.waited_total += self.clock() - started
+        return result
+
+    def report(self) -> None:
+        """待った時間と、上限まで待った回数を表示する。"""
+        if not self.wait_count:
+            return
+        print(
+            f"⏱ 書き出し待ち {self.wait_count}回: {self.waited_total:.1f}秒"
+            f"（平均 {self.waited_total / self.wait_count:.2f}秒 / 上限まで待った回数 {self.timeout_count}回）"
+        )
+
+
+class FakeWavProducer:
+    """AquesTalk Player の代わりに、別スレッドで WAV を少しずつ書き出す疑似プレーヤー。
+
+    play() のたびに、ヘッダー（サイズは仮の 0）→ 音声データ（write_sec かけて少しずつ）→
+    ヘッダーのサイズの書き戻し、の順に書き出す。
+    """
+
+    SAMPLE_RATE = 16_000
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.count = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def play(self, text: str, speech_sec: float, write_sec: float) -> None:
+        self.count += 1
+        path = self.directory / f"{text[:10]}_{self.count}.wav"
+        self._thread = threading.Thread(target=self._write, args=(path, speech_sec, write_sec), daemon=True)
+        self._thread.start()
+
+    def join(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+
+    def _write(self, path: Path, speech_sec: float, write_sec: float, chunks: int = 10) -> None:
+        data_size = int(speech_sec * self.SAMPLE_RATE) * 2
+        with open(path, "wb") as f:
+            f.write(wav_header(0, self.SAMPLE_RATE))
+            f.flush()
+            chunk = b"\0" * (data_size // chunks)
+            for _ in range(chunks):
+                time.sleep(write_sec / chunks)
+                f.write(chunk)
+                f.flush()
+            written = len(chunk) * chunks
+            f.seek(0)
+            f.write(wav_header(written, self.SAMPLE_RATE))
+
+
+def wav_header(data_size: int, sample_rate: int) -> bytes:
+    """16bit モノラルの PCM WAV のヘッダー。data_size=0 なら書き出し途中の仮ヘッダー（RIFF サイズも 0）。"""
+    riff_size = 36 + data_size if data_size else 0
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def simulate(lines: int = 8, seed: int = 1234) -> None:
+    """疑似プレーヤーで、長さの違うセリフを読み上げたときの待ち時間を試算する。"""
+    rng = random.Random(seed)
+    texts = ["はい。", "こんにちは、まりさだぜ。", "今回は動画制作の効率化について紹介します。",
+             "テロップを手作業で入力すると、十分の動画でも三十分以上かかることがあります。"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = Path(tmp_dir)
+        producer = FakeWavProducer(directory)
+        waiter = WavWaiter(directory)
+        random_total = 0.0
+        cut_off = 0
+        for _ in range(lines):
+            text = rng.choice(texts)
+            # 読み上げ時間の 1/4 程度で書き出しが終わるものとする
+            speech_sec = count_morae(text) * 0.12
+            write_sec = speech_sec / 4
+            waiter.mark()
+            producer.play(text, speech_sec, write_sec)
+            path = waiter.wait(line_timeout(text))
+            producer.join()
+            random_wait = rng.randint(1, 2)
+            random_total += random_wait
+            cut_off += random_wait < write_sec
+            print(f"  {count_morae(text):3d}モーラ: {path.name if path else '（上限まで待機）'}")
+        waiter.report()
+        print(f"   ランダム待ち（1〜2秒）なら {random_total:.1f}秒 / 書き出し途中で次へ進んだ回数 {cut_off}回")
+
+
+if __name__ == "__main__":
+    print("🧪 疑似プレーヤーで試算します（8行）")
+    simulate()